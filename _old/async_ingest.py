@@ -0,0 +1,169 @@
+# _old/async_ingest.py
+
+import os
+import sys
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from _old.logging_setup import setup_logging
+from _old.db_connection import get_engine
+from _old.data_fetcher import (DEFAULT_CHUNK_SIZE, INCREMENTAL_COLUMNS, iter_table_chunks, start_table_run,
+                               advance_watermark, finish_table_run)
+from _old.data_cleaning import clean_table
+
+# Setup logger
+logger = setup_logging('async_ingest')
+
+INGESTED_FOLDER = os.path.join('data_files', 'ingested')
+# Chunks fetched ahead of the cleaning stage, per table
+PREFETCH_CHUNKS = 2
+
+# Concurrent ingestion of several databases.
+#
+# Every table runs as its own fetch -> clean -> write pipeline: a fetch task streams
+# chunks into a small bounded queue while the table's consumer cleans and writes the
+# chunks it has already received, so cleaning one chunk overlaps with fetching the
+# next. The blocking database reads, the cleaning and the Parquet writes run on a
+# thread pool; the event loop only moves chunks between the stages. Engines for all
+# sources are created concurrently, and the tables of one database are fetched at
+# most `pool_size` at a time so they never wait on the connection pool.
+
+def _pool_size(engine):
+    return engine.pool.size() if hasattr(engine.pool, 'size') else 1
+
+def _close_iterator(iterator):
+    try:
+        iterator.close()
+    except ValueError:
+        # Still running in its thread after a cancellation; the connection is
+        # released when the generator is garbage collected
+        pass
+
+async def _fetch_chunks(iterator, queue, semaphore):
+    """Move chunks from a blocking chunk iterator into `queue`, ending with None."""
+    try:
+        async with semaphore:
+            while True:
+                chunk = await asyncio.to_thread(next, iterator, None)
+                if chunk is None:
+                    break
+                await queue.put(chunk)
+        await queue.put(None)
+    except Exception as e:
+        # Handed to the consumer, which re-raises it once the earlier chunks are written
+        await queue.put(e)
+    finally:
+        await asyncio.to_thread(_close_iterator, iterator)
+
+async def ingest_table(engine, table_name, output_folder, semaphore, chunk_size=DEFAULT_CHUNK_SIZE, watermark_column=None):
+    """
+    Fetch, clean and write one table as Parquet parts under `output_folder/table_name`.
+
+    Without a watermark column the table is re-ingested in full and previous parts
+    are replaced; with one, only rows at or after the stored watermark are pulled,
+    as in data_fetcher.fetch_data. The watermark is only advanced once every chunk
+    has been written.
+    """
+    table_folder, since, run_id = start_table_run(output_folder, table_name, watermark_column)
+    logger.info(f'Ingesting {table_name}' + (f' since {since}...' if since is not None else '...'))
+    queue = asyncio.Queue(maxsize=PREFETCH_CHUNKS)
+    iterator = iter_table_chunks(engine, table_name, chunk_size, watermark_column, since)
+    producer = asyncio.create_task(_fetch_chunks(iterator, queue, semaphore))
+
+    total_rows = 0
+    watermark = since
+    try:
+        part = 0
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            # Taken before cleaning, which turns dates into strings
+            watermark = advance_watermark(watermark, chunk, watermark_column)
+            cleaned = await asyncio.to_thread(clean_table, chunk, table_name)
+            path = os.path.join(table_folder, f'part-{run_id}-{part:05d}.parquet')
+            await asyncio.to_thread(cleaned.to_parquet, path, index=False)
+            total_rows += len(cleaned)
+            part += 1
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+    finish_table_run(output_folder, table_name, watermark_column, watermark)
+    logger.info(f'Ingested {total_rows} rows from {table_name} into {table_folder}.')
+    return total_rows
+
+async def ingest_sources(sources, output_folder=INGESTED_FOLDER, chunk_size=DEFAULT_CHUNK_SIZE,
+                         incremental_columns=None, max_threads=None):
+    """
+    Ingest the tables of several databases concurrently.
+
+    Each database gets its own folder, `output_folder/db_name`, holding one Parquet
+    part folder per table and the watermarks of its tables, so tables with the same
+    name in two databases never share parts or a watermark.
+
+    Args:
+    sources (dict): Database name -> list of table names.
+    output_folder (str): Folder receiving one folder per database.
+    chunk_size (int): Rows per fetched chunk.
+    incremental_columns (dict): Watermark column per table; defaults to INCREMENTAL_COLUMNS.
+    max_threads (int): Size of the thread pool running the blocking stages; defaults
+        to two threads per table (fetching and cleaning/writing) plus one per database.
+
+    Returns:
+    dict: Rows ingested per (database name, table name).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    incremental_columns = INCREMENTAL_COLUMNS if incremental_columns is None else incremental_columns
+    n_tables = sum(len(tables) for tables in sources.values())
+    executor = ThreadPoolExecutor(max_workers=max_threads or 2 * n_tables + len(sources))
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    engines = []
+    try:
+        # get_engine blocks on a test connection, so every source connects at the same time
+        engines = await asyncio.gather(*(asyncio.to_thread(get_engine, db_name) for db_name in sources))
+        tasks = {}
+        for engine, (db_name, tables) in zip(engines, sources.items()):
+            semaphore = asyncio.Semaphore(_pool_size(engine))
+            db_folder = os.path.join(output_folder, db_name)
+            for table in tables:
+                tasks[(db_name, table)] = asyncio.create_task(ingest_table(engine, table, db_folder, semaphore, chunk_size,
+                                                                           incremental_columns.get(table)))
+        try:
+            rows = await asyncio.gather(*tasks.values())
+        except Exception:
+            # Stop the other tables before their engines are disposed
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return dict(zip(tasks, rows))
+    finally:
+        for engine in engines:
+            engine.dispose()
+
+def run_ingestion(sources, **kwargs):
+    """Synchronous entry point for `ingest_sources`."""
+    return asyncio.run(ingest_sources(sources, **kwargs))
+
+if __name__ == '__main__':
+    import time
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    plaid_tables = [
+        'plaid_accounts', 'plaid_liabilities_credit', 'plaid_liabilities_credit_apr',
+        'plaid_transactions', 'plaid_transaction_counterparties', 'asset_report',
+        'asset_item', 'asset_account', 'asset_transaction', 'asset_historical_balance'
+    ]
+    finance_tables = ['mbna_accounts', 'mbna_transactions']
+
+    start = time.perf_counter()
+    rows = run_ingestion({os.getenv('PLAID_DB'): plaid_tables, os.getenv('MBNA_DB'): finance_tables})
+    logger.info(f'Ingested {sum(rows.values())} rows from {len(rows)} tables in {time.perf_counter() - start:.1f}s')
@@ -1,44 +1,157 @@
-# scripts/data_fetcher.py
+# _old/data_fetcher.py
 
 import os
 import sys
+import json
+import glob
+import numbers
+import shutil
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import text
 
 # Add the project root to the PYTHONPATH
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.logging_setup import setup_logging
-from utils.db_connection import get_engine
+from _old.logging_setup import setup_logging
+from _old.db_connection import get_engine
 
 # Setup logger
 logger = setup_logging('data_fetcher')
 
-def fetch_data(engine, table_name):
-    file_path = os.path.join('data_files', 'fetched', f'{table_name}.xlsx')
-    
-    if os.path.exists(file_path):
-        logger.info(f'Loading data from existing file {file_path}...')
-        df = pd.read_excel(file_path)
-    else:
-        logger.info(f'Fetching data from {table_name}...')
-        query = f'SELECT * FROM {table_name}'
-        df = pd.read_sql(query, engine)
-        df.to_excel(file_path, index=False)
-        logger.info(f'Data from {table_name} saved to {file_path}.')
-    
-    return df
-
-def fetch_all_data(engine, tables):
-    dataframes = {}
-    for table in tables:
-        dataframes[table] = fetch_data(engine, table)
-    return dataframes
+FETCHED_FOLDER = os.path.join('data_files', 'fetched')
+WATERMARK_FILE = '_watermarks.json'
+DEFAULT_CHUNK_SIZE = 50000
+
+_watermark_lock = threading.Lock()
+
+# Columns used for incremental pulls; tables not listed are always fetched in full
+INCREMENTAL_COLUMNS = {
+    'plaid_transactions': 'date',
+    'asset_transaction': 'date',
+    'asset_historical_balance': 'date',
+    'mbna_transactions': 'posting_date',
+}
+
+def load_watermarks(output_folder):
+    path = os.path.join(output_folder, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_watermark(output_folder, table_name, value):
+    # Threads fetching different tables share the file, so update it under a lock
+    with _watermark_lock:
+        watermarks = load_watermarks(output_folder)
+        watermarks[table_name] = value
+        tmp_path = os.path.join(output_folder, f'{WATERMARK_FILE}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2)
+        os.replace(tmp_path, os.path.join(output_folder, WATERMARK_FILE))
+
+def _watermark_value(value):
+    # Keep numbers JSON-native; dates and timestamps are stored as strings
+    if isinstance(value, numbers.Number):
+        return value.item() if hasattr(value, 'item') else value
+    return str(value)
+
+def start_table_run(output_folder, table_name, watermark_column=None):
+    """
+    Prepare `output_folder/table_name` for fetching a table.
+
+    With a watermark column and a stored watermark, only newer rows are fetched and
+    the existing parts are kept; otherwise the table is fetched in full and previous
+    parts are removed.
+
+    Returns:
+    tuple: (table folder, stored watermark or None, run id naming this run's parts)
+    """
+    table_folder = os.path.join(output_folder, table_name)
+    since = load_watermarks(output_folder).get(table_name) if watermark_column else None
+    if since is None and os.path.exists(table_folder):
+        shutil.rmtree(table_folder)
+    os.makedirs(table_folder, exist_ok=True)
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return table_folder, since, run_id
+
+def advance_watermark(watermark, chunk, watermark_column):
+    """The watermark once `chunk` is written: the largest value of its watermark column."""
+    if watermark_column is not None and chunk[watermark_column].notna().any():
+        return _watermark_value(chunk[watermark_column].max())
+    return watermark
+
+def finish_table_run(output_folder, table_name, watermark_column, watermark):
+    """Store the watermark once every chunk of the run has been written."""
+    if watermark_column is not None and watermark is not None:
+        save_watermark(output_folder, table_name, watermark)
+
+def iter_table_chunks(engine, table_name, chunk_size=DEFAULT_CHUNK_SIZE, watermark_column=None, since=None):
+    """Stream a table in fixed-size chunks using a server-side cursor."""
+    quote = engine.dialect.identifier_preparer.quote
+    query = f'SELECT * FROM {quote(table_name)}'
+    params = {}
+    if watermark_column is not None:
+        if since is not None:
+            # Rows sharing the last watermark value are re-fetched; deduplication drops them
+            query += f' WHERE {quote(watermark_column)} >= :since'
+            params['since'] = since
+        query += f' ORDER BY {quote(watermark_column)}'
+
+    with engine.connect().execution_options(stream_results=True) as connection:
+        for chunk in pd.read_sql(text(query), connection, params=params, chunksize=chunk_size):
+            yield chunk
+
+def load_fetched_table(table_name, folder_path=FETCHED_FOLDER):
+    """Read every Parquet part fetched for a table into one DataFrame."""
+    parts = sorted(glob.glob(os.path.join(folder_path, table_name, '*.parquet')))
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+def fetch_data(engine, table_name, output_folder=FETCHED_FOLDER, chunk_size=DEFAULT_CHUNK_SIZE, watermark_column=None):
+    """
+    Fetch a table into Parquet parts under `output_folder/table_name`.
+
+    Without a watermark column the table is re-fetched in full and previous parts
+    are replaced. With one, only rows at or after the stored watermark are pulled
+    and written as new parts next to the existing ones.
+    """
+    table_folder, since, run_id = start_table_run(output_folder, table_name, watermark_column)
+    logger.info(f'Fetching data from {table_name}' + (f' since {since}...' if since is not None else '...'))
+    total_rows = 0
+    watermark = since
+    for i, chunk in enumerate(iter_table_chunks(engine, table_name, chunk_size, watermark_column, since)):
+        chunk.to_parquet(os.path.join(table_folder, f'part-{run_id}-{i:05d}.parquet'), index=False)
+        total_rows += len(chunk)
+        watermark = advance_watermark(watermark, chunk, watermark_column)
+
+    finish_table_run(output_folder, table_name, watermark_column, watermark)
+    logger.info(f'Fetched {total_rows} rows from {table_name} into {table_folder}.')
+    return total_rows
+
+def fetch_all_data(engine, tables, output_folder=FETCHED_FOLDER, chunk_size=DEFAULT_CHUNK_SIZE,
+                   incremental_columns=None, max_workers=None):
+    """Fetch independent tables concurrently over the engine's connection pool."""
+    os.makedirs(output_folder, exist_ok=True)
+    incremental_columns = INCREMENTAL_COLUMNS if incremental_columns is None else incremental_columns
+    if max_workers is None:
+        pool_size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+        max_workers = max(1, min(len(tables), pool_size))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            table: executor.submit(fetch_data, engine, table, output_folder, chunk_size, incremental_columns.get(table))
+            for table in tables
+        }
+        return {table: future.result() for table, future in futures.items()}
 
 if __name__ == '__main__':
     from dotenv import load_dotenv
     load_dotenv()
-    
+
     plaid_db = os.getenv('PLAID_DB')
     finance_db = os.getenv('MBNA_DB')
 
@@ -10,7 +10,7 @@ from sqlalchemy.pool import QueuePool
 # Add the project directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.logging_setup import setup_logging
+from _old.logging_setup import setup_logging
 
 # Load environment variables from .env file
 load_dotenv()
@@ -52,8 +52,9 @@ def get_engine(db_name):
             pool_recycle=1800
         )
         
-        # Test the connection by connecting to the database
-        engine.connect()
+        # Test the connection by connecting to the database, returning it to the pool
+        with engine.connect():
+            pass
         
         logger.info(f"Database engine for {db_name} created successfully")
         print(f"Database connection to {db_name} was successful.")
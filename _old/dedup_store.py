@@ -0,0 +1,109 @@
+# _old/dedup_store.py
+
+import os
+import glob
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Persistent, hash-indexed store of the dedup keys already ingested per table.
+#
+# Each table's keys are stored as 64-bit hashes in the folder `<index_folder>/<table>`,
+# one append-only segment file per ingested batch holding that batch's sorted
+# hashes (8 bytes per row). Recording a batch only writes its own segment, so the
+# cost does not grow with the size of the index. New batches are hashed and looked
+# up with a binary search against each memory-mapped segment; once a table has more
+# than MAX_SEGMENTS segments they are merged into one. With 64-bit hashes the chance
+# of any collision stays below one in a million up to roughly six million keys per
+# table.
+#
+# Sources resolving to the same table may be processed by concurrent workers, so
+# filtering a batch and recording its keys happen under a per-table file lock
+# (`table_lock`); otherwise two workers could both accept the same new keys.
+
+MAX_SEGMENTS = 32
+LOCK_FILE = '.lock'
+
+def hash_keys(df, keys):
+    """Stable 64-bit hash per row of the key columns, independent of their dtypes."""
+    return pd.util.hash_pandas_object(df[keys].astype(str), index=False).to_numpy(dtype=np.uint64)
+
+def index_path(index_folder, table_name):
+    return os.path.join(index_folder, table_name)
+
+def _segment_paths(path):
+    paths = sorted(glob.glob(os.path.join(path, 'segment-*.npy')))
+    # Single-file index written before the index was segmented
+    if os.path.isfile(f'{path}.npy'):
+        paths.insert(0, f'{path}.npy')
+    return paths
+
+def load_key_index(path, mmap_mode='r'):
+    """The sorted hash segments of a table's index."""
+    return [np.load(segment, mmap_mode=mmap_mode) for segment in _segment_paths(path)]
+
+def _write_segment(path, hashes):
+    os.makedirs(path, exist_ok=True)
+    # Named by time then a random suffix, so segments sort in write order and never clash
+    name = f'segment-{pd.Timestamp.now().value:020d}-{uuid.uuid4().hex[:8]}.npy'
+    tmp_path = os.path.join(path, f'.{name}.tmp.npy')
+    np.save(tmp_path, hashes)
+    os.replace(tmp_path, os.path.join(path, name))
+
+@contextmanager
+def table_lock(path):
+    """Exclusive lock on a table's index, shared by every worker process."""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK_FILE), 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def contains(index, hashes):
+    """Membership test of `hashes` in the sorted arrays of an index."""
+    seen = np.zeros(len(hashes), dtype=bool)
+    for segment in index:
+        if len(segment) == 0:
+            continue
+        positions = np.minimum(np.searchsorted(segment, hashes), len(segment) - 1)
+        seen |= segment[positions] == hashes
+    return seen
+
+def filter_seen_rows(df, keys, path):
+    """
+    Drop rows whose keys were already ingested in an earlier batch.
+
+    Returns:
+    tuple: (filtered DataFrame, hashes of the kept rows, number of rows removed)
+    """
+    hashes = hash_keys(df, keys)
+    seen = contains(load_key_index(path), hashes)
+    return df[~seen], hashes[~seen], int(seen.sum())
+
+def compact_index(path):
+    """Merge all segments of a table's index into one."""
+    segments = _segment_paths(path)
+    if len(segments) < 2:
+        return
+    merged = np.unique(np.concatenate([np.load(segment) for segment in segments])).astype(np.uint64)
+    _write_segment(path, merged)
+    for segment in segments:
+        os.remove(segment)
+
+def record_keys(path, hashes, max_segments=MAX_SEGMENTS):
+    """Add newly ingested key hashes to the index as a new segment."""
+    hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+    if len(hashes):
+        _write_segment(path, hashes)
+    if len(_segment_paths(path)) > max_segments:
+        compact_index(path)
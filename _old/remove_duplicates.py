@@ -2,25 +2,21 @@
 
 import os
 import sys
+from functools import partial
+from contextlib import nullcontext
 import pandas as pd
 
 # Add the project root to the PYTHONPATH
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.logging_setup import setup_logging
+from _old.logging_setup import setup_logging
+from _old.dedup_store import index_path, table_lock, filter_seen_rows, record_keys
+from _old.table_registry import (TABLE_REGISTRY, resolve_table_name, load_table_source, save_table_output, save_table_part,
+                                 process_tables_in_parallel)
 
 # Setup logger
 logger = setup_logging('remove_duplicates')
 
-def load_excel_files(folder_path):
-    files = os.listdir(folder_path)
-    return {file: pd.read_excel(os.path.join(folder_path, file)) for file in files if file.endswith('.xlsx')}
-
-def save_cleaned_file(df, file_name, folder_path):
-    output_path = os.path.join(folder_path, file_name)
-    df.to_excel(output_path, index=False)
-    logger.info(f'Saved cleaned data to {output_path}')
-
 def remove_duplicates(df, subset):
     initial_count = len(df)
     df.drop_duplicates(subset=subset, keep='first', inplace=True)
@@ -28,66 +24,62 @@ def remove_duplicates(df, subset):
     removed_count = initial_count - final_count
     return df, removed_count
 
-def process_files(input_folder_path, output_folder_path):
-    dataframes = load_excel_files(input_folder_path)
-    report_data = []
+def dedupe_file(source_path, output_folder_path, index_folder_path=None):
+    """
+    Load, deduplicate and save a single table. Runs inside a worker process.
+
+    With an index folder, rows of append-only tables whose keys were ingested by an
+    earlier run are also dropped, and the new rows of this batch are saved as a new
+    part next to the earlier ones. Snapshot tables are always saved whole, replacing
+    the previous output.
+    """
+    file = os.path.basename(source_path)
+    table_name = resolve_table_name(source_path)
+    df = load_table_source(source_path)
+    removed_count = 0
+    if table_name is None:
+        logger.warning(f'No deduplication keys registered for {file}; saving it unchanged')
+    else:
+        logger.info(f'Removing duplicates from {file}')
+        df, removed_count = remove_duplicates(df, TABLE_REGISTRY[table_name]['dedup_keys'])
+
+    append_only = table_name is not None and TABLE_REGISTRY[table_name].get('append_only', False)
+    path = index_path(index_folder_path, table_name) if index_folder_path is not None and append_only else None
+    # Other sources of the same table wait until this batch's keys are recorded
+    with table_lock(path) if path is not None else nullcontext():
+        if path is not None:
+            df, new_hashes, seen_count = filter_seen_rows(df, TABLE_REGISTRY[table_name]['dedup_keys'], path)
+            logger.info(f'{seen_count} rows of {file} were already ingested by earlier runs')
+            removed_count += seen_count
+
+        # Save the deduplicated dataframe
+        if path is not None:
+            output_path = save_table_part(df, source_path, output_folder_path)
+        else:
+            output_path = save_table_output(df, source_path, output_folder_path)
+        logger.info(f'Saved cleaned data to {output_path}')
 
-    for file, df in dataframes.items():
-        if 'plaid_accounts' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id'])
-        elif 'plaid_liabilities_credit' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id'])
-        elif 'plaid_liabilities_credit_apr' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id', 'apr_type'])
-        elif 'plaid_transactions' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['transaction_id'])
-        elif 'plaid_transaction_counterparties' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['transaction_id', 'entity_id'])
-        elif 'categories' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['category_id'])
-        elif 'asset_report' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['asset_report_id'])
-        elif 'asset_item' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['item_id'])
-        elif 'asset_account' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id'])
-        elif 'asset_transaction' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['transaction_id'])
-        elif 'asset_historical_balance' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id', 'date'])
-        elif 'mbna_accounts' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_number'])
-        elif 'mbna_transactions' in file:
-            logger.info(f'Removing duplicates from {file}')
-            dataframes[file], removed_count = remove_duplicates(df, ['account_id', 'transaction_id'])
+        # Only record keys once the batch has been written
+        if path is not None:
+            record_keys(path, new_hashes)
+    return [file, removed_count]
 
-        # Save the deduplicated dataframe back to Excel
-        save_cleaned_file(dataframes[file], file, output_folder_path)
-        
-        # Add to report data
-        report_data.append([file, removed_count])
+def process_files(input_folder_path, output_folder_path, max_workers=None, index_folder_path=None,
+                  report_output_path=os.path.join('reports', 'remove_dupes_report.xlsx')):
+    worker = partial(dedupe_file, index_folder_path=index_folder_path)
+    report_data = process_tables_in_parallel(input_folder_path, worker, output_folder_path, max_workers)
 
     # Save the report
     report_df = pd.DataFrame(report_data, columns=['File', 'Rows Removed'])
-    report_output_path = os.path.join('reports', 'remove_dupes_report.xlsx')
-    os.makedirs(os.path.dirname(report_output_path), exist_ok=True)
+    if os.path.dirname(report_output_path):
+        os.makedirs(os.path.dirname(report_output_path), exist_ok=True)
     report_df.to_excel(report_output_path, index=False)
     logger.info(f'Report saved to {report_output_path}')
+    return report_df
 
 if __name__ == '__main__':
     input_folder_path = 'data_files/cleaned'
     output_folder_path = 'data_files/dupes_removed'
+    index_folder_path = 'data_files/dedup_index'
     os.makedirs(output_folder_path, exist_ok=True)
-    process_files(input_folder_path, output_folder_path)
+    process_files(input_folder_path, output_folder_path, index_folder_path=index_folder_path)
@@ -0,0 +1,239 @@
+# _old/table_registry.py
+
+import os
+import glob
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Registry of the fetched tables: how each one is cleaned and which columns
+# identify a row for deduplication.
+#
+# Append-only tables (transactions, counterparties, historical balances) only ever
+# gain rows, so rows ingested by earlier runs can be skipped with the persistent
+# key index of dedup_store. The other tables are snapshots fetched in full whose
+# rows are updated in place (balances, limits, due dates) and are always written
+# whole.
+#
+# Cleaning rules are applied in a fixed order by data_cleaning.apply_cleaning_rules
+# so every table shares the same vectorized code path:
+#   strings       strip whitespace (values are cast to str)
+#   numeric       coerce to numbers, filling failures with 0
+#   dates         coerce to 'YYYY-MM-DD' strings
+#   currency      upper-case and replace unknown codes with DEFAULT_CURRENCY_CODE
+#   max_length    set values longer than the limit (or missing) to None
+#   positive      set non-positive values to None
+#   bounds        set values outside [low, high] to None
+#   fill          fill missing values with a constant
+#   zfill         left-pad with zeros to the given width
+#   booleans      cast to bool
+#   int_booleans  cast to int, then to bool
+#   rename        rename columns once cleaned
+#   skip_missing  ignore listed columns that are absent instead of failing
+TABLE_REGISTRY = {
+    'plaid_accounts': {
+        'dedup_keys': ['account_id'],
+        'cleaning_rules': {
+            'strings': ['bank_name', 'name', 'official_name', 'type', 'subtype'],
+            'numeric': ['available_balance', 'current_balance', 'balance_limit'],
+            'dates': ['created_at', 'updated_at'],
+            'currency': ['iso_currency_code'],
+            'max_length': {'unofficial_currency_code': 10},
+            'zfill': {'mask': 4},
+        },
+    },
+    'plaid_liabilities_credit': {
+        'dedup_keys': ['account_id'],
+        'cleaning_rules': {
+            'strings': ['account_id'],
+            'numeric': ['last_payment_amount', 'last_statement_balance', 'minimum_payment_amount'],
+            'dates': ['last_payment_date', 'last_statement_issue_date', 'next_payment_due_date'],
+            'int_booleans': ['is_overdue'],
+            'skip_missing': True,
+        },
+    },
+    'plaid_liabilities_credit_apr': {
+        'dedup_keys': ['account_id', 'apr_type'],
+        'cleaning_rules': {
+            'strings': ['account_id', 'apr_type'],
+            'numeric': ['apr_percentage', 'balance_subject_to_apr', 'interest_charge_amount'],
+        },
+    },
+    'plaid_transactions': {
+        'dedup_keys': ['transaction_id'],
+        'append_only': True,
+        'cleaning_rules': {
+            'strings': [
+                'account_id', 'transaction_id', 'account_owner', 'merchant_entity_id', 'merchant_name', 'name', 'payment_channel',
+                'pending_transaction_id', 'transaction_code', 'transaction_type', 'category', 'category_id',
+                'personal_finance_category_confidence_level', 'personal_finance_category_detailed',
+                'personal_finance_category_primary', 'location_address', 'location_city', 'location_region',
+                'location_postal_code', 'location_country', 'location_store_number', 'payment_meta_reference_number',
+                'payment_meta_ppd_id', 'payment_meta_payee', 'payment_meta_by_order_of', 'payment_meta_payer',
+                'payment_meta_payment_method', 'payment_meta_payment_processor', 'payment_meta_reason'
+            ],
+            'numeric': ['amount', 'location_lat', 'location_lon'],
+            'dates': ['authorized_date', 'authorized_datetime', 'date', 'datetime'],
+            'currency': ['iso_currency_code'],
+            'max_length': {'unofficial_currency_code': 10},
+            'booleans': ['pending'],
+        },
+    },
+    'plaid_transaction_counterparties': {
+        'dedup_keys': ['transaction_id', 'entity_id'],
+        'append_only': True,
+        'cleaning_rules': {
+            'strings': ['transaction_id', 'name', 'type', 'website', 'logo_url', 'confidence_level', 'entity_id', 'phone_number'],
+        },
+    },
+    'categories': {
+        'dedup_keys': ['category_id'],
+        'cleaning_rules': {
+            'strings': ['category_group', 'hierarchy_level1', 'hierarchy_level2', 'hierarchy_level3'],
+        },
+    },
+    'asset_report': {
+        'dedup_keys': ['asset_report_id'],
+        'cleaning_rules': {
+            'strings': ['asset_report_id', 'client_report_id'],
+            'dates': ['date_generated', 'created_at'],
+            'positive': ['days_requested'],
+            'max_length': {'file_path': 255},
+            'fill': {'json_file': '{}'},
+        },
+    },
+    'asset_item': {
+        'dedup_keys': ['item_id'],
+        'cleaning_rules': {
+            'strings': ['institution_name', 'item_id', 'asset_report_id'],
+            'dates': ['date_last_updated'],
+        },
+    },
+    'asset_account': {
+        'dedup_keys': ['account_id'],
+        'cleaning_rules': {
+            'strings': ['account_id', 'name', 'official_name', 'type', 'subtype', 'item_id', 'asset_report_id'],
+            'numeric': ['available', 'current', 'limit', 'margin_loan_amount'],
+            'currency': ['iso_currency_code'],
+            'max_length': {'unofficial_currency_code': 10},
+        },
+    },
+    'asset_transaction': {
+        'dedup_keys': ['transaction_id'],
+        'append_only': True,
+        'cleaning_rules': {
+            'strings': ['transaction_id', 'account_id', 'original_description', 'asset_report_id'],
+            'numeric': ['amount'],
+            'dates': ['date'],
+            'currency': ['iso_currency_code'],
+            'max_length': {'unofficial_currency_code': 10},
+        },
+    },
+    'asset_historical_balance': {
+        'dedup_keys': ['account_id', 'date'],
+        'append_only': True,
+        'cleaning_rules': {
+            'strings': ['account_id', 'asset_report_id'],
+            'numeric': ['current'],
+            'dates': ['date'],
+            'currency': ['iso_currency_code'],
+            'max_length': {'unofficial_currency_code': 10},
+        },
+    },
+    'mbna_accounts': {
+        'dedup_keys': ['account_number'],
+        'cleaning_rules': {
+            'strings': ['cardholder_name', 'account_number'],
+            'numeric': ['credit_limit', 'cash_advance_limit', 'credit_available', 'cash_advance_available'],
+            'dates': ['statement_closing_date'],
+            'bounds': {
+                'annual_interest_rate_purchases': (0, 100),
+                'annual_interest_rate_balance_transfers': (0, 100),
+                'annual_interest_rate_cash_advances': (0, 100),
+            },
+        },
+    },
+    'mbna_transactions': {
+        'dedup_keys': ['account_id', 'transaction_id'],
+        'append_only': True,
+        'cleaning_rules': {
+            'strings': ['payeee', 'adrdress'],  # Use the original column names here
+            'numeric': ['amount'],
+            'dates': ['posting_date'],
+            'rename': {'payeee': 'payee', 'adrdress': 'address'},  # Rename columns after cleaning
+        },
+    },
+}
+
+def resolve_table_name(file_name):
+    """
+    Map a file or folder name to its registry entry.
+
+    An exact match on the name without extension wins; otherwise the longest
+    registered table name contained in it is used, so e.g.
+    'plaid_liabilities_credit_apr' never falls back to 'plaid_liabilities_credit'.
+    """
+    stem = os.path.splitext(os.path.basename(file_name.rstrip(os.sep)))[0]
+    if stem in TABLE_REGISTRY:
+        return stem
+    matches = [table for table in TABLE_REGISTRY if table in stem]
+    return max(matches, key=len) if matches else None
+
+def list_table_sources(folder_path):
+    """List the .xlsx/.parquet files and fetched Parquet table folders in a folder."""
+    sources = []
+    for entry in sorted(os.listdir(folder_path)):
+        path = os.path.join(folder_path, entry)
+        if entry.endswith(('.xlsx', '.parquet')) and os.path.isfile(path):
+            sources.append(path)
+        elif os.path.isdir(path) and glob.glob(os.path.join(path, '*.parquet')):
+            sources.append(path)
+    return sources
+
+def load_table_source(path):
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, '*.parquet')))
+        return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+def save_table_output(df, source_path, folder_path):
+    """Write a processed table next to its siblings, keeping Excel sources as Excel."""
+    name = os.path.basename(source_path.rstrip(os.sep))
+    if name.endswith('.xlsx'):
+        output_path = os.path.join(folder_path, name)
+        df.to_excel(output_path, index=False)
+    else:
+        output_path = os.path.join(folder_path, f'{os.path.splitext(name)[0]}.parquet')
+        df.to_parquet(output_path, index=False)
+    return output_path
+
+def save_table_part(df, source_path, folder_path):
+    """
+    Write a batch of new rows as its own Parquet part in `folder_path/<name>`.
+
+    Earlier parts are kept, so the folder holds every row ingested so far and is
+    read back as one table by load_table_source.
+    """
+    name = os.path.splitext(os.path.basename(source_path.rstrip(os.sep)))[0]
+    table_folder = os.path.join(folder_path, name)
+    os.makedirs(table_folder, exist_ok=True)
+    # Named by time then a random suffix, so parts sort in write order and never clash
+    output_path = os.path.join(table_folder, f'part-{pd.Timestamp.now().value:020d}-{uuid.uuid4().hex[:8]}.parquet')
+    df.to_parquet(output_path, index=False)
+    return output_path
+
+def process_tables_in_parallel(input_folder_path, worker, output_folder_path, max_workers=None):
+    """
+    Run `worker(source_path, output_folder_path)` for every table in a process pool.
+
+    Each worker loads, processes and writes a single table, so memory is bounded to
+    one table per worker. Results are returned in source order.
+    """
+    sources = list_table_sources(input_folder_path)
+    if not sources:
+        return []
+    os.makedirs(output_folder_path, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(worker, sources, [output_folder_path] * len(sources)))
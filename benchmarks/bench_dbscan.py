@@ -0,0 +1,83 @@
+# benchmarks/bench_dbscan.py
+"""
+Time and peak memory of the DBSCAN anomaly modes against the row count.
+
+Each measurement runs in a fresh process; memory is the growth of its peak
+resident set size while clustering.
+
+Usage: python benchmarks/bench_dbscan.py --rows 10000 50000 200000
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.cluster import DBSCAN
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.advanced_anomaly_detection import ANOMALY_FEATURES, dbscan_anomalies
+
+def make_transactions(n_rows, n_accounts, seed=0):
+    rng = np.random.default_rng(seed)
+    account_scale = rng.lognormal(3, 1, n_accounts)
+    accounts = rng.integers(0, n_accounts, n_rows)
+    amounts = rng.exponential(account_scale[accounts]).round(2)
+    return pd.DataFrame({
+        'account_id': [f'acc{i:05d}' for i in accounts],
+        'transaction_amount': amounts,
+        '7day_avg': amounts * rng.normal(1, 0.1, n_rows),
+        '30day_avg': amounts * rng.normal(1, 0.05, n_rows),
+    })
+
+def plain_dbscan(df):
+    df['is_anomaly_dbscan'] = DBSCAN(eps=0.5, min_samples=5).fit_predict(df[ANOMALY_FEATURES])
+    return df
+
+def _run_mode(mode, n_rows, n_accounts, sample_size, n_jobs):
+    df = make_transactions(n_rows, n_accounts)
+    modes = {
+        'plain': plain_dbscan,
+        'per account': lambda df: dbscan_anomalies(df, by='account_id', n_jobs=n_jobs),
+        'sampled': lambda df: dbscan_anomalies(df, sample_size=sample_size),
+        'per account sampled': lambda df: dbscan_anomalies(df, by='account_id', sample_size=sample_size, n_jobs=n_jobs),
+    }
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = modes[mode](df)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, (peak_kb - baseline_kb) / 1024, int((result['is_anomaly_dbscan'] == -1).sum())
+
+def measure(mode, n_rows, n_accounts, sample_size, n_jobs):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_run_mode, mode, n_rows, n_accounts, sample_size, n_jobs).result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--accounts', type=int, default=500)
+    parser.add_argument('--sample-size', type=int, default=2_000)
+    parser.add_argument('--plain-max-rows', type=int, default=50_000,
+                        help="Skip plain DBSCAN above this many rows")
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    modes = ['plain', 'per account', 'sampled', 'per account sampled']
+    results = []
+    for n_rows in args.rows:
+        for mode in modes:
+            if mode == 'plain' and n_rows > args.plain_max_rows:
+                continue
+            elapsed, peak_mb, noise = measure(mode, n_rows, args.accounts, args.sample_size, args.n_jobs)
+            results.append({'rows': n_rows, 'mode': mode, 'seconds': round(elapsed, 3),
+                            'peak_rss_mb': round(peak_mb, 1), 'noise_rows': noise})
+            print(results[-1], flush=True)
+
+    print(pd.DataFrame(results).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_forecast_cache.py
+"""
+Nightly ARIMA forecast time with and without the per-account parameter cache.
+
+A history is forecast once to fill the cache, one more day of transactions is
+added, and the extended history is forecast cold (no cache), warm-started
+(refit='warm') and with the cached parameters as they are (refit='append').
+
+Usage: python benchmarks/bench_forecast_cache.py --accounts 50 --days 180
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.time_series_analysis import forecast_all_accounts
+
+def make_history(n_accounts, n_days, transactions_per_day=3, seed=0):
+    rng = np.random.default_rng(seed)
+    n_rows = n_accounts * n_days * transactions_per_day
+    return pd.DataFrame({
+        'account_id': [f'acc{i:04d}' for i in rng.integers(0, n_accounts, n_rows)],
+        'transaction_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, n_days, n_rows), unit='D'),
+        'transaction_amount': rng.exponential(40, n_rows).round(2),
+    })
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24}{elapsed:8.2f} s  ({result['account_id'].nunique()} accounts)", flush=True)
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    history = make_history(args.accounts, args.days)
+    last_day = history['transaction_date'].max()
+    next_day = make_history(args.accounts, 1, seed=1).assign(transaction_date=last_day + pd.Timedelta(days=1))
+    extended = pd.concat([history, next_day], ignore_index=True)
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        timed('initial cold fit', lambda: forecast_all_accounts(history, n_jobs=args.n_jobs, cache_dir=cache_dir))
+        warm_cache, append_cache = os.path.join(cache_dir, 'warm'), os.path.join(cache_dir, 'append')
+        shutil.copytree(cache_dir, warm_cache, ignore=shutil.ignore_patterns('warm', 'append'))
+        shutil.copytree(cache_dir, append_cache, ignore=shutil.ignore_patterns('warm', 'append'))
+
+        cold = timed('next day, cold', lambda: forecast_all_accounts(extended, n_jobs=args.n_jobs))
+        warm = timed('next day, warm start', lambda: forecast_all_accounts(extended, n_jobs=args.n_jobs,
+                                                                             cache_dir=warm_cache, refit='warm'))
+        append = timed('next day, append', lambda: forecast_all_accounts(extended, n_jobs=args.n_jobs,
+                                                                          cache_dir=append_cache, refit='append'))
+        print(f"Speedup vs cold: warm {cold / warm:.1f}x, append {cold / append:.1f}x")
+    finally:
+        shutil.rmtree(cache_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+# benchmarks/run_benchmarks.py
+"""
+Time the public pipeline functions on synthetic datasets of increasing size.
+
+For every dataset size the synthetic transactions are taken through the pipeline
+once to build each function's input, then every case runs in a fresh process and
+records its wall time, throughput and peak resident memory growth. Results are
+written to benchmarks/results/ and compared against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10000 100000
+    python benchmarks/run_benchmarks.py --sizes 10000 --cases detect_anomalies prepare_time_series
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_data import generate_transactions
+from utils.load_data import _standardize, load_dataset
+from utils.dtype_optimizer import optimize_dtypes
+from utils.pipeline_runner import fingerprint_frame, run_pipeline_steps
+from utils.account_transaction_summary import generate_report
+from scripts.data_consolidation import consolidate_data
+from scripts.data_cleaning import handle_missing_values, correct_data_types, standardize_categories
+from scripts.feature_engineering import (create_derived_features, encode_categorical_variables,
+                                         normalize_numerical_features, create_advanced_features, ROLLING_WINDOWS)
+from scripts.rolling_features import compute_rolling_features
+from scripts.time_series_preparation import prepare_time_series
+from scripts.anomaly_detection import detect_anomalies
+from scripts.online_anomaly_detection import detect_anomalies_online
+from scripts.advanced_anomaly_detection import dbscan_anomalies, isolation_forest_anomalies
+from scripts.ml_pipeline import train_category_predictor
+from scripts.data_validation import validate_data
+from scripts.streaming_pipeline import run_streaming_pipeline
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+PIPELINE_STEPS = [
+    ("Data consolidation", consolidate_data),
+    ("Handling missing values", handle_missing_values),
+    ("Correcting data types", correct_data_types),
+    ("Standardizing categories", standardize_categories),
+    ("Creating derived features", create_derived_features),
+    ("Encoding categorical variables", encode_categorical_variables),
+    ("Normalizing numerical features", normalize_numerical_features),
+    ("Preparing time series", prepare_time_series),
+    ("Detecting anomalies", detect_anomalies),
+]
+
+# Pipeline inputs, each derived from the previous one
+def _raw_stage(n_rows, seed):
+    # As read from the Excel export: plain object strings
+    df = generate_transactions(n_rows, seed=seed)
+    for col in df.select_dtypes(include=['category']).columns:
+        df[col] = df[col].astype(object)
+    return df
+
+STAGES = {
+    'raw': None,
+    'loaded': ('raw', _standardize),
+    'cleaned': ('loaded', lambda df: standardize_categories(correct_data_types(handle_missing_values(consolidate_data(df))))),
+    'derived': ('cleaned', create_derived_features),
+    'encoded': ('derived', lambda df: normalize_numerical_features(encode_categorical_variables(df))),
+    'advanced': ('encoded', create_advanced_features),
+}
+
+# Case runners take the stage input and the working directory; they must be
+# module-level so worker processes can import them
+def _load_dataset(df, work_dir):
+    return load_dataset(os.path.join(work_dir, 'input.xlsx'), use_cache=False)
+
+def _setup_load_dataset(df, work_dir):
+    df.to_excel(os.path.join(work_dir, 'input.xlsx'), index=False)
+
+def _run_streaming(df, work_dir):
+    return run_streaming_pipeline(os.path.join(work_dir, 'stage_loaded.parquet'),
+                                  os.path.join(work_dir, 'streaming_output.parquet'))
+
+def _full_pipeline(df, work_dir):
+    return run_pipeline_steps(df, PIPELINE_STEPS)
+
+def _rolling_features(df, work_dir):
+    return compute_rolling_features(df, ROLLING_WINDOWS)
+
+def _sparse_encoding(df, work_dir):
+    return encode_categorical_variables(df, sparse=True)
+
+def _online_anomalies(df, work_dir):
+    return detect_anomalies_online(df)
+
+def _dbscan_per_account(df, work_dir):
+    return dbscan_anomalies(df, by='account_id', sample_size=5_000)
+
+def _forecast_all_accounts(df, work_dir):
+    # statsmodels and prophet are optional here; the case is reported as an error without them
+    from scripts.time_series_analysis import forecast_all_accounts
+    return forecast_all_accounts(df, model='arima')
+
+def _train_category_predictor(df, work_dir):
+    df = df.dropna(subset=['7day_avg', '30day_avg'])
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return train_category_predictor(df)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+# name -> (input stage, runner, setup, max_rows)
+CASES = {
+    'load_dataset': ('raw', _load_dataset, _setup_load_dataset, 10_000),
+    'optimize_dtypes': ('raw', lambda df, work_dir: optimize_dtypes(df), None, None),
+    'fingerprint_frame': ('loaded', lambda df, work_dir: fingerprint_frame(df), None, None),
+    'consolidate_data': ('loaded', lambda df, work_dir: consolidate_data(df), None, None),
+    'handle_missing_values': ('loaded', lambda df, work_dir: handle_missing_values(df), None, None),
+    'correct_data_types': ('loaded', lambda df, work_dir: correct_data_types(df), None, None),
+    'standardize_categories': ('cleaned', lambda df, work_dir: standardize_categories(df), None, None),
+    'create_derived_features': ('cleaned', lambda df, work_dir: create_derived_features(df), None, None),
+    'encode_categorical_variables': ('derived', lambda df, work_dir: encode_categorical_variables(df), None, None),
+    'encode_categorical_variables_sparse': ('derived', _sparse_encoding, None, None),
+    'normalize_numerical_features': ('derived', lambda df, work_dir: normalize_numerical_features(df), None, None),
+    'compute_rolling_features': ('cleaned', _rolling_features, None, None),
+    'create_advanced_features': ('encoded', lambda df, work_dir: create_advanced_features(df), None, None),
+    'prepare_time_series': ('encoded', lambda df, work_dir: prepare_time_series(df), None, None),
+    'detect_anomalies': ('encoded', lambda df, work_dir: detect_anomalies(df), None, None),
+    'detect_anomalies_online': ('encoded', _online_anomalies, None, None),
+    'validate_data': ('encoded', lambda df, work_dir: validate_data(df), None, None),
+    'generate_report': ('cleaned', lambda df, work_dir: generate_report(df), None, None),
+    'run_pipeline_steps': ('loaded', _full_pipeline, None, None),
+    'run_streaming_pipeline': ('loaded', _run_streaming, None, None),
+    'dbscan_anomalies': ('advanced', _dbscan_per_account, None, 1_000_000),
+    'isolation_forest_anomalies': ('advanced', lambda df, work_dir: isolation_forest_anomalies(df), None, None),
+    'train_category_predictor': ('advanced', _train_category_predictor, None, 100_000),
+    'forecast_all_accounts': ('cleaned', _forecast_all_accounts, None, 100_000),
+}
+
+def build_stages(n_rows, work_dir, stages, seed=0):
+    """Build the requested pipeline inputs for one dataset size as Parquet files."""
+    needed = set()
+    for stage in stages:
+        while stage is not None:
+            needed.add(stage)
+            stage = STAGES[stage][0] if STAGES[stage] else None
+
+    df = _raw_stage(n_rows, seed)
+    for stage in STAGES:
+        if stage not in needed:
+            break
+        if STAGES[stage] is not None:
+            df = STAGES[stage][1](df)
+        df.to_parquet(os.path.join(work_dir, f'stage_{stage}.parquet'), index=False)
+
+def _run_case(name, work_dir, repeat):
+    # Runs in a fresh worker process
+    stage, runner, setup, _ = CASES[name]
+    source = pd.read_parquet(os.path.join(work_dir, f'stage_{stage}.parquet'))
+    if setup is not None:
+        setup(source, work_dir)
+
+    timings = []
+    peak_growth_mb = None
+    for _ in range(repeat):
+        df = source.copy()
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        runner(df, work_dir)
+        timings.append(time.perf_counter() - start)
+        if peak_growth_mb is None:
+            peak_growth_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024
+    return min(timings), peak_growth_mb
+
+def run_suite(sizes, case_names, repeat=1, seed=0):
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for n_rows in sizes:
+        selected = [name for name in case_names if CASES[name][3] is None or n_rows <= CASES[name][3]]
+        if not selected:
+            continue
+        work_dir = tempfile.mkdtemp(prefix='bench_')
+        try:
+            print(f"Preparing inputs for {n_rows:,} rows...", flush=True)
+            build_stages(n_rows, work_dir, {CASES[name][0] for name in selected} | {'loaded'}, seed)
+            for name in selected:
+                result = {'case': name, 'rows': n_rows}
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        seconds, peak_mb = executor.submit(_run_case, name, work_dir, repeat).result()
+                    result.update({'status': 'ok', 'seconds': round(seconds, 4),
+                                   'rows_per_second': round(n_rows / seconds) if seconds > 0 else None,
+                                   'peak_rss_growth_mb': round(peak_mb, 1)})
+                except Exception as e:
+                    result.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+                results.append(result)
+                print(result, flush=True)
+        finally:
+            shutil.rmtree(work_dir)
+    return results
+
+def environment_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+def compare_with_baseline(results, baseline, threshold=1.2):
+    """
+    Compare timings with a baseline run.
+
+    Returns:
+    pd.DataFrame: One row per case and size present in both runs, with the ratio of
+    the new time to the baseline time and whether it exceeds `threshold`.
+    """
+    baseline_times = {(r['case'], r['rows']): r['seconds'] for r in baseline['results'] if r.get('status') == 'ok'}
+    rows = []
+    for result in results:
+        key = (result['case'], result['rows'])
+        if result.get('status') != 'ok' or key not in baseline_times:
+            continue
+        ratio = result['seconds'] / baseline_times[key] if baseline_times[key] else np.nan
+        rows.append({'case': result['case'], 'rows': result['rows'], 'baseline_seconds': baseline_times[key],
+                     'seconds': result['seconds'], 'ratio': round(ratio, 2), 'regression': ratio > threshold})
+    return pd.DataFrame(rows, columns=['case', 'rows', 'baseline_seconds', 'seconds', 'ratio', 'regression'])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES[:2],
+                        help=f"Dataset sizes in rows (suite sizes: {DEFAULT_SIZES})")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case; the fastest is kept")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline results to compare with")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.cases, repeat=args.repeat)
+    run = {'created_at': datetime.now().isoformat(timespec='seconds'), 'environment': environment_info(),
+           'sizes': args.sizes, 'results': results}
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(results_path, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults written to {results_path}")
+    print(pd.DataFrame(results).to_string(index=False))
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            comparison = compare_with_baseline(results, json.load(f), args.threshold)
+        print(f"\nComparison with {args.baseline}:")
+        print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            print(f"\n{int(comparison['regression'].sum())} case(s) slower than {args.threshold}x the baseline")
+    if args.save_baseline:
+        shutil.copyfile(results_path, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+
+if __name__ == '__main__':
+    main()
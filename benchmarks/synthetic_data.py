@@ -0,0 +1,247 @@
+# benchmarks/synthetic_data.py
+"""
+Synthetic transactions with the output schema of database/BASE_QUERY_IMPROVED.sql.
+
+Accounts belong to banks and have a type, balance and credit limits; each
+transaction picks a merchant, which fixes its category hierarchy, channel and
+location. Transaction counts per account are skewed, amounts are log-normal per
+category, weekdays and month starts/ends are busier than other days, and about
+15% of the transactions are inflows. Repeated string columns are generated as
+categoricals so large datasets stay cheap to build.
+
+Usage: python benchmarks/synthetic_data.py --rows 1000000 --output data_files/synthetic_1m.parquet
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BANKS = ['Chase', 'Bank of America', 'Wells Fargo', 'Capital One', 'TD Bank', 'MBNA']
+ACCOUNT_TYPES = [('depository', 'checking'), ('depository', 'savings'), ('credit', 'credit card'),
+                 ('loan', 'student'), ('investment', 'brokerage')]
+CATEGORIES = {
+    'FOOD_AND_DRINK': (['FOOD_AND_DRINK_RESTAURANT', 'FOOD_AND_DRINK_FAST_FOOD', 'FOOD_AND_DRINK_COFFEE'], 2.8, 0.7),
+    'GENERAL_MERCHANDISE': (['GENERAL_MERCHANDISE_SUPERSTORES', 'GENERAL_MERCHANDISE_ONLINE_MARKETPLACES'], 3.6, 0.9),
+    'TRANSPORTATION': (['TRANSPORTATION_TAXIS_AND_RIDE_SHARES', 'TRANSPORTATION_GAS'], 3.0, 0.6),
+    'TRAVEL': (['TRAVEL_FLIGHTS', 'TRAVEL_LODGING'], 5.5, 0.8),
+    'RENT_AND_UTILITIES': (['RENT_AND_UTILITIES_RENT', 'RENT_AND_UTILITIES_GAS_AND_ELECTRICITY'], 6.5, 0.5),
+    'ENTERTAINMENT': (['ENTERTAINMENT_TV_AND_MOVIES', 'ENTERTAINMENT_MUSIC_AND_AUDIO'], 2.5, 0.5),
+    'INCOME': (['INCOME_WAGES'], 7.5, 0.3),
+    'TRANSFER_IN': (['TRANSFER_IN_ACCOUNT_TRANSFER'], 6.0, 1.0),
+}
+CITIES = [('Toronto', 'ON', 'CA', 43.65, -79.38), ('Vancouver', 'BC', 'CA', 49.28, -123.12),
+          ('New York', 'NY', 'US', 40.71, -74.01), ('Chicago', 'IL', 'US', 41.88, -87.63),
+          ('Austin', 'TX', 'US', 30.27, -97.74)]
+PAYMENT_CHANNELS = ['in store', 'online', 'other']
+CONFIDENCE_LEVELS = ['VERY_HIGH', 'HIGH', 'MEDIUM', 'LOW']
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+def _accounts(n_accounts, rng):
+    type_codes = rng.choice(len(ACCOUNT_TYPES), n_accounts, p=[0.4, 0.2, 0.25, 0.05, 0.1])
+    account_type = np.array([ACCOUNT_TYPES[i][0] for i in type_codes])
+    is_liability = np.isin(account_type, ['credit', 'loan'])
+    limit = np.where(is_liability, rng.choice([1000, 2500, 5000, 10000, 20000], n_accounts), 0).astype(float)
+    balance = np.where(is_liability, limit * rng.uniform(0, 0.9, n_accounts), rng.lognormal(8, 1.2, n_accounts)).round(2)
+    bank_codes = rng.integers(0, len(BANKS), n_accounts)
+    return pd.DataFrame({
+        'bank_id': [f'item_{code:03d}' for code in bank_codes],
+        'bank_name': np.array(BANKS)[bank_codes],
+        'account_id': [f'acc_{i:07d}' for i in range(n_accounts)],
+        'account_name': [f'{ACCOUNT_TYPES[i][1].title()} Account' for i in type_codes],
+        'account_official_name': [f'{BANKS[b]} {ACCOUNT_TYPES[i][1].title()}' for b, i in zip(bank_codes, type_codes)],
+        'account_mask': rng.integers(0, 10000, n_accounts),
+        'account_days_available': rng.choice([90, 180, 365, 730], n_accounts),
+        'account_type': account_type,
+        'account_subtype': [ACCOUNT_TYPES[i][1] for i in type_codes],
+        'account_current_balance': balance,
+        'account_limit_available': np.where(is_liability, limit - balance, balance).round(2),
+        'account_limit': limit,
+        'account_iso_currency_code': rng.choice(['CAD', 'USD'], n_accounts, p=[0.7, 0.3]),
+        'account_margin_loan_amount': np.where(account_type == 'investment', rng.uniform(0, 5000, n_accounts).round(2), 0.0),
+        'account_is_asset': (~is_liability).astype(int),
+        'account_is_liability': is_liability.astype(int),
+        'account_purchase_annual_interest_rate': np.where(account_type == 'credit', rng.choice([19.99, 22.99, 29.99], n_accounts), 0.0),
+        'account_cash_annual_interest_rate': np.where(account_type == 'credit', rng.choice([22.99, 24.99], n_accounts), 0.0),
+        'account_balance_transfer_annual_interest_rate': np.where(account_type == 'credit', rng.choice([0.0, 3.99, 12.99], n_accounts), 0.0),
+    })
+
+def _merchants(n_merchants, rng):
+    primaries = list(CATEGORIES)
+    primary_codes = rng.choice(len(primaries), n_merchants, p=[0.3, 0.2, 0.15, 0.05, 0.05, 0.1, 0.1, 0.05])
+    detailed = [rng.choice(CATEGORIES[primaries[code]][0]) for code in primary_codes]
+    return pd.DataFrame({
+        'merchant_name': [f'MERCHANT {i:05d}' for i in range(n_merchants)],
+        'merchant_entity_id': [f'ent_{i:08x}' for i in range(n_merchants)],
+        'personal_finance_category_primary': np.array(primaries)[primary_codes],
+        'personal_finance_category_detailed': detailed,
+        'payment_channel': rng.choice(PAYMENT_CHANNELS, n_merchants, p=[0.5, 0.4, 0.1]),
+        'city_code': rng.integers(0, len(CITIES), n_merchants),
+        'weight': rng.zipf(1.6, n_merchants).astype(float),
+    })
+
+def _transaction_dates(n_rows, start, end, rng):
+    days = pd.date_range(start, end, freq='D')
+    weights = np.where(days.dayofweek < 5, 1.0, 0.7)
+    weights[(days.day <= 2) | days.is_month_end] *= 1.8
+    return days[rng.choice(len(days), n_rows, p=weights / weights.sum())]
+
+def _accounts_and_merchants(n_rows, n_accounts, n_merchants, rng):
+    n_accounts = n_accounts or max(10, n_rows // 200)
+    n_merchants = n_merchants or max(20, n_rows // 100)
+    accounts = _accounts(n_accounts, rng)
+    merchants = _merchants(n_merchants, rng)
+    # Skewed activity: a few accounts make most of the transactions
+    accounts['weight'] = rng.pareto(1.5, n_accounts) + 1
+    return accounts, merchants
+
+def generate_accounts_and_merchants(n_rows, n_accounts=None, n_merchants=None, seed=0):
+    """
+    Generate the accounts and merchants that transactions are drawn from, so several
+    `generate_transactions` calls can share them.
+
+    Returns:
+    tuple: (accounts DataFrame, merchants DataFrame)
+    """
+    return _accounts_and_merchants(n_rows, n_accounts, n_merchants, np.random.default_rng(seed))
+
+def generate_transactions(n_rows, n_accounts=None, n_merchants=None, start='2024-01-01', end='2024-07-31', seed=0,
+                          accounts=None, merchants=None):
+    """
+    Generate `n_rows` transactions in the BASE_QUERY_IMPROVED output schema.
+
+    Args:
+    n_rows (int): Number of transactions.
+    n_accounts (int): Number of accounts; defaults to one per 200 transactions.
+    n_merchants (int): Number of merchants; defaults to one per 100 transactions.
+    start, end (str): Date range of the transactions.
+    seed (int): Random seed; the same arguments always give the same data.
+    accounts, merchants (pd.DataFrame): From `generate_accounts_and_merchants`, to draw
+        the transactions from instead of new accounts and merchants.
+
+    Returns:
+    pd.DataFrame: The synthetic transactions, ordered by date.
+    """
+    rng = np.random.default_rng(seed)
+    if accounts is None or merchants is None:
+        accounts, merchants = _accounts_and_merchants(n_rows, n_accounts, n_merchants, rng)
+    n_accounts, n_merchants = len(accounts), len(merchants)
+
+    account_codes = rng.choice(n_accounts, n_rows, p=accounts['weight'] / accounts['weight'].sum())
+    merchant_codes = rng.choice(n_merchants, n_rows, p=merchants['weight'] / merchants['weight'].sum())
+    dates = _transaction_dates(n_rows, start, end, rng)
+    order = np.argsort(dates.values, kind='stable')
+    account_codes, merchant_codes, dates = account_codes[order], merchant_codes[order], dates[order]
+
+    df = accounts.drop(columns='weight').iloc[account_codes].reset_index(drop=True)
+    merchant_rows = merchants.iloc[merchant_codes].reset_index(drop=True)
+
+    primary = merchant_rows['personal_finance_category_primary'].to_numpy()
+    mu = pd.Series({key: value[1] for key, value in CATEGORIES.items()})[primary].to_numpy()
+    sigma = pd.Series({key: value[2] for key, value in CATEGORIES.items()})[primary].to_numpy()
+    magnitude = rng.lognormal(mu, sigma).round(2)
+    is_inflow = np.isin(primary, ['INCOME', 'TRANSFER_IN']) | (rng.random(n_rows) < 0.03)
+    amount = np.where(is_inflow, magnitude, -magnitude)
+
+    authorized = dates - pd.to_timedelta(rng.choice([0, 0, 0, 1, 2], n_rows), unit='D')
+    city = np.array(CITIES, dtype=object)[merchant_rows['city_code'].to_numpy()]
+    transaction_ids = np.char.add('txn_', np.char.zfill(np.arange(n_rows).astype(str), 10))
+    pending = rng.random(n_rows) < 0.02
+    day_of_week = dates.dayofweek.to_numpy()
+
+    df['transaction_id'] = transaction_ids
+    df['transaction_amount'] = amount
+    df['is_transaction_inflow'] = (amount > 0).astype(int)
+    df['is_transaction_outflow'] = (amount < 0).astype(int)
+    df['transaction_amount_absolute'] = magnitude
+    df['transaction_authorized_date'] = authorized
+    df['transaction_authorized_day'] = authorized.day
+    df['transaction_date'] = dates
+    df['iso_currency_code'] = df['account_iso_currency_code']
+    df['transaction_logo_url'] = _categorical(merchant_codes % 50, [f'https://logos.example.com/{i}.png' for i in range(50)])
+    df['merchant_entity_id'] = merchant_rows['merchant_entity_id']
+    df['merchant_name'] = merchant_rows['merchant_name']
+    df['transaction_name'] = merchant_rows['merchant_name'].str.title()
+    df['payment_channel'] = merchant_rows['payment_channel']
+    df['transaction_pending'] = pending.astype(int)
+    df['pending_transaction_id'] = np.where(pending, np.char.add('p', transaction_ids), None)
+    df['transaction_code'] = None
+    df['transaction_type'] = np.where(merchant_rows['payment_channel'] == 'online', 'digital', 'place')
+    df['unofficial_currency_code'] = None
+    df['personal_finance_category_confidence_level'] = _categorical(rng.choice(4, n_rows, p=[0.5, 0.3, 0.15, 0.05]), CONFIDENCE_LEVELS)
+    df['personal_finance_category_detailed'] = merchant_rows['personal_finance_category_detailed']
+    df['personal_finance_category_primary'] = primary
+    df['personal_finance_category_icon_url'] = [f'https://plaid-category-icons.plaid.com/PFC_{p}.png' for p in primary]
+    df['location_address'] = _categorical(merchant_codes % 1000, [f'{i} Main St' for i in range(1000)])
+    df['location_city'] = city[:, 0]
+    df['location_region'] = city[:, 1]
+    df['location_postal_code'] = None
+    df['location_country'] = city[:, 2]
+    df['location_lat'] = (city[:, 3].astype(float) + rng.normal(0, 0.05, n_rows)).round(4)
+    df['location_lon'] = (city[:, 4].astype(float) + rng.normal(0, 0.05, n_rows)).round(4)
+    df['location_store_number'] = None
+    for col in ['payment_meta_reference_number', 'payment_meta_ppd_id', 'payment_meta_payee', 'payment_meta_by_order_of',
+                'payment_meta_payer', 'payment_meta_payment_method', 'payment_meta_payment_processor', 'payment_meta_reason']:
+        df[col] = None
+    df['merchant_website'] = merchant_rows['merchant_name'].str.lower().str.replace(' ', '') + '.com'
+    df['check_number'] = None
+    # WEEKDAY in MySQL: 0 = Monday ... 6 = Sunday
+    df['transaction_day_of_week'] = day_of_week
+    df['transaction_month'] = dates.month
+    df['transaction_year'] = dates.year
+    df['is_weekend_transaction'] = (day_of_week >= 5).astype(int)
+    df['transaction_category_group'] = np.where(is_inflow, 'special', 'place')
+    df['transaction_hierarchy_level1'] = primary
+    df['transaction_hierarchy_level2'] = merchant_rows['personal_finance_category_detailed'].to_numpy()
+    df['transaction_hierarchy_level3'] = None
+
+    for col in df.columns:
+        if df[col].dtype == object and df[col].notna().any() and df[col].nunique() < len(df) // 10:
+            df[col] = df[col].astype('category')
+    return df
+
+def _without_null_fields(schema):
+    """
+    The schema with `null` fields typed as strings. A column with no value in the
+    first chunk (e.g. pending_transaction_id in a small chunk) is inferred as
+    `null`, which later chunks holding values could not be cast to.
+    """
+    return pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in schema],
+                     metadata=schema.metadata)
+
+def write_synthetic_dataset(path, n_rows, chunk_rows=1_000_000, seed=0, n_accounts=None, n_merchants=None, **kwargs):
+    """
+    Write a synthetic dataset to Parquet in chunks, so datasets larger than memory
+    (e.g. 10M rows) can be produced. The accounts and merchants are generated once
+    for the whole dataset; each chunk draws its transactions with its own seed.
+    """
+    accounts, merchants = generate_accounts_and_merchants(n_rows, n_accounts, n_merchants, seed)
+    writer = None
+    try:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            chunk = generate_transactions(min(chunk_rows, n_rows - start), seed=seed + i + 1, accounts=accounts,
+                                          merchants=merchants, **kwargs)
+            chunk['transaction_id'] = chunk['transaction_id'].str.replace('txn_', f'txn_{i:03d}_', regex=False)
+            for col in chunk.select_dtypes(include=['category']).columns:
+                chunk[col] = chunk[col].astype(object)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, _without_null_fields(table.schema))
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_synthetic_dataset(args.output, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")
@@ -1,8 +1,12 @@
 -- Adding CTEs to simplify the query and improve readability and potential performance
+-- Run through utils/query_runner.py, which binds the start_date, end_date, filter_accounts
+-- and account_ids parameters (NULL dates and filter_accounts = 0 disable the filters)
 WITH
 account_info AS (
     SELECT
         ac.account_id,
+        ac.asset_report_id,
+        ac.item_id,
         ac.name AS account_name,
         ac.official_name AS account_official_name,
         COALESCE(ac.mask, 0) AS account_mask,
@@ -11,7 +15,7 @@ account_info AS (
         ac.subtype AS account_subtype,
         COALESCE(ac.current, 0) AS account_current_balance,
         COALESCE(ac.available, 0) AS account_limit_available,
-        COALESCE(ac.limit, 0) AS account_limit,
+        COALESCE(ac.`limit`, 0) AS account_limit,
         COALESCE(ac.iso_currency_code, ac.unofficial_currency_code) AS account_iso_currency_code,
         COALESCE(ac.margin_loan_amount, 0) AS account_margin_loan_amount,
         MAX(IF(ac.type IN ('depository', 'investment'), 1, 0)) AS account_is_asset,
@@ -19,13 +23,14 @@ account_info AS (
     FROM
         asset_account ac
     GROUP BY
-        ac.account_id, ac.name, ac.official_name, ac.mask, ac.days_available,
-        ac.type, ac.subtype, ac.current, ac.available, ac.limit, ac.iso_currency_code,
+        ac.account_id, ac.asset_report_id, ac.item_id, ac.name, ac.official_name, ac.mask, ac.days_available,
+        ac.type, ac.subtype, ac.current, ac.available, ac.`limit`, ac.iso_currency_code,
         ac.unofficial_currency_code, ac.margin_loan_amount
 ),
 transaction_info AS (
     SELECT
         pt.transaction_id,
+        pt.account_id,
         COALESCE(pt.amount * -1, 0) AS transaction_amount,
         MAX(IF(COALESCE(pt.amount * -1, 0) > 0, 1, 0)) AS is_transaction_inflow,
         MAX(IF(COALESCE(pt.amount * -1, 0) < 0, 1, 0)) AS is_transaction_outflow,
@@ -66,7 +71,7 @@ transaction_info AS (
         pt.payment_meta_reason AS payment_meta_reason,
         pt.website AS merchant_website,
         pt.check_number AS check_number,
-        DAYOFWEEK(pt.date) AS transaction_day_of_week,
+        WEEKDAY(pt.date) AS transaction_day_of_week, -- Monday = 0, like dayofweek in pandas
         MONTH(pt.date) AS transaction_month,
         YEAR(pt.date) AS transaction_year,
         MAX(IF(DAYOFWEEK(pt.date) IN (1, 7), 1, 0)) AS is_weekend_transaction,
@@ -78,8 +83,12 @@ transaction_info AS (
         plaid_transactions pt
     LEFT JOIN
         plaid.categories cat ON pt.category_id = cat.category_id
+    WHERE
+        (:start_date IS NULL OR pt.date >= :start_date)
+        AND (:end_date IS NULL OR pt.date <= :end_date)
+        AND (:filter_accounts = 0 OR pt.account_id IN :account_ids)
     GROUP BY
-        pt.transaction_id, pt.amount, pt.authorized_date, pt.date, pt.iso_currency_code,
+        pt.transaction_id, pt.account_id, pt.amount, pt.authorized_date, pt.date, pt.iso_currency_code,
         pt.unofficial_currency_code, pt.logo_url, pt.merchant_entity_id, pt.merchant_name,
         pt.name, pt.payment_channel, pt.pending, pt.pending_transaction_id, pt.transaction_code,
         pt.transaction_type, pt.personal_finance_category_confidence_level, pt.personal_finance_category_detailed,
@@ -112,54 +121,54 @@ SELECT
     MAX(IF(plca.apr_type = 'cash_apr', plca.apr_percentage, 0)) AS account_cash_annual_interest_rate,
     MAX(IF(plca.apr_type = 'balance_transfer_apr', plca.apr_percentage, 0)) AS account_balance_transfer_annual_interest_rate,
     tr.transaction_id,
-    tr.transaction_amount,
-    tr.is_transaction_inflow,
-    tr.is_transaction_outflow,
-    tr.transaction_amount_absolute,
-    tr.transaction_authorized_date,
-    tr.transaction_authorized_day,
-    tr.transaction_date,
-    tr.iso_currency_code,
-    tr.transaction_logo_url,
-    tr.merchant_entity_id,
-    tr.merchant_name,
-    tr.transaction_name,
-    tr.payment_channel,
-    tr.transaction_pending,
-    tr.pending_transaction_id,
-    tr.transaction_code,
-    tr.transaction_type,
-    tr.unofficial_currency_code,
-    tr.personal_finance_category_confidence_level,
-    tr.personal_finance_category_detailed,
-    tr.personal_finance_category_primary,
-    tr.personal_finance_category_icon_url,
-    tr.location_address,
-    tr.location_city,
-    tr.location_region,
-    tr.location_postal_code,
-    tr.location_country,
-    tr.location_lat,
-    tr.location_lon,
-    tr.location_store_number,
-    tr.payment_meta_reference_number,
-    tr.payment_meta_ppd_id,
-    tr.payment_meta_payee,
-    tr.payment_meta_by_order_of,
-    tr.payment_meta_payer,
-    tr.payment_meta_payment_method,
-    tr.payment_meta_payment_processor,
-    tr.payment_meta_reason,
-    tr.merchant_website,
-    tr.check_number,
-    tr.transaction_day_of_week,
-    tr.transaction_month,
-    tr.transaction_year,
-    tr.is_weekend_transaction,
-    tr.transaction_category_group,
-    tr.transaction_hierarchy_level1,
-    tr.transaction_hierarchy_level2,
-    tr.transaction_hierarchy_level3
+    pt.transaction_amount,
+    pt.is_transaction_inflow,
+    pt.is_transaction_outflow,
+    pt.transaction_amount_absolute,
+    pt.transaction_authorized_date,
+    pt.transaction_authorized_day,
+    pt.transaction_date,
+    pt.iso_currency_code,
+    pt.transaction_logo_url,
+    pt.merchant_entity_id,
+    pt.merchant_name,
+    pt.transaction_name,
+    pt.payment_channel,
+    pt.transaction_pending,
+    pt.pending_transaction_id,
+    pt.transaction_code,
+    pt.transaction_type,
+    pt.unofficial_currency_code,
+    pt.personal_finance_category_confidence_level,
+    pt.personal_finance_category_detailed,
+    pt.personal_finance_category_primary,
+    pt.personal_finance_category_icon_url,
+    pt.location_address,
+    pt.location_city,
+    pt.location_region,
+    pt.location_postal_code,
+    pt.location_country,
+    pt.location_lat,
+    pt.location_lon,
+    pt.location_store_number,
+    pt.payment_meta_reference_number,
+    pt.payment_meta_ppd_id,
+    pt.payment_meta_payee,
+    pt.payment_meta_by_order_of,
+    pt.payment_meta_payer,
+    pt.payment_meta_payment_method,
+    pt.payment_meta_payment_processor,
+    pt.payment_meta_reason,
+    pt.merchant_website,
+    pt.check_number,
+    pt.transaction_day_of_week,
+    pt.transaction_month,
+    pt.transaction_year,
+    pt.is_weekend_transaction,
+    pt.transaction_category_group,
+    pt.transaction_hierarchy_level1,
+    pt.transaction_hierarchy_level2,
+    pt.transaction_hierarchy_level3
 FROM
     asset_report re
 INNER JOIN
@@ -177,15 +186,15 @@ GROUP BY
     ac.account_name, ac.account_official_name, ac.account_mask, ac.account_days_available, ac.account_type,
     ac.account_subtype, ac.account_current_balance, ac.account_limit_available, ac.account_limit,
     ac.account_iso_currency_code, ac.account_margin_loan_amount, ac.account_is_asset, ac.account_is_liability,
-    tr.transaction_amount, tr.is_transaction_inflow, tr.is_transaction_outflow, tr.transaction_amount_absolute,
-    tr.transaction_authorized_date, tr.transaction_authorized_day, tr.transaction_date, tr.iso_currency_code,
-    tr.transaction_logo_url, tr.merchant_entity_id, tr.merchant_name, tr.transaction_name, tr.payment_channel,
-    tr.transaction_pending, tr.pending_transaction_id, tr.transaction_code, tr.transaction_type,
-    tr.unofficial_currency_code, tr.personal_finance_category_confidence_level, tr.personal_finance_category_detailed,
-    tr.personal_finance_category_primary, tr.personal_finance_category_icon_url, tr.location_address,
-    tr.location_city, tr.location_region, tr.location_postal_code, tr.location_country, tr.location_lat,
-    tr.location_lon, tr.location_store_number, tr.payment_meta_reference_number, tr.payment_meta_ppd_id,
-    tr.payment_meta_payee, tr.payment_meta_by_order_of, tr.payment_meta_payer, tr.payment_meta_payment_method,
-    tr.payment_meta_payment_processor, tr.payment_meta_reason, tr.merchant_website, tr.check_number, tr.transaction_day_of_week,
-    tr.transaction_month, tr.transaction_year, tr.is_weekend_transaction, tr.transaction_category_group,
-    tr.transaction_hierarchy_level1, tr.transaction_hierarchy_level2, tr.transaction_hierarchy_level3
+    pt.transaction_amount, pt.is_transaction_inflow, pt.is_transaction_outflow, pt.transaction_amount_absolute,
+    pt.transaction_authorized_date, pt.transaction_authorized_day, pt.transaction_date, pt.iso_currency_code,
+    pt.transaction_logo_url, pt.merchant_entity_id, pt.merchant_name, pt.transaction_name, pt.payment_channel,
+    pt.transaction_pending, pt.pending_transaction_id, pt.transaction_code, pt.transaction_type,
+    pt.unofficial_currency_code, pt.personal_finance_category_confidence_level, pt.personal_finance_category_detailed,
+    pt.personal_finance_category_primary, pt.personal_finance_category_icon_url, pt.location_address,
+    pt.location_city, pt.location_region, pt.location_postal_code, pt.location_country, pt.location_lat,
+    pt.location_lon, pt.location_store_number, pt.payment_meta_reference_number, pt.payment_meta_ppd_id,
+    pt.payment_meta_payee, pt.payment_meta_by_order_of, pt.payment_meta_payer, pt.payment_meta_payment_method,
+    pt.payment_meta_payment_processor, pt.payment_meta_reason, pt.merchant_website, pt.check_number, pt.transaction_day_of_week,
+    pt.transaction_month, pt.transaction_year, pt.is_weekend_transaction, pt.transaction_category_group,
+    pt.transaction_hierarchy_level1, pt.transaction_hierarchy_level2, pt.transaction_hierarchy_level3
@@ -1,20 +1,28 @@
 # main.py
 import os
 import sys
+import argparse
 import logging
+import sqlalchemy
 from datetime import datetime
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(project_root)
 
-from utils.load_data import load_dataset
+from utils.load_data import load_dataset, cache_dataset
+from utils.pipeline_runner import run_pipeline_steps
+from utils.transformer_store import save_transformers, load_transformers
+from utils.profiling import PipelineProfiler
+from utils.query_runner import load_transactions, PUSHDOWN_FEATURES
+from utils.output_writer import write_output, OUTPUT_FORMATS, EXCEL_MAX_ROWS
 from scripts.data_consolidation import consolidate_data
 from scripts.data_cleaning import handle_missing_values, correct_data_types, standardize_categories
 from scripts.feature_engineering import create_derived_features, encode_categorical_variables, normalize_numerical_features
 from scripts.time_series_preparation import prepare_time_series
 from scripts.anomaly_detection import detect_anomalies
 from scripts.data_validation import validate_data
+from scripts.streaming_pipeline import run_streaming_pipeline, iter_chunks, fit_streaming_statistics, transform_batch
 
 def setup_logging():
     logging.basicConfig(level=logging.INFO,
@@ -26,33 +34,136 @@ def setup_logging():
     console.setFormatter(formatter)
     logging.getLogger('').addHandler(console)
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Finance data preparation pipeline")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Process the data in bounded chunks with a two-pass fit/transform design")
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                        help="Rows per chunk in streaming mode")
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help="Worker processes for the per-account steps (-1 or 0 for all cores)")
+    parser.add_argument('--cache-steps', action='store_true',
+                        help="Reuse cached step outputs when a step's input and code are unchanged")
+    parser.add_argument('--fit-transformers', action='store_true',
+                        help="Fit the scaler and encoders over the full history and save them as a new version")
+    parser.add_argument('--transform-only', metavar='BATCH_FILE',
+                        help="Transform a new batch with the latest saved transformers, without refitting")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record per-step timings, memory and shapes to profiles/step_metrics.jsonl")
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help="Also write a cProfile dump per step (implies --profile)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Also trace Python allocation peaks, slower (implies --profile)")
+    parser.add_argument('--output-format', choices=sorted(OUTPUT_FORMATS), default='parquet',
+                        help="Format of the processed data (parquet is partitioned by account and month)")
+    parser.add_argument('--excel-export', action='store_true',
+                        help="Also write a size-capped Excel export for reporting")
+    parser.add_argument('--excel-max-rows', type=int, default=EXCEL_MAX_ROWS,
+                        help="Rows included in the Excel export")
+    parser.add_argument('--db-url',
+                        help="Load transactions with the base query from this SQLAlchemy URL instead of the Excel export")
+    parser.add_argument('--start-date', help="With --db-url, first transaction date to load (YYYY-MM-DD)")
+    parser.add_argument('--end-date', help="With --db-url, last transaction date to load (YYYY-MM-DD)")
+    parser.add_argument('--accounts', nargs='+', metavar='ACCOUNT_ID',
+                        help="With --db-url, only load these accounts")
+    parser.add_argument('--no-push-down', action='store_true',
+                        help="With --db-url, compute the derived features in pandas instead of SQL")
+    args = parser.parse_args(argv)
+    if args.profile_cpu or args.trace_memory:
+        args.profile = True
+    return args
+
+def run_streaming(file_path, output_dir, chunk_size):
+    parquet_path, _ = cache_dataset(file_path)
+    if parquet_path is None:
+        raise RuntimeError(f"Streaming mode requires a Parquet cache of {file_path}")
+
+    output_file = os.path.join(output_dir, "processed_data.parquet")
+    validation_results = run_streaming_pipeline(parquet_path, output_file, chunk_size=chunk_size)
+    for key, value in validation_results.items():
+        logging.info(f"Validation - {key}: {value}")
+    logging.info(f"Processed data saved to {output_file}")
+    logging.warning("Time series preparation and anomaly detection are skipped in streaming mode")
+
+def fit_transformers(file_path, store_dir, chunk_size):
+    parquet_path, _ = cache_dataset(file_path)
+    if parquet_path is None:
+        raise RuntimeError(f"Fitting transformers requires a Parquet cache of {file_path}")
+
+    statistics = fit_streaming_statistics(iter_chunks(parquet_path, chunk_size))
+    version = save_transformers(statistics, store_dir,
+                                metadata={'source': os.path.basename(file_path), 'rows': statistics['total_rows']})
+    logging.info(f"Transformers version {version} fitted over {statistics['total_rows']} rows")
+
+def run_transform_only(batch_path, store_dir, output_dir):
+    statistics, version = load_transformers(store_dir)
+    logging.info(f"Using transformers version {version}")
+    df = transform_batch(load_dataset(batch_path, use_cache=False), statistics)
+
+    output_file = os.path.join(output_dir, f"transformed_{os.path.splitext(os.path.basename(batch_path))[0]}.parquet")
+    df.to_parquet(output_file, index=False)
+    logging.info(f"Transformed batch saved to {output_file}")
+
+def main(argv=None):
+    args = parse_args(argv)
     setup_logging()
     logging.info("Starting data preparation process")
 
     try:
-        # Load data
         file_path = os.path.join(project_root, "data_files", "base_all_accounts_transactions_Jan24-July24.xlsx")
-        df = load_dataset(file_path)
+        output_dir = os.path.join(project_root, "database")
+        os.makedirs(output_dir, exist_ok=True)
+
+        transformer_store_dir = os.path.join(project_root, "data_files", "transformers")
+        if args.fit_transformers:
+            fit_transformers(file_path, transformer_store_dir, args.chunk_size)
+            return
+        if args.transform_only:
+            run_transform_only(args.transform_only, transformer_store_dir, output_dir)
+            return
+
+        if args.streaming:
+            logging.info(f"Running in streaming mode with chunks of {args.chunk_size} rows")
+            run_streaming(file_path, output_dir, args.chunk_size)
+            logging.info("Data preparation process completed successfully")
+            return
+
+        # Load data
+        precomputed = ()
+        if args.db_url:
+            engine = sqlalchemy.create_engine(args.db_url, pool_pre_ping=True)
+            df = load_transactions(engine, start_date=args.start_date, end_date=args.end_date,
+                                   account_ids=args.accounts, push_down=not args.no_push_down)
+            if not args.no_push_down:
+                precomputed = PUSHDOWN_FEATURES
+        else:
+            df = load_dataset(file_path)
         logging.info("Data loaded successfully")
 
         # Data preparation steps
+        n_jobs = args.n_jobs if args.n_jobs > 0 else None
         steps = [
             ("Data consolidation", consolidate_data),
             ("Handling missing values", handle_missing_values),
             ("Correcting data types", correct_data_types),
             ("Standardizing categories", standardize_categories),
-            ("Creating derived features", create_derived_features),
+            ("Creating derived features", create_derived_features, {'precomputed': list(precomputed)}),
             ("Encoding categorical variables", encode_categorical_variables),
             ("Normalizing numerical features", normalize_numerical_features),
-            ("Preparing time series", prepare_time_series),
-            ("Detecting anomalies", detect_anomalies)
+            ("Preparing time series", prepare_time_series, {'n_jobs': n_jobs}),
+            ("Detecting anomalies", detect_anomalies, {'n_jobs': n_jobs})
         ]
 
-        for step_name, step_function in steps:
-            logging.info(f"Starting {step_name}")
-            df = step_function(df)
-            logging.info(f"{step_name} completed successfully")
+        step_cache_dir = os.path.join(project_root, "data_files", ".cache", "steps") if args.cache_steps else None
+        profiler = None
+        if args.profile:
+            profile_dir = os.path.join(project_root, "profiles")
+            profiler = PipelineProfiler(metrics_path=os.path.join(profile_dir, "step_metrics.jsonl"),
+                                        profile_dir=profile_dir if args.profile_cpu else None,
+                                        trace_memory=args.trace_memory)
+        df = run_pipeline_steps(df, steps, cache_dir=step_cache_dir, profiler=profiler)
+        if profiler is not None:
+            profiler.log_summary()
 
         # Data validation
         logging.info("Starting data validation")
@@ -61,11 +172,11 @@ def main():
             logging.info(f"Validation - {key}: {value}")
 
         # Save processed data
-        output_dir = os.path.join(project_root, "database")
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, "processed_data.xlsx")
-        df.to_excel(output_file, index=False)
+        output_file = write_output(df, output_dir, args.output_format)
         logging.info(f"Processed data saved to {output_file}")
+        if args.excel_export and args.output_format != 'excel':
+            report_file = write_output(df, output_dir, 'excel', max_rows=args.excel_max_rows)
+            logging.info(f"Excel report saved to {report_file}")
 
         logging.info("Data preparation process completed successfully")
 
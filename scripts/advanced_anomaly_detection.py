@@ -1,14 +1,193 @@
+import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.cluster import DBSCAN
+import pyarrow as pa
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed
+from sklearn.neighbors import NearestNeighbors
+from utils.partitioned_executor import run_partitioned
+from scripts.streaming_pipeline import iter_chunks
 
-def isolation_forest_anomalies(df):
-    clf = IsolationForest(contamination=0.1, random_state=42)
-    df['is_anomaly_isolation_forest'] = clf.fit_predict(df[['transaction_amount', '7day_avg', '30day_avg']])
+ANOMALY_FEATURES = ['transaction_amount', '7day_avg', '30day_avg']
+
+def _anomaly_feature_matrix(df):
+    """
+    Feature matrix for the anomaly models and the mask of rows that can be scored.
+
+    Missing rolling averages (no earlier transaction in the window) fall back to the
+    transaction amount itself; rows with a missing amount are left out.
+    """
+    X = df[ANOMALY_FEATURES].to_numpy(dtype=float)
+    for i in range(1, X.shape[1]):
+        X[:, i] = np.where(np.isnan(X[:, i]), X[:, 0], X[:, i])
+    return X, ~np.isnan(X[:, 0])
+
+def fit_isolation_forest(df, contamination=0.1, max_samples='auto', sample_size=None, n_jobs=None, random_state=42):
+    """
+    Fit an IsolationForest on the anomaly features, to be scored later without refitting.
+
+    Args:
+    df (pd.DataFrame): History with the advanced features.
+    contamination (float): Expected share of anomalies.
+    max_samples: Rows drawn to build each tree (see IsolationForest).
+    sample_size (int): Fit on a random subset of at most this many rows.
+    n_jobs (int): Cores used to build the trees (None for one, -1 for all).
+    random_state (int): Seed for the subset and the forest.
+
+    Returns:
+    IsolationForest: The fitted model; persist it with `utils.transformer_store.save_transformers`.
+    """
+    X, valid = _anomaly_feature_matrix(df)
+    X = X[valid]
+    if sample_size is not None and len(X) > sample_size:
+        X = X[np.random.default_rng(random_state).choice(len(X), sample_size, replace=False)]
+    model = IsolationForest(contamination=contamination, max_samples=max_samples, n_jobs=n_jobs,
+                            random_state=random_state)
+    return model.fit(X)
+
+def score_isolation_forest(df, model, batch_size=100_000, n_jobs=1):
+    """
+    Score transactions with a fitted IsolationForest in fixed-size batches.
+
+    `is_anomaly_isolation_forest` is -1 for anomalies and 1 otherwise, as returned
+    by IsolationForest.predict. Rows with a missing amount are not scored and get 1.
+    With `n_jobs` other than 1 the batches are scored on a thread pool.
+    """
+    X, valid = _anomaly_feature_matrix(df)
+    X = X[valid]
+    batches = [X[start:start + batch_size] for start in range(0, len(X), batch_size)]
+    if n_jobs != 1 and len(batches) > 1:
+        predictions = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(model.predict)(batch) for batch in batches)
+    else:
+        predictions = [model.predict(batch) for batch in batches]
+
+    labels = np.ones(len(df), dtype=int)
+    if predictions:
+        labels[valid] = np.concatenate(predictions)
+    df['is_anomaly_isolation_forest'] = labels
     return df
 
-def dbscan_anomalies(df):
-    dbscan = DBSCAN(eps=0.5, min_samples=5)
-    df['is_anomaly_dbscan'] = dbscan.fit_predict(df[['transaction_amount', '7day_avg', '30day_avg']])
+def score_isolation_forest_file(parquet_path, model, output_path, chunk_size=100_000):
+    """
+    Score a Parquet file that does not fit in memory chunk by chunk and stream the
+    scored rows to `output_path`.
+
+    Returns:
+    int: Number of rows flagged as anomalies.
+    """
+    writer = None
+    anomalies = 0
+    try:
+        for chunk in iter_chunks(parquet_path, chunk_size):
+            chunk = score_isolation_forest(chunk, model, batch_size=chunk_size)
+            anomalies += int((chunk['is_anomaly_isolation_forest'] == -1).sum())
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return anomalies
+
+def isolation_forest_anomalies(df, model=None, n_jobs=None):
+    """
+    Flag anomalies with an IsolationForest, fitting one on `df` unless a fitted
+    `model` is given.
+    """
+    if model is None:
+        model = fit_isolation_forest(df, n_jobs=n_jobs)
+    return score_isolation_forest(df, model)
+
+def _dbscan_labels(X, eps, min_samples, algorithm='kd_tree', sample_size=None, random_state=42):
+    """
+    DBSCAN cluster labels, -1 for noise.
+
+    Without sampling DBSCAN answers its radius queries from a single kd/ball tree.
+    With `sample_size` DBSCAN runs on a random sample with `min_samples` scaled to
+    the sample fraction, building its own tree over the sample. A second, smaller
+    tree over the sample's core points then gives every row the label of its
+    nearest core point when it lies within `eps`, and noise otherwise. Memory then
+    depends on the sample, not on the rows.
+
+    Clustering a precomputed radius neighbors graph instead would share one tree
+    between both steps, but building and scanning that graph costs more than the
+    core point tree it saves.
+    """
+    if len(X) < min_samples:
+        # Too few rows for any core point
+        return np.full(len(X), -1)
+
+    if sample_size is None or len(X) <= sample_size:
+        return DBSCAN(eps=eps, min_samples=min_samples, algorithm=algorithm).fit_predict(X)
+
+    rng = np.random.default_rng(random_state)
+    sample = X[rng.choice(len(X), sample_size, replace=False)]
+    sample_min_samples = max(2, int(round(min_samples * sample_size / len(X))))
+    dbscan = DBSCAN(eps=eps, min_samples=sample_min_samples, algorithm=algorithm).fit(sample)
+    core_indices = dbscan.core_sample_indices_
+    if len(core_indices) == 0:
+        return np.full(len(X), -1)
+
+    tree = NearestNeighbors(n_neighbors=1, algorithm=algorithm).fit(sample[core_indices])
+    distances, nearest = tree.kneighbors(X)
+    core_labels = dbscan.labels_[core_indices]
+    return np.where(distances[:, 0] <= eps, core_labels[nearest[:, 0]], -1)
+
+def _account_dbscan_labels(account_df, eps, min_samples, algorithm, sample_size, random_state):
+    account_df = account_df.copy()
+    X, valid = _anomaly_feature_matrix(account_df)
+    labels = np.full(len(account_df), -1)
+    labels[valid] = _dbscan_labels(X[valid], eps, min_samples, algorithm, sample_size, random_state)
+    account_df['is_anomaly_dbscan'] = labels
+    return account_df
+
+def dbscan_anomalies(df, eps=0.5, min_samples=5, by=None, sample_size=None, algorithm='kd_tree', n_jobs=1, random_state=42):
+    """
+    Label transactions with DBSCAN clusters; -1 marks noise, i.e. anomalies.
+
+    Rows with a missing amount cannot be placed in a cluster and are labelled -1.
+
+    Args:
+    df (pd.DataFrame): Data with the advanced features.
+    eps (float): Neighborhood radius.
+    min_samples (int): Neighbors needed for a core point.
+    by (str): Cluster each value of this column (e.g. 'account_id') separately. Cluster
+        labels are made unique across partitions.
+    sample_size (int): Estimate core points from at most this many rows per partition.
+    algorithm (str): Neighbor tree, 'kd_tree' or 'ball_tree'.
+    n_jobs (int): Worker processes for the partitions when `by` is set.
+    random_state (int): Seed for the sampling.
+
+    Returns:
+    pd.DataFrame: The data with the `is_anomaly_dbscan` column.
+    """
+    options = {'eps': eps, 'min_samples': min_samples, 'algorithm': algorithm,
+               'sample_size': sample_size, 'random_state': random_state}
+    if by is None:
+        return _account_dbscan_labels(df, **options)
+
+    if n_jobs != 1:
+        df = run_partitioned(df, _account_dbscan_labels, by=by, n_jobs=n_jobs, **options)
+    else:
+        # Build the feature matrix once and only slice it per partition
+        X, valid = _anomaly_feature_matrix(df)
+        labels = np.full(len(df), -1)
+        for positions in df.groupby(by, observed=True).indices.values():
+            positions = positions[valid[positions]]
+            labels[positions] = _dbscan_labels(X[positions], **options)
+        df = df.copy()
+        df['is_anomaly_dbscan'] = labels
+
+    # Rows without a partition key are not clustered
+    df['is_anomaly_dbscan'] = df['is_anomaly_dbscan'].fillna(-1).astype(int)
+
+    # Make cluster labels unique across partitions, keeping -1 for noise
+    clustered = df['is_anomaly_dbscan'] >= 0
+    codes = df[clustered].groupby([by, 'is_anomaly_dbscan'], observed=True, sort=False).ngroup()
+    df['is_anomaly_dbscan'] = codes.reindex(df.index, fill_value=-1).astype(int)
     return df
 
-# Call these functions in the main pipeline
\ No newline at end of file
+# Call these functions in the main pipeline
@@ -2,10 +2,23 @@
 import numpy as np
 from scipy import stats
 import logging
+from utils.partitioned_executor import run_partitioned
 
-def detect_anomalies(df):
+def _account_anomaly_flags(account_df):
+    """
+    Per-account large transaction flag and transaction count for one account's rows.
+    """
+    account_df = account_df.copy()
+    account_df['is_large_transaction'] = account_df['transaction_amount'].abs() > account_df['transaction_amount'].mean() * 5
+    account_df['_transaction_frequency'] = account_df['transaction_id'].count()
+    return account_df
+
+def detect_anomalies(df, n_jobs=1):
     """
     Implement basic anomaly detection and flag potential fraudulent activities.
+
+    With `n_jobs` other than 1 the per-account statistics are computed in a process
+    pool; the global z-score and frequency threshold are still computed here.
     """
     try:
         if 'transaction_amount' not in df.columns:
@@ -16,11 +29,16 @@ def detect_anomalies(df):
         z_scores = np.abs(stats.zscore(df['transaction_amount']))
         df['is_amount_anomaly'] = z_scores > 3
         
-        # Flag sudden large transactions
-        df['is_large_transaction'] = (df['transaction_amount'].abs() > df.groupby('account_id')['transaction_amount'].transform('mean') * 5)
-        
-        # Flag high frequency of transactions
-        transaction_frequency = df.groupby('account_id')['transaction_id'].transform('count')
+        if n_jobs != 1:
+            df = run_partitioned(df, _account_anomaly_flags, by='account_id', n_jobs=n_jobs)
+            df['is_large_transaction'] = df['is_large_transaction'].eq(True)
+            transaction_frequency = df.pop('_transaction_frequency')
+        else:
+            # Flag sudden large transactions
+            df['is_large_transaction'] = (df['transaction_amount'].abs() > df.groupby('account_id', observed=True)['transaction_amount'].transform('mean') * 5)
+
+            # Flag high frequency of transactions
+            transaction_frequency = df.groupby('account_id', observed=True)['transaction_id'].transform('count')
         df['is_high_frequency'] = transaction_frequency > transaction_frequency.quantile(0.95)
         
         # Combine flags
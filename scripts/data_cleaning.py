@@ -4,6 +4,33 @@ import numpy as np
 import logging
 from sklearn.impute import KNNImputer
 
+# Merchant names are upper-cased before this mapping is applied
+MERCHANT_MAPPING = {
+    'UBER': 'UBER',
+    'UBER*TRIP': 'UBER',
+    # Add more replacements as needed
+}
+
+# Example mapping, modify as per your categories
+CATEGORY_MAPPING = {
+    'FOOD_AND_DRINK_RESTAURANT': 'FOOD_AND_DRINK',
+    'FOOD_AND_DRINK_FAST_FOOD': 'FOOD_AND_DRINK',
+    # Add more mappings as needed
+}
+
+def _map_values(series, func):
+    """
+    Apply a vectorized transform to a Series. For categorical columns the transform
+    runs on the categories only and the result stays categorical.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        mapped_codes, mapped_categories = pd.factorize(func(pd.Series(series.cat.categories)))
+        codes = series.cat.codes.to_numpy()
+        new_codes = np.where(codes >= 0, mapped_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(new_codes, categories=mapped_categories),
+                         index=series.index, name=series.name)
+    return func(series)
+
 def handle_missing_values(df):
     try:
         # Identify columns with missing data
@@ -21,6 +48,14 @@ def handle_missing_values(df):
         for col in categorical_columns:
             df[col] = df[col].astype(str).fillna(df[col].astype(str).mode().iloc[0])
         
+        # Columns already stored as category keep their dtype; missing values become
+        # 'nan' exactly as the string conversion above does
+        for col in df.select_dtypes(include=['category']).columns:
+            if df[col].isnull().any():
+                if 'nan' not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories('nan')
+                df[col] = df[col].fillna('nan')
+        
         logging.info("Missing values handled successfully")
         return df
     except Exception as e:
@@ -55,20 +90,10 @@ def standardize_categories(df):
     """
     try:
         # Unify merchant names
-        df['merchant_name'] = df['merchant_name'].str.upper()
-        df['merchant_name'] = df['merchant_name'].replace({
-            'UBER': 'UBER',
-            'UBER*TRIP': 'UBER',
-            # Add more replacements as needed
-        })
+        df['merchant_name'] = _map_values(df['merchant_name'], lambda s: s.str.upper().replace(MERCHANT_MAPPING))
         
-        # Standardize transaction categories (example, modify as per your categories)
-        category_mapping = {
-            'FOOD_AND_DRINK_RESTAURANT': 'FOOD_AND_DRINK',
-            'FOOD_AND_DRINK_FAST_FOOD': 'FOOD_AND_DRINK',
-            # Add more mappings as needed
-        }
-        df['personal_finance_category_primary'] = df['personal_finance_category_primary'].replace(category_mapping)
+        # Standardize transaction categories
+        df['personal_finance_category_primary'] = _map_values(df['personal_finance_category_primary'], lambda s: s.replace(CATEGORY_MAPPING))
         
         logging.info("Categories standardized successfully")
         return df
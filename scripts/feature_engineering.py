@@ -1,12 +1,34 @@
 # scripts/feature_engineering.py
+import joblib
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import OneHotEncoder, LabelEncoder, StandardScaler
 import logging
+from utils.partitioned_executor import run_partitioned
+from scripts.rolling_features import compute_rolling_features
 
-def create_derived_features(df):
+ONEHOT_COLUMNS = ['account_type', 'personal_finance_category_primary']
+
+ROLLING_WINDOWS = {
+    '7day_avg': ('7D', 'mean'),
+    '30day_avg': ('30D', 'mean'),
+}
+
+def create_derived_features(df, precomputed=()):
+    """
+    Add day of week, month-end balance and merchant/category frequency features.
+
+    Args:
+    df (pd.DataFrame): The data.
+    precomputed (iterable): Features already computed by the database query
+        (see utils.query_runner.PUSHDOWN_FEATURES); they are kept as loaded.
+    """
     try:
+        precomputed = set(precomputed) & set(df.columns)
+
         # Day of week for transactions
-        df['transaction_day_of_week'] = df['transaction_date'].dt.dayofweek
+        if 'transaction_day_of_week' not in precomputed:
+            df['transaction_day_of_week'] = df['transaction_date'].dt.dayofweek
         
         # Month-end account balances (assuming the data is sorted by date)
         df['month_end'] = df['transaction_date'].dt.is_month_end
@@ -14,8 +36,10 @@ def create_derived_features(df):
         df['month_end_balance'] = df['month_end_balance'].ffill()  # Use ffill() instead of fillna(method='ffill')
         
         # Transaction frequency per merchant/category
-        df['merchant_frequency'] = df.groupby('merchant_name')['transaction_id'].transform('count')
-        df['category_frequency'] = df.groupby('personal_finance_category_primary')['transaction_id'].transform('count')
+        if 'merchant_frequency' not in precomputed:
+            df['merchant_frequency'] = df.groupby('merchant_name', observed=True)['transaction_id'].transform('count')
+        if 'category_frequency' not in precomputed:
+            df['category_frequency'] = df.groupby('personal_finance_category_primary', observed=True)['transaction_id'].transform('count')
         
         logging.info("Derived features created successfully")
         return df
@@ -24,21 +48,94 @@ def create_derived_features(df):
         logging.error(f"Error creating derived features: {str(e)}")
         raise
     
-def encode_categorical_variables(df):
+def fit_categorical_encoders(df, onehot_categories='auto', merchant_classes=None):
+    """
+    Fit the one-hot encoder for account types and transaction categories and the
+    label encoder for merchants.
+
+    Args:
+    df (pd.DataFrame): The data to fit on.
+    onehot_categories: Categories per one-hot column, or 'auto' to take them from `df`.
+    merchant_classes (array-like): Known merchant names, or None to take them from `df`.
+
+    Returns:
+    dict: Fitted encoders, reusable with `transform_categorical_variables`.
+    """
+    onehot_encoder = OneHotEncoder(categories=onehot_categories, handle_unknown='ignore')
+    onehot_encoder.fit(df[ONEHOT_COLUMNS])
+    label_encoder = LabelEncoder()
+    if merchant_classes is None:
+        label_encoder.fit(df['merchant_name'].astype(str))
+    else:
+        label_encoder.classes_ = np.sort(np.asarray(merchant_classes, dtype=str))
+    return {'onehot': onehot_encoder, 'merchant': label_encoder}
+
+def save_categorical_encoders(encoders, path):
+    joblib.dump(encoders, path)
+
+def load_categorical_encoders(path):
+    return joblib.load(path)
+
+def onehot_feature_matrix(df, encoders):
+    """
+    One-hot encode account types and transaction categories as a SciPy CSR matrix.
+
+    Returns:
+    tuple: (CSR matrix aligned to the rows of `df`, feature names)
+    """
+    onehot_encoder = encoders['onehot']
+    matrix = onehot_encoder.transform(df[ONEHOT_COLUMNS]).tocsr()
+    return matrix, onehot_encoder.get_feature_names_out(ONEHOT_COLUMNS)
+
+def transform_categorical_variables(df, encoders, sparse=False):
+    """
+    Encode categorical variables with already fitted encoders, without refitting.
+
+    Merchants unseen when the encoders were fitted get the code -1.
+
+    Args:
+    df (pd.DataFrame): The data to encode.
+    encoders (dict): Output of `fit_categorical_encoders`.
+    sparse (bool): Store the one-hot columns as pandas sparse columns instead of dense floats.
+
+    Returns:
+    pd.DataFrame: The data with `merchant_encoded` and the one-hot columns added.
+    """
+    onehot_encoded, onehot_columns_names = onehot_feature_matrix(df, encoders)
+    if sparse:
+        onehot_df = pd.DataFrame.sparse.from_spmatrix(onehot_encoded, index=df.index, columns=onehot_columns_names)
+    else:
+        onehot_df = pd.DataFrame(onehot_encoded.toarray(), columns=onehot_columns_names, index=df.index)
+
+    # Label encoding for merchants
+    classes = encoders['merchant'].classes_.astype(str)
+    merchants = df['merchant_name'].astype(str).to_numpy(dtype=str)
+    codes = np.searchsorted(classes, merchants)
+    if len(classes):
+        found = (codes < len(classes)) & (classes[np.minimum(codes, len(classes) - 1)] == merchants)
+    else:
+        found = np.zeros(len(merchants), dtype=bool)
+    df['merchant_encoded'] = np.where(found, codes, -1)
+
+    # Combine the original dataframe with the one-hot encoded features
+    return pd.concat([df, onehot_df], axis=1)
+
+def encode_categorical_variables(df, sparse=False, encoders=None):
+    """
+    One-hot encode account types and transaction categories and label encode merchants.
+
+    Args:
+    df (pd.DataFrame): The data to encode.
+    sparse (bool): Keep the one-hot columns sparse (see `transform_categorical_variables`).
+    encoders (dict): Previously fitted encoders; fitted on `df` when None.
+
+    Returns:
+    pd.DataFrame: The encoded data.
+    """
     try:
-        # One-hot encoding for account types and transaction categories
-        onehot_columns = ['account_type', 'personal_finance_category_primary']
-        onehot_encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
-        onehot_encoded = onehot_encoder.fit_transform(df[onehot_columns])
-        onehot_columns_names = onehot_encoder.get_feature_names_out(onehot_columns)
-        onehot_df = pd.DataFrame(onehot_encoded, columns=onehot_columns_names, index=df.index)
-        
-        # Label encoding for merchants
-        le = LabelEncoder()
-        df['merchant_encoded'] = le.fit_transform(df['merchant_name'])
-        
-        # Combine the original dataframe with the one-hot encoded features
-        df = pd.concat([df, onehot_df], axis=1)
+        if encoders is None:
+            encoders = fit_categorical_encoders(df)
+        df = transform_categorical_variables(df, encoders, sparse=sparse)
         
         logging.info("Categorical variables encoded successfully")
         return df
@@ -46,17 +143,22 @@ def encode_categorical_variables(df):
         logging.error(f"Error encoding categorical variables: {str(e)}")
         raise
     
-def normalize_numerical_features(df):
+def normalize_numerical_features(df, scaler=None):
     """
     Normalize numerical features using StandardScaler.
+
+    Args:
+    df (pd.DataFrame): The data to normalize.
+    scaler (StandardScaler): A scaler already fitted on these columns; fitted on `df` when None.
     """
     try:
         numeric_columns = ['transaction_amount', 'account_current_balance', 'account_limit']
         columns_to_normalize = [col for col in numeric_columns if col in df.columns]
         
         if columns_to_normalize:
-            scaler = StandardScaler()
-            df[columns_to_normalize] = scaler.fit_transform(df[columns_to_normalize])
+            if scaler is None:
+                scaler = StandardScaler().fit(df[columns_to_normalize])
+            df[columns_to_normalize] = scaler.transform(df[columns_to_normalize])
             logging.info("Numerical features normalized successfully")
         else:
             logging.warning("No numeric columns found for normalization")
@@ -66,17 +168,28 @@ def normalize_numerical_features(df):
         logging.error(f"Error normalizing numerical features: {str(e)}")
         raise
 
-def create_advanced_features(df):
-    # Rolling averages
-    df['7day_avg'] = df.groupby('account_id')['transaction_amount'].rolling(window=7).mean().reset_index(0, drop=True)
-    df['30day_avg'] = df.groupby('account_id')['transaction_amount'].rolling(window=30).mean().reset_index(0, drop=True)
+def _account_rolling_averages(account_df):
+    account_df = account_df.copy()
+    rolling = compute_rolling_features(account_df, ROLLING_WINDOWS)
+    for col in ROLLING_WINDOWS:
+        account_df[col] = rolling[col]
+    return account_df
+
+def create_advanced_features(df, n_jobs=1):
+    # Calendar-window rolling averages
+    if n_jobs != 1:
+        df = run_partitioned(df, _account_rolling_averages, by='account_id', n_jobs=n_jobs)
+    else:
+        rolling = compute_rolling_features(df, ROLLING_WINDOWS)
+        for col in ROLLING_WINDOWS:
+            df[col] = rolling[col]
 
     # Day of week and time of month features
     df['day_of_week'] = df['transaction_date'].dt.dayofweek
     df['day_of_month'] = df['transaction_date'].dt.day
 
     # Spending ratios
-    category_totals = df.groupby('personal_finance_category_primary')['transaction_amount'].transform('sum')
+    category_totals = df.groupby('personal_finance_category_primary', observed=True)['transaction_amount'].transform('sum')
     df['category_spending_ratio'] = df['transaction_amount'] / category_totals
 
     return df
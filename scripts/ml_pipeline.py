@@ -1,10 +1,49 @@
+import logging
+import numpy as np
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 
-def train_category_predictor(df):
-    X = df[['transaction_amount', '7day_avg', '30day_avg', 'day_of_week', 'day_of_month']]
-    y = df['personal_finance_category_primary']
+FEATURE_COLUMNS = ['transaction_amount', '7day_avg', '30day_avg', 'day_of_week', 'day_of_month']
+TARGET_COLUMN = 'personal_finance_category_primary'
+
+def _is_target_feature(name):
+    # The target itself or one of its one-hot columns, e.g. personal_finance_category_primary_TRAVEL
+    return name == TARGET_COLUMN or name.startswith(f'{TARGET_COLUMN}_')
+
+def _without_target_features(sparse_features):
+    """CSR matrix of the extra features, leaving out the columns derived from the target."""
+    if hasattr(sparse_features, 'sparse'):
+        names = sparse_features.columns
+        matrix = sparse_features.sparse.to_coo()
+    elif isinstance(sparse_features, tuple):
+        matrix, names = sparse_features
+    else:
+        raise ValueError("sparse_features needs its column names to exclude the target: pass a DataFrame "
+                         "or the (matrix, feature names) tuple of onehot_feature_matrix")
+    keep = np.array([not _is_target_feature(str(name)) for name in names], dtype=bool)
+    if not keep.all():
+        logging.info(f"Dropped {int((~keep).sum())} sparse features derived from {TARGET_COLUMN}")
+    return sparse.csr_matrix(matrix)[:, np.flatnonzero(keep)]
+
+def train_category_predictor(df, sparse_features=None):
+    """
+    Train a random forest predicting the transaction category.
+
+    Args:
+    df (pd.DataFrame): Data with the advanced features.
+    sparse_features: Optional extra features aligned to the rows of `df`, either the
+        (SciPy sparse matrix, feature names) tuple of `onehot_feature_matrix` or a
+        DataFrame of pandas sparse columns. Columns derived from the target, such as
+        the `personal_finance_category_primary_*` one-hot columns, are dropped. The
+        rest are stacked as CSR without densifying.
+    """
+    X = df[FEATURE_COLUMNS]
+    y = df[TARGET_COLUMN]
+    if sparse_features is not None:
+        X = sparse.hstack([sparse.csr_matrix(X.to_numpy(dtype=float)), _without_target_features(sparse_features)],
+                          format='csr')
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
@@ -16,4 +55,4 @@ def train_category_predictor(df):
 
     return model
 
-# Implement this in the main pipeline
\ No newline at end of file
+# Implement this in the main pipeline
@@ -0,0 +1,91 @@
+# scripts/rolling_features.py
+import numpy as np
+import pandas as pd
+import logging
+
+SUPPORTED_STATS = ('sum', 'mean', 'count', 'std')
+
+def compute_rolling_features(df, windows, value_column='transaction_amount', by='account_id', time_column='transaction_date'):
+    """
+    Compute calendar-window rolling statistics per account in a single sorted pass.
+
+    Rows are sorted once by (account, time) and cumulative sums of the values, their
+    squares and the non-missing counts are built once. Each window then only costs
+    one `searchsorted` per account to find where its window starts, so adding a new
+    window does not add another pass over the data.
+
+    Windows follow pandas' time-based rolling semantics: the window for a row covers
+    the same account's rows in (t - window, t] up to and including the row itself,
+    with `min_periods=1`. Rows with a missing account or timestamp get NaN.
+
+    Args:
+    df (pd.DataFrame): The data, with a datetime `time_column`.
+    windows (dict): Output column name -> (window, stat), e.g. {'7day_avg': ('7D', 'mean')}.
+        `stat` is one of 'sum', 'mean', 'count' or 'std'.
+    value_column (str): Column to aggregate.
+    by (str): Partition column.
+    time_column (str): Datetime column defining the windows.
+
+    Returns:
+    pd.DataFrame: One column per window, aligned to `df.index`.
+    """
+    for column_name, (_, stat) in windows.items():
+        if stat not in SUPPORTED_STATS:
+            raise ValueError(f"Unsupported rolling statistic '{stat}' for {column_name}")
+
+    n = len(df)
+    values = df[value_column].to_numpy(dtype=float)
+    times = df[time_column].to_numpy(dtype='datetime64[ns]').view('int64')
+    codes, _ = pd.factorize(df[by])
+    codes = np.where(times == np.iinfo(np.int64).min, -1, codes)
+
+    order = np.lexsort((times, codes))
+    order = order[codes[order] >= 0]
+    sorted_values = values[order]
+    sorted_times = times[order]
+    sorted_codes = codes[order]
+
+    valid = ~np.isnan(sorted_values)
+    # Centering keeps the sum-of-squares variance numerically stable
+    center = sorted_values[valid].mean() if valid.any() else 0.0
+    centered = np.where(valid, sorted_values - center, 0.0)
+    cum_count = np.concatenate([[0], np.cumsum(valid)])
+    cum_sum = np.concatenate([[0.0], np.cumsum(centered)])
+    cum_sumsq = np.concatenate([[0.0], np.cumsum(centered ** 2)])
+
+    group_starts = np.flatnonzero(np.diff(sorted_codes, prepend=-2))
+    group_ends = np.append(group_starts[1:], len(sorted_codes))
+    ends = np.arange(1, len(sorted_codes) + 1)
+
+    result = pd.DataFrame(index=df.index)
+    window_starts = {}
+    for column_name, (window, stat) in windows.items():
+        offset = pd.Timedelta(window).value
+        if offset not in window_starts:
+            starts = np.empty(len(sorted_codes), dtype=np.int64)
+            for group_start, group_end in zip(group_starts, group_ends):
+                group_times = sorted_times[group_start:group_end]
+                starts[group_start:group_end] = group_start + np.searchsorted(group_times, group_times - offset, side='right')
+            window_starts[offset] = starts
+        starts = window_starts[offset]
+
+        count = cum_count[ends] - cum_count[starts]
+        total = cum_sum[ends] - cum_sum[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'count':
+                sorted_result = count.astype(float)
+            elif stat == 'sum':
+                sorted_result = np.where(count > 0, total + center * count, np.nan)
+            elif stat == 'mean':
+                sorted_result = np.where(count > 0, total / count + center, np.nan)
+            else:
+                squares = cum_sumsq[ends] - cum_sumsq[starts]
+                variance = (squares - total ** 2 / count) / (count - 1)
+                sorted_result = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+        column = np.full(n, np.nan)
+        column[order] = sorted_result
+        result[column_name] = column
+
+    logging.info(f"Computed {len(windows)} rolling features over {len(window_starts)} distinct windows")
+    return result
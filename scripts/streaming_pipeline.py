@@ -0,0 +1,266 @@
+# scripts/streaming_pipeline.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import logging
+
+from scripts.data_consolidation import consolidate_data
+from scripts.data_cleaning import correct_data_types, standardize_categories
+from scripts.feature_engineering import ONEHOT_COLUMNS, fit_categorical_encoders, transform_categorical_variables
+
+SCALED_COLUMNS = ['transaction_amount', 'account_current_balance', 'account_limit']
+
+def iter_chunks(parquet_path, chunk_size=100_000):
+    """
+    Yield bounded DataFrame chunks from a Parquet file, indexed by global row position.
+    """
+    parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+    offset = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        chunk = batch.to_pandas()
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+def _add_counts(total, counts):
+    # Chunks read from Parquet carry their own categories, so align on plain values
+    counts.index = counts.index.astype(object)
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0)
+
+def _merge_moments(a, b):
+    """
+    Combine (count, mean, M2) triples with Chan's parallel variance update.
+    """
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+    return n, mean, m2
+
+def _median_from_counts(counts):
+    """
+    Exact median of the values summarized by a value -> count Series.
+    """
+    if counts is None or counts.sum() == 0:
+        return np.nan
+    counts = counts.sort_index()
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    values = counts.index.to_numpy(dtype=float)
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+    upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return (lower + upper) / 2
+
+def _row_local_steps(chunk, fill_values=None):
+    """
+    Apply missing value handling, type correction and category standardization
+    to a consolidated chunk. Numeric columns are only filled when the global
+    medians are already known (second pass).
+    """
+    if fill_values:
+        chunk = chunk.fillna(value=fill_values)
+    categorical_columns = chunk.select_dtypes(include=['object']).columns
+    for col in categorical_columns:
+        chunk[col] = chunk[col].astype(str)
+    for col in chunk.select_dtypes(include=['category']).columns:
+        if chunk[col].isnull().any():
+            if 'nan' not in chunk[col].cat.categories:
+                chunk[col] = chunk[col].cat.add_categories('nan')
+            chunk[col] = chunk[col].fillna('nan')
+    chunk = correct_data_types(chunk)
+    chunk = standardize_categories(chunk)
+    return chunk
+
+def fit_streaming_statistics(chunks):
+    """
+    First pass: collect everything the cross-row steps need from the full history.
+
+    Memory is bounded by the number of distinct values per column rather than the
+    number of rows: medians are computed exactly from value counts, scaler moments
+    are merged chunk by chunk and group frequencies are accumulated counts.
+
+    Returns:
+    dict: Fitted statistics consumed by `transform_chunk`.
+    """
+    value_counts = {}
+    null_counts = {}
+    moments = {}
+    merchant_counts = None
+    category_counts = None
+    onehot_categories = {col: set() for col in ONEHOT_COLUMNS}
+    month_end_balances = None
+    total_rows = 0
+
+    for chunk in chunks:
+        chunk = consolidate_data(chunk)
+        numeric_columns = chunk.select_dtypes(include=[np.number]).columns
+        for col in numeric_columns:
+            value_counts[col] = _add_counts(value_counts.get(col), chunk[col].value_counts())
+            null_counts[col] = null_counts.get(col, 0) + int(chunk[col].isnull().sum())
+
+        chunk = _row_local_steps(chunk)
+        for col in SCALED_COLUMNS:
+            if col in chunk.columns:
+                values = chunk[col].dropna().to_numpy(dtype=float)
+                chunk_moments = (len(values), values.mean() if len(values) else 0.0,
+                                 ((values - values.mean()) ** 2).sum() if len(values) else 0.0)
+                moments[col] = _merge_moments(moments.get(col, (0, 0.0, 0.0)), chunk_moments)
+
+        merchant_counts = _add_counts(merchant_counts, chunk.groupby('merchant_name', observed=True)['transaction_id'].count())
+        category_counts = _add_counts(category_counts, chunk.groupby('personal_finance_category_primary', observed=True)['transaction_id'].count())
+        for col in ONEHOT_COLUMNS:
+            onehot_categories[col].update(chunk[col].unique())
+        chunk_month_end_balances = chunk.loc[chunk['transaction_date'].dt.is_month_end, 'account_current_balance']
+        if len(chunk_month_end_balances):
+            month_end_balances = chunk_month_end_balances
+        total_rows += len(chunk)
+
+    fill_values = {col: _median_from_counts(counts) for col, counts in value_counts.items()}
+
+    # Month-end balance carried into batches transformed after this history
+    last_month_end_balance = None
+    if month_end_balances is not None:
+        last_month_end_balance = month_end_balances.iloc[-1]
+        if pd.isnull(last_month_end_balance):
+            last_month_end_balance = fill_values.get('account_current_balance')
+
+    # Rows filled with the median in the second pass also feed the scaler
+    scaler = {}
+    for col, col_moments in moments.items():
+        if col in fill_values and null_counts.get(col):
+            col_moments = _merge_moments(col_moments, (null_counts[col], fill_values[col], 0.0))
+        n, mean, m2 = col_moments
+        scale = np.sqrt(m2 / n) if n else 1.0
+        scaler[col] = (mean, scale if scale > 0 else 1.0)
+
+    merchant_classes = np.sort(merchant_counts.index.to_numpy(dtype=str)) if merchant_counts is not None else np.array([], dtype=str)
+    logging.info(f"Streaming fit pass completed over {total_rows} rows")
+    return {
+        'fill_values': fill_values,
+        'scaler': scaler,
+        'merchant_frequency': merchant_counts.astype('int64') if merchant_counts is not None else pd.Series(dtype='int64'),
+        'category_frequency': category_counts.astype('int64') if category_counts is not None else pd.Series(dtype='int64'),
+        'onehot_categories': [sorted(onehot_categories[col]) for col in ONEHOT_COLUMNS],
+        'merchant_classes': merchant_classes,
+        'last_month_end_balance': last_month_end_balance,
+        'total_rows': total_rows,
+    }
+
+def transform_chunk(chunk, statistics, carry=None):
+    """
+    Second pass: apply steps 1-7 of the batch pipeline to one chunk using the
+    fitted statistics.
+
+    Args:
+    chunk (pd.DataFrame): Raw chunk as produced by `iter_chunks`.
+    statistics (dict): Output of `fit_streaming_statistics`.
+    carry (dict): State carried between consecutive chunks (last month-end balance).
+
+    Returns:
+    tuple: (transformed chunk, updated carry)
+    """
+    carry = dict(carry or {})
+    chunk = _row_local_steps(consolidate_data(chunk), statistics['fill_values'])
+
+    # Derived features
+    chunk['transaction_day_of_week'] = chunk['transaction_date'].dt.dayofweek
+    chunk['month_end'] = chunk['transaction_date'].dt.is_month_end
+    month_end_balance = chunk['account_current_balance'].where(chunk['month_end'])
+    if pd.isnull(month_end_balance.iloc[0]) and carry.get('month_end_balance') is not None:
+        month_end_balance.iloc[0] = carry['month_end_balance']
+    chunk['month_end_balance'] = month_end_balance.ffill()
+    last_balance = chunk['month_end_balance'].iloc[-1]
+    carry['month_end_balance'] = None if pd.isnull(last_balance) else last_balance
+    chunk['merchant_frequency'] = chunk['merchant_name'].astype(object).map(statistics['merchant_frequency'])
+    chunk['category_frequency'] = chunk['personal_finance_category_primary'].astype(object).map(statistics['category_frequency'])
+
+    # Categorical encoding with the globally fitted categories
+    encoders = fit_categorical_encoders(chunk, statistics['onehot_categories'], statistics['merchant_classes'])
+    chunk = transform_categorical_variables(chunk, encoders)
+
+    # Normalization with the globally fitted mean and scale
+    for col, (mean, scale) in statistics['scaler'].items():
+        if col in chunk.columns:
+            chunk[col] = (chunk[col] - mean) / scale
+
+    return chunk, carry
+
+def transform_batch(df, statistics):
+    """
+    Transform a new batch with statistics fitted over the full history, without
+    refitting anything.
+
+    The batch is treated as the continuation of the fitted history: month-end
+    balances are forward filled from the last one seen during fitting.
+
+    Args:
+    df (pd.DataFrame): Raw batch with the same columns as the fitted data.
+    statistics (dict): Output of `fit_streaming_statistics`, e.g. loaded from the
+        transformer store.
+
+    Returns:
+    pd.DataFrame: The transformed batch.
+    """
+    try:
+        carry = {'month_end_balance': statistics.get('last_month_end_balance')}
+        df, _ = transform_chunk(df.reset_index(drop=True), statistics, carry)
+        logging.info(f"Transformed batch of {len(df)} rows with fitted statistics")
+        return df
+    except Exception as e:
+        logging.error(f"Error transforming batch: {str(e)}")
+        raise
+
+def run_streaming_pipeline(parquet_path, output_path, chunk_size=100_000):
+    """
+    Run the row-local and fit/transform steps of the pipeline over bounded chunks
+    and stream the result to a Parquet file.
+
+    Time series preparation and anomaly detection need each account's full history
+    and are not part of the streaming mode.
+
+    Returns:
+    dict: Validation results accumulated over all chunks.
+    """
+    try:
+        statistics = fit_streaming_statistics(iter_chunks(parquet_path, chunk_size))
+
+        writer = None
+        carry = None
+        validation = {'negative_balances': 0, 'min_date': None, 'max_date': None,
+                      'missing_values': 0, 'unique_accounts': set(), 'total_transactions': 0}
+        try:
+            for chunk in iter_chunks(parquet_path, chunk_size):
+                chunk, carry = transform_chunk(chunk, statistics, carry)
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                else:
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+
+                validation['negative_balances'] += int((chunk['account_current_balance'] < 0).sum())
+                chunk_min, chunk_max = chunk['transaction_date'].min(), chunk['transaction_date'].max()
+                if validation['min_date'] is None or chunk_min < validation['min_date']:
+                    validation['min_date'] = chunk_min
+                if validation['max_date'] is None or chunk_max > validation['max_date']:
+                    validation['max_date'] = chunk_max
+                validation['missing_values'] += int(chunk.isnull().sum().sum())
+                validation['unique_accounts'].update(chunk['account_id'].dropna().unique())
+                validation['total_transactions'] += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        validation['unique_accounts'] = len(validation['unique_accounts'])
+        logging.info(f"Streaming pipeline wrote {validation['total_transactions']} rows to {output_path}")
+        return validation
+    except Exception as e:
+        logging.error(f"Error in streaming pipeline: {str(e)}")
+        raise
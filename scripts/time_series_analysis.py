@@ -1,6 +1,18 @@
+import os
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import joblib
+import numpy as np
+import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
 from prophet import Prophet
 
+ARIMA_ORDER = (1, 1, 1)
+FORECAST_COLUMNS = ['account_id', 'model', 'forecast_date', 'forecast', 'forecast_lower', 'forecast_upper']
+
 def arima_forecast(df, account_id, days_to_forecast=30):
     account_data = df[df['account_id'] == account_id].set_index('transaction_date')['transaction_amount']
     model = ARIMA(account_data, order=(1,1,1))
@@ -17,4 +29,256 @@ def prophet_forecast(df, account_id, days_to_forecast=30):
     forecast = model.predict(future_dates)
     return forecast
 
-# Implement these forecasts for each account in the main pipeline
\ No newline at end of file
+def daily_account_series(df, value_column='transaction_amount'):
+    """
+    Partition the frame once by account and resample each account to daily totals.
+
+    Days without transactions are 0, so every series has a regular daily frequency.
+
+    Returns:
+    dict: account_id -> daily pd.Series indexed by date.
+    """
+    daily = (df.dropna(subset=['account_id', 'transaction_date'])
+               .groupby(['account_id', pd.Grouper(key='transaction_date', freq='D')], observed=True)[value_column]
+               .sum())
+    series = {}
+    for account_id, account_daily in daily.groupby(level='account_id', observed=True):
+        account_daily = account_daily.droplevel('account_id')
+        series[account_id] = account_daily.asfreq('D', fill_value=0.0)
+    return series
+
+def _series_checksum(series):
+    return int(pd.util.hash_pandas_object(series, index=True).sum())
+
+def _arima_daily_forecast(series, days_to_forecast, cached=None, refit='warm'):
+    """
+    Fit ARIMA(1,1,1) to a daily series, reusing cached parameters when possible.
+
+    With a cache entry for an earlier prefix of the series the previous parameters
+    are either used as the optimizer's starting point (`refit='warm'`) or applied
+    to the extended series without optimizing (`refit='append'`). A series that has
+    not changed since the cache entry is never refitted.
+
+    Returns:
+    tuple: (forecast DataFrame, cache entry for this fit)
+    """
+    model = ARIMA(series, order=ARIMA_ORDER)
+    watermark = series.index[-1]
+    checksum = _series_checksum(series)
+    unchanged = extended = False
+    if cached is not None and cached['order'] == ARIMA_ORDER:
+        # Earlier days that were revised since the cached fit force a cold fit
+        unchanged = cached['watermark'] == watermark and cached['checksum'] == checksum
+        extended = cached['watermark'] < watermark and cached['checksum'] == _series_checksum(series.loc[:cached['watermark']])
+
+    if unchanged or (extended and refit == 'append'):
+        results = model.filter(cached['params'])
+        fit_mode = 'cached' if unchanged else 'append'
+    elif extended:
+        results = model.fit(start_params=cached['params'])
+        fit_mode = 'warm'
+    else:
+        results = model.fit()
+        fit_mode = 'cold'
+
+    frame = results.get_forecast(steps=days_to_forecast).summary_frame()
+    forecast = pd.DataFrame({
+        'forecast_date': frame.index,
+        'forecast': frame['mean'].to_numpy(),
+        'forecast_lower': frame['mean_ci_lower'].to_numpy(),
+        'forecast_upper': frame['mean_ci_upper'].to_numpy(),
+    })
+    entry = {'watermark': watermark, 'checksum': checksum, 'order': ARIMA_ORDER,
+             'params': np.asarray(results.params), 'fit_mode': fit_mode}
+    return forecast, entry
+
+def _prophet_daily_forecast(series, days_to_forecast, cached=None, refit='warm'):
+    model = Prophet()
+    model.fit(pd.DataFrame({'ds': series.index, 'y': series.to_numpy()}))
+    future_dates = model.make_future_dataframe(periods=days_to_forecast, include_history=False)
+    frame = model.predict(future_dates)
+    forecast = pd.DataFrame({
+        'forecast_date': frame['ds'],
+        'forecast': frame['yhat'],
+        'forecast_lower': frame['yhat_lower'],
+        'forecast_upper': frame['yhat_upper'],
+    })
+    return forecast, None
+
+FORECAST_MODELS = {
+    'arima': _arima_daily_forecast,
+    'prophet': _prophet_daily_forecast,
+}
+
+def load_forecast_cache(cache_dir, model):
+    path = os.path.join(cache_dir, f'{model}_params.joblib')
+    return joblib.load(path) if os.path.exists(path) else {}
+
+def save_forecast_cache(cache, cache_dir, model):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{model}_params.joblib')
+    joblib.dump(cache, f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
+
+def _forecast_account(account_id, series, model, days_to_forecast, cached=None, refit='warm'):
+    forecast, entry = FORECAST_MODELS[model](series, days_to_forecast, cached, refit)
+    forecast.insert(0, 'model', model)
+    forecast.insert(0, 'account_id', account_id)
+    return forecast, entry
+
+def _terminate_pool(executor):
+    """Shut a process pool down without waiting for fits stuck in its workers."""
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+def _forecast_in_pool(series, model, days_to_forecast, cache, refit, n_jobs, timeout, collect, fail):
+    """
+    Fit the accounts across a process pool, with a deadline per account.
+
+    At most `n_jobs` fits are submitted at a time, so each account's deadline starts
+    when a worker picks it up. A running fit cannot be interrupted, so when one passes
+    its deadline the pool is terminated and replaced, and the other unfinished fits
+    are resubmitted to the new pool.
+
+    When a worker process dies (e.g. a crash in native code) the pool breaks and every
+    fit running in it fails without telling which one caused it. The pool is replaced
+    the same way, and those accounts are retried one at a time: an account whose fit
+    breaks the pool while running alone is the one that failed.
+    """
+    pending = deque(series)
+    # Accounts caught in a broken pool, retried alone once nothing else runs
+    suspects = deque()
+    running = {}
+    executor = ProcessPoolExecutor(max_workers=n_jobs)
+
+    def submit(account_id):
+        future = executor.submit(_forecast_account, account_id, series[account_id], model, days_to_forecast,
+                                 cache.get(account_id), refit)
+        running[future] = (account_id, time.monotonic() + timeout)
+
+    try:
+        while pending or suspects or running:
+            if suspects:
+                if not running:
+                    submit(suspects.popleft())
+            else:
+                while pending and len(running) < n_jobs:
+                    submit(pending.popleft())
+
+            next_deadline = min(deadline for _, deadline in running.values())
+            done, _ = wait(running, timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            crashed = []
+            for future in done:
+                account_id, _ = running.pop(future)
+                try:
+                    collect(account_id, future.result())
+                except BrokenProcessPool as e:
+                    crashed.append((account_id, e))
+                except Exception as e:
+                    fail(account_id, f"Forecast failed for account {account_id}: {str(e)}")
+
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in running.items() if deadline <= now and not future.done()]
+            for future in expired:
+                account_id, _ = running.pop(future)
+                fail(account_id, f"Forecast timed out for account {account_id}")
+            if expired or crashed:
+                # Fits finished in the meantime are kept; in a broken pool the others were
+                # caught in the crash, otherwise they start over in the new pool
+                for future, (account_id, _) in reversed(list(running.items())):
+                    if future.done() and future.exception() is None:
+                        collect(account_id, future.result())
+                    elif crashed:
+                        crashed.append((account_id, future.exception() if future.done() else None))
+                    else:
+                        pending.appendleft(account_id)
+                running.clear()
+                if len(crashed) == 1:
+                    account_id, e = crashed[0]
+                    fail(account_id, f"Forecast failed for account {account_id}: worker process crashed ({e})")
+                else:
+                    suspects.extend(account_id for account_id, _ in crashed)
+                _terminate_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=n_jobs)
+    finally:
+        _terminate_pool(executor)
+
+def forecast_all_accounts(df, model='arima', days_to_forecast=30, n_jobs=None, timeout=300, min_days=14,
+                          cache_dir=None, refit='warm'):
+    """
+    Forecast daily spending for every account.
+
+    The frame is partitioned once into daily series per account, and the models are
+    fitted across a process pool (see `_forecast_in_pool`). Accounts whose fit fails
+    or takes longer than `timeout` seconds are logged and left out.
+
+    With `cache_dir` the fitted ARIMA parameters are stored per account together
+    with the last date (watermark) of the series they were fitted on, and later runs
+    start from them instead of a full re-optimization (see `_arima_daily_forecast`).
+
+    Args:
+    df (pd.DataFrame): Transactions with `account_id`, `transaction_date` and `transaction_amount`.
+    model (str): 'arima' or 'prophet'.
+    days_to_forecast (int): Forecast horizon in days.
+    n_jobs (int): Worker processes, 1 to fit serially. Defaults to the CPU count.
+    timeout (float): Seconds a worker may spend on one account's fit. Only enforced
+        with a process pool; with `n_jobs=1` fits run in this process and cannot be
+        interrupted, so the timeout is ignored.
+    min_days (int): Accounts with a shorter daily history are skipped.
+    cache_dir (str): Directory of the parameter cache; no caching when None.
+    refit (str): 'warm' to re-optimize from the cached parameters when new days
+        arrive, 'append' to reuse them as they are.
+
+    Returns:
+    pd.DataFrame: One row per account and forecast day, with columns FORECAST_COLUMNS.
+    """
+    if model not in FORECAST_MODELS:
+        raise ValueError(f"Unknown forecast model '{model}'")
+    if refit not in ('warm', 'append'):
+        raise ValueError(f"Unknown refit mode '{refit}'")
+
+    series = {account_id: account_series for account_id, account_series in daily_account_series(df).items()
+              if len(account_series) >= min_days}
+    cache = load_forecast_cache(cache_dir, model) if cache_dir else {}
+    logging.info(f"Forecasting {len(series)} accounts with {model}")
+
+    forecasts = {}
+    failed = []
+    fit_modes = []
+    def collect(account_id, result):
+        forecast, entry = result
+        forecasts[account_id] = forecast
+        if entry is not None:
+            cache[account_id] = entry
+            fit_modes.append(entry['fit_mode'])
+
+    def fail(account_id, message):
+        failed.append(account_id)
+        logging.warning(message)
+
+    if n_jobs == 1:
+        for account_id, account_series in series.items():
+            try:
+                collect(account_id, _forecast_account(account_id, account_series, model, days_to_forecast,
+                                                      cache.get(account_id), refit))
+            except Exception as e:
+                fail(account_id, f"Forecast failed for account {account_id}: {str(e)}")
+    else:
+        _forecast_in_pool(series, model, days_to_forecast, cache, refit, n_jobs or os.cpu_count() or 1, timeout,
+                          collect, fail)
+
+    if failed:
+        logging.warning(f"{len(failed)} of {len(series)} account forecasts failed")
+    if cache_dir:
+        # Only this run's fits; entries of accounts that failed now are from earlier runs
+        logging.info(f"Forecast fits by mode: {pd.Series(fit_modes).value_counts().to_dict()}")
+        save_forecast_cache(cache, cache_dir, model)
+    if not forecasts:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    # In account order, whatever order the workers finished in
+    return pd.concat([forecasts[account_id] for account_id in series if account_id in forecasts],
+                     ignore_index=True)[FORECAST_COLUMNS]
@@ -1,20 +1,38 @@
 # scripts/time_series_preparation.py
 import pandas as pd
 import logging
+from utils.partitioned_executor import run_partitioned
+from scripts.rolling_features import compute_rolling_features
 
-def prepare_time_series(df):
+def _account_time_series_features(account_df):
+    """
+    Lag and rolling features for a single account's chronologically sorted rows.
+    """
+    account_df = account_df.copy()
+    account_df['prev_transaction_amount'] = account_df['transaction_amount'].shift(1)
+    account_df['rolling_7day_avg'] = compute_rolling_features(account_df, {'rolling_7day_avg': ('7D', 'mean')})['rolling_7day_avg']
+    return account_df
+
+def prepare_time_series(df, n_jobs=1):
     """
     Prepare data for time series analysis.
+
+    With `n_jobs` other than 1 the per-account features are computed in a process pool.
     """
     try:
         # Sort data chronologically
-        df = df.sort_values('transaction_date')
+        df = df.sort_values('transaction_date', kind='stable')
         
+        if n_jobs != 1:
+            df = run_partitioned(df, _account_time_series_features, by='account_id', n_jobs=n_jobs)
+            logging.info("Time series preparation completed successfully")
+            return df
+
         # Create lag features
-        df['prev_transaction_amount'] = df.groupby('account_id')['transaction_amount'].shift(1)
+        df['prev_transaction_amount'] = df.groupby('account_id', observed=True)['transaction_amount'].shift(1)
         
-        # Generate rolling statistics (7-day average spending)
-        df['rolling_7day_avg'] = df.groupby('account_id')['transaction_amount'].rolling(window=7).mean().reset_index(0, drop=True)
+        # Generate rolling statistics (7-day average spending over a calendar window)
+        df['rolling_7day_avg'] = compute_rolling_features(df, {'rolling_7day_avg': ('7D', 'mean')})['rolling_7day_avg']
         
         logging.info("Time series preparation completed successfully")
         return df
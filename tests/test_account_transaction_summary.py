@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+from utils.account_transaction_summary import generate_report, REPORT_KEYS
+
+def per_group_report(df, keys):
+    """The former loop-per-group implementation of generate_report, kept as the reference."""
+    df['transaction_date'] = pd.to_datetime(df['transaction_date'], errors='coerce')
+    df['year_month'] = df['transaction_date'].dt.to_period('M')
+    results = []
+    for name, data in df.groupby(keys):
+        number_of_transactions = data['transaction_id'].nunique()
+        monthly_group = data.groupby('year_month')
+        results.append(list(name) + [
+            number_of_transactions,
+            data['transaction_date'].min(),
+            data['transaction_date'].max(),
+            number_of_transactions / len(data['year_month'].unique()),
+            monthly_group['transaction_id'].count().mean(),
+            data['transaction_amount'].min(),
+            data['transaction_amount'].max(),
+            data['transaction_amount'].mean(),
+            monthly_group['transaction_amount'].mean().mean(),
+        ])
+    columns = keys + [
+        'number of transactions', 'min transaction date', 'max transaction date', 'avg number of transactions',
+        'avg monthly number of transactions', 'min transaction amount', 'max transaction amount',
+        'avg transaction amount', 'avg monthly transaction amount'
+    ]
+    return pd.DataFrame(results, columns=columns)
+
+class TestGenerateReport(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        n = 400
+        dates = pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 200, n), unit='D')).astype(str)
+        dates[rng.random(n) < 0.1] = None
+        dates[rng.random(n) < 0.05] = 'not a date'
+        self.sample_data = pd.DataFrame({
+            'bank_name': rng.choice(['Plaid', 'MBNA'], n),
+            'account_name': rng.choice(['Checking', 'Savings', 'Card', None], n),
+            'account_type': rng.choice(['depository', 'credit'], n),
+            'personal_finance_category_primary': rng.choice(['FOOD_AND_DRINK', 'TRAVEL', 'RENT'], n),
+            'transaction_id': [f't{i}' for i in rng.integers(0, 350, n)],
+            'transaction_date': dates,
+            'transaction_amount': rng.normal(50, 30, n).round(2),
+        })
+
+    def assert_matches_reference(self, dimensions=None):
+        keys = REPORT_KEYS + list(dimensions or [])
+        expected = per_group_report(self.sample_data.copy(), keys)
+        result = generate_report(self.sample_data.copy(), dimensions=dimensions)
+
+        self.assertGreater(len(result), 0)
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
+
+    def test_matches_per_group_report(self):
+        self.assert_matches_reference()
+
+    def test_dimensions_match_per_group_report(self):
+        self.assert_matches_reference(['personal_finance_category_primary'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.cluster import DBSCAN
+from sklearn.ensemble import IsolationForest
+from scripts.advanced_anomaly_detection import dbscan_anomalies, fit_isolation_forest, score_isolation_forest
+from utils.transformer_store import save_transformers, load_transformers
+
+class TestDbscanAnomalies(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 600
+        amounts = rng.normal(0, 1, n).round(1)
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(['a1', 'a2', 'a3', None], n),
+            'transaction_amount': amounts,
+            '7day_avg': amounts + rng.normal(0, 0.3, n),
+            '30day_avg': amounts + rng.normal(0, 0.2, n),
+        })
+        self.sample_data.loc[[1, 2], '7day_avg'] = np.nan
+        self.sample_data.loc[3, 'transaction_amount'] = np.nan
+
+    def test_global_mode_matches_dbscan_and_handles_nan(self):
+        features = self.sample_data[['transaction_amount', '7day_avg', '30day_avg']].copy()
+        features['7day_avg'] = features['7day_avg'].fillna(features['transaction_amount'])
+        valid = features['transaction_amount'].notna()
+        expected = np.full(len(features), -1)
+        expected[valid.to_numpy()] = DBSCAN(eps=0.5, min_samples=5).fit_predict(features[valid])
+
+        result = dbscan_anomalies(self.sample_data.copy())
+        np.testing.assert_array_equal(result['is_anomaly_dbscan'].to_numpy(), expected)
+
+    def test_per_account_parallel_matches_serial(self):
+        serial = dbscan_anomalies(self.sample_data.copy(), by='account_id')
+        parallel = dbscan_anomalies(self.sample_data.copy(), by='account_id', n_jobs=2)
+        pd.testing.assert_series_equal(serial['is_anomaly_dbscan'], parallel['is_anomaly_dbscan'])
+        self.assertTrue((serial.loc[serial['account_id'].isnull(), 'is_anomaly_dbscan'] == -1).all())
+        self.assertEqual(serial['is_anomaly_dbscan'].max() + 1, serial.loc[serial['is_anomaly_dbscan'] >= 0].groupby(['account_id', 'is_anomaly_dbscan']).ngroups)
+
+class TestIsolationForestAnomalies(unittest.TestCase):
+    def test_persisted_model_scores_batches_like_fit_predict(self):
+        rng = np.random.default_rng(4)
+        n = 2000
+        amounts = rng.exponential(40, n)
+        df = pd.DataFrame({'transaction_amount': amounts, '7day_avg': amounts * rng.normal(1, 0.1, n),
+                           '30day_avg': amounts * rng.normal(1, 0.05, n)})
+        expected = IsolationForest(contamination=0.1, random_state=42).fit_predict(df)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            save_transformers(fit_isolation_forest(df, n_jobs=2), tmp_dir)
+            model, _ = load_transformers(tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir)
+        result = score_isolation_forest(df.copy(), model, batch_size=300, n_jobs=2)
+        np.testing.assert_array_equal(result['is_anomaly_isolation_forest'].to_numpy(), expected)
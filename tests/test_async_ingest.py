@@ -0,0 +1,81 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+import sqlalchemy
+from _old.async_ingest import run_ingestion
+from _old.data_fetcher import load_fetched_table, load_watermarks
+
+CONNECT_SECONDS = 1.0
+
+def mbna_transactions(prefix, n, start='2024-01-01'):
+    return pd.DataFrame({
+        'account_id': f'{prefix}_acc',
+        'transaction_id': [f'{prefix}_t{i:03d}' for i in range(n)],
+        'payeee': ' Store ',
+        'adrdress': '1 Main St',
+        'amount': [str(i) for i in range(n)],
+        'posting_date': pd.date_range(start, periods=n, freq='D').strftime('%Y-%m-%d'),
+    })
+
+class TestAsyncIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_folder = os.path.join(self.tmp_dir, 'ingested')
+        self.db_paths = {db_name: os.path.join(self.tmp_dir, f'{db_name}.db') for db_name in ['plaid', 'finance']}
+        # The same table name in both databases, with different rows
+        self.write_table('plaid', mbna_transactions('plaid', 30))
+        self.write_table('finance', mbna_transactions('finance', 12))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_table(self, db_name, df, if_exists='fail'):
+        engine = sqlalchemy.create_engine(f'sqlite:///{self.db_paths[db_name]}')
+        df.to_sql('mbna_transactions', engine, index=False, if_exists=if_exists)
+        engine.dispose()
+
+    def slow_get_engine(self, db_name):
+        # Stands in for get_engine's blocking test connection
+        time.sleep(CONNECT_SECONDS)
+        return sqlalchemy.create_engine(f'sqlite:///{self.db_paths[db_name]}')
+
+    def ingest(self):
+        with mock.patch('_old.async_ingest.get_engine', side_effect=self.slow_get_engine):
+            start = time.perf_counter()
+            rows = run_ingestion({'plaid': ['mbna_transactions'], 'finance': ['mbna_transactions']},
+                                 output_folder=self.output_folder, chunk_size=10)
+        return rows, time.perf_counter() - start
+
+    def test_same_table_in_two_databases(self):
+        rows, seconds = self.ingest()
+
+        self.assertEqual(rows, {('plaid', 'mbna_transactions'): 30, ('finance', 'mbna_transactions'): 12})
+        # Both engines connect at the same time
+        self.assertLess(seconds, 1.8 * CONNECT_SECONDS)
+        for db_name, n in [('plaid', 30), ('finance', 12)]:
+            ingested = load_fetched_table('mbna_transactions', os.path.join(self.output_folder, db_name))
+            self.assertEqual(len(ingested), n)
+            self.assertTrue(ingested['transaction_id'].str.startswith(db_name).all())
+            self.assertEqual(ingested['payee'].unique().tolist(), ['Store'])
+        self.assertEqual(load_watermarks(os.path.join(self.output_folder, 'plaid')),
+                         {'mbna_transactions': '2024-01-30'})
+        self.assertEqual(load_watermarks(os.path.join(self.output_folder, 'finance')),
+                         {'mbna_transactions': '2024-01-12'})
+
+    def test_incremental_ingestion_per_database(self):
+        self.ingest()
+        self.write_table('finance', mbna_transactions('finance_new', 3, start='2024-01-12'), if_exists='append')
+        rows, _ = self.ingest()
+
+        # Rows on the previous watermark are pulled again; deduplication drops them later
+        self.assertEqual(rows, {('plaid', 'mbna_transactions'): 1, ('finance', 'mbna_transactions'): 4})
+        self.assertEqual(load_watermarks(os.path.join(self.output_folder, 'finance')),
+                         {'mbna_transactions': '2024-01-14'})
+        self.assertEqual(len(load_fetched_table('mbna_transactions', os.path.join(self.output_folder, 'finance'))), 16)
+
+if __name__ == '__main__':
+    unittest.main()
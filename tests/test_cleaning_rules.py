@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+import pandas as pd
+from _old.data_cleaning import clean_table, clean_currency_code, clean_dates, clean_numeric, clean_strings
+
+# Per-table cleaners as written before the rules were declared in the table registry,
+# kept here as the reference the rule-driven cleaners must match
+
+PLAID_TRANSACTION_STRINGS = [
+    'account_id', 'transaction_id', 'account_owner', 'merchant_entity_id', 'merchant_name', 'name', 'payment_channel',
+    'pending_transaction_id', 'transaction_code', 'transaction_type', 'category', 'category_id',
+    'personal_finance_category_confidence_level', 'personal_finance_category_detailed',
+    'personal_finance_category_primary', 'location_address', 'location_city', 'location_region',
+    'location_postal_code', 'location_country', 'location_store_number', 'payment_meta_reference_number',
+    'payment_meta_ppd_id', 'payment_meta_payee', 'payment_meta_by_order_of', 'payment_meta_payer',
+    'payment_meta_payment_method', 'payment_meta_payment_processor', 'payment_meta_reason'
+]
+
+def baseline_plaid_transactions(df):
+    df = clean_strings(df, PLAID_TRANSACTION_STRINGS)
+    df = clean_numeric(df, ['amount', 'location_lat', 'location_lon'])
+    df['iso_currency_code'] = df['iso_currency_code'].str.upper().apply(clean_currency_code)
+    df['unofficial_currency_code'] = df['unofficial_currency_code'].apply(lambda x: None if pd.isnull(x) or len(x) > 10 else x)
+    df = clean_dates(df, ['authorized_date', 'authorized_datetime', 'date', 'datetime'])
+    df['pending'] = df['pending'].astype(bool)
+    return df
+
+def baseline_mbna_accounts(df):
+    df = clean_strings(df, ['cardholder_name', 'account_number'])
+    df = clean_numeric(df, ['credit_limit', 'cash_advance_limit', 'credit_available', 'cash_advance_available'])
+    df = clean_dates(df, ['statement_closing_date'])
+    df['annual_interest_rate_purchases'] = df['annual_interest_rate_purchases'].apply(lambda x: x if 0 <= x <= 100 else None)
+    df['annual_interest_rate_balance_transfers'] = df['annual_interest_rate_balance_transfers'].apply(lambda x: x if 0 <= x <= 100 else None)
+    df['annual_interest_rate_cash_advances'] = df['annual_interest_rate_cash_advances'].apply(lambda x: x if 0 <= x <= 100 else None)
+    return df
+
+def baseline_mbna_transactions(df):
+    df = clean_strings(df, ['payeee', 'adrdress'])
+    df.rename(columns={'payeee': 'payee', 'adrdress': 'address'}, inplace=True)
+    df = clean_numeric(df, ['amount'])
+    df = clean_dates(df, ['posting_date'])
+    return df
+
+def make_plaid_transactions(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.choice(['12.50', ' 7', 'n/a', None], n),
+        'location_lat': rng.choice([45.5, None], n),
+        'location_lon': rng.choice(['-73.6', 'bad'], n),
+        'iso_currency_code': rng.choice(['usd', 'CAD', 'brl', 'EUR', ' cad'], n),
+        'unofficial_currency_code': rng.choice(['BTC', 'X' * 11, None], n),
+        'authorized_date': rng.choice(['2024-01-05', 'not a date', None], n),
+        'authorized_datetime': rng.choice(['2024-01-05 10:30:00', None], n),
+        'date': rng.choice(['2024-01-06', '2024/01/07'], n),
+        'datetime': rng.choice(['2024-01-06T08:00:00', None], n),
+        'pending': rng.choice([0, 1], n),
+    })
+    for col in PLAID_TRANSACTION_STRINGS:
+        df[col] = rng.choice([' a ', 'b', None], n)
+    return df
+
+class TestCleaningRules(unittest.TestCase):
+    def assert_matches_baseline(self, df, table_name, baseline):
+        expected = baseline(df.copy())
+        cleaned = clean_table(df.copy(), table_name)
+        pd.testing.assert_frame_equal(cleaned, expected)
+
+    def test_plaid_transactions(self):
+        self.assert_matches_baseline(make_plaid_transactions(), 'plaid_transactions', baseline_plaid_transactions)
+
+    def test_mbna_transactions_renames_after_cleaning(self):
+        df = pd.DataFrame({
+            'account_id': ['m1', 'm1', 'm2'],
+            'transaction_id': ['t1', 't2', 't3'],
+            'payeee': [' Store ', 'Cafe', None],
+            'adrdress': ['1 Main St ', None, ' 2 High St'],
+            'amount': ['10.5', 'oops', None],
+            'posting_date': ['2024-02-01', '02/03/2024', 'never'],
+        })
+        self.assert_matches_baseline(df, 'mbna_transactions', baseline_mbna_transactions)
+
+        cleaned = clean_table(df.copy(), 'mbna_transactions')
+        self.assertNotIn('payeee', cleaned.columns)
+        self.assertEqual(cleaned['payee'].tolist(), ['Store', 'Cafe', 'None'])
+
+    def test_mbna_accounts_bounds(self):
+        df = pd.DataFrame({
+            'cardholder_name': [' Ann ', 'Bo', 'Cy', 'Di'],
+            'account_number': ['001', ' 002', '003', '004'],
+            'credit_limit': ['5000', 'x', None, '100'],
+            'cash_advance_limit': [500, 600, None, 0],
+            'credit_available': ['1', '2', '3', '4'],
+            'cash_advance_available': [1.5, None, 2.5, 3.5],
+            'statement_closing_date': ['2024-03-01', None, 'bad', '2024-03-04'],
+            'annual_interest_rate_purchases': [19.99, -1.0, 100.0, 150.0],
+            'annual_interest_rate_balance_transfers': [0.0, 22.5, np.nan, 100.01],
+            'annual_interest_rate_cash_advances': [24.99, 24.99, 24.99, 24.99],
+        })
+        self.assert_matches_baseline(df, 'mbna_accounts', baseline_mbna_accounts)
+
+        cleaned = clean_table(df.copy(), 'mbna_accounts')
+        self.assertEqual(cleaned['annual_interest_rate_purchases'].isna().tolist(), [False, True, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+import sqlalchemy
+from _old.data_fetcher import fetch_data, fetch_all_data, load_fetched_table, load_watermarks
+
+class TestDataFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_folder = os.path.join(self.tmp_dir, 'fetched')
+        self.engine = sqlalchemy.create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'source.db')}")
+        self.transactions = pd.DataFrame({
+            'transaction_id': [f't{i}' for i in range(25)],
+            'date': [f'2024-01-{i + 1:02d}' for i in range(25)],
+            'amount': [float(i) for i in range(25)],
+        })
+        self.transactions.to_sql('plaid_transactions', self.engine, index=False)
+        pd.DataFrame({'account_id': ['a1', 'a2']}).to_sql('plaid_accounts', self.engine, index=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def parts(self, table_name):
+        return sorted(os.listdir(os.path.join(self.output_folder, table_name)))
+
+    def test_streams_table_in_chunks(self):
+        rows = fetch_data(self.engine, 'plaid_transactions', self.output_folder, chunk_size=10)
+
+        self.assertEqual(rows, 25)
+        self.assertEqual(len(self.parts('plaid_transactions')), 3)
+        pd.testing.assert_frame_equal(load_fetched_table('plaid_transactions', self.output_folder), self.transactions)
+
+        # A full re-fetch replaces the previous parts
+        fetch_data(self.engine, 'plaid_transactions', self.output_folder, chunk_size=20)
+        self.assertEqual(len(self.parts('plaid_transactions')), 2)
+        self.assertEqual(load_watermarks(self.output_folder), {})
+
+    def test_incremental_pull_from_watermark(self):
+        fetch_data(self.engine, 'plaid_transactions', self.output_folder, chunk_size=10, watermark_column='date')
+        self.assertEqual(load_watermarks(self.output_folder), {'plaid_transactions': '2024-01-25'})
+
+        new_rows = pd.DataFrame({
+            'transaction_id': ['t25', 't26', 't27'],
+            'date': ['2024-01-25', '2024-01-26', '2024-01-27'],
+            'amount': [25.0, 26.0, 27.0],
+        })
+        new_rows.to_sql('plaid_transactions', self.engine, index=False, if_exists='append')
+        rows = fetch_data(self.engine, 'plaid_transactions', self.output_folder, chunk_size=10, watermark_column='date')
+
+        # The rows sharing the previous watermark are pulled again along with the new ones
+        self.assertEqual(rows, 4)
+        self.assertEqual(len(self.parts('plaid_transactions')), 4)
+        self.assertEqual(load_watermarks(self.output_folder), {'plaid_transactions': '2024-01-27'})
+        fetched = load_fetched_table('plaid_transactions', self.output_folder)
+        self.assertEqual(len(fetched), 29)
+        self.assertEqual(fetched['transaction_id'].nunique(), 28)
+
+    def test_fetch_all_data(self):
+        rows = fetch_all_data(self.engine, ['plaid_transactions', 'plaid_accounts'], self.output_folder,
+                              chunk_size=10, max_workers=2)
+
+        self.assertEqual(rows, {'plaid_transactions': 25, 'plaid_accounts': 2})
+        self.assertEqual(load_watermarks(self.output_folder), {'plaid_transactions': '2024-01-25'})
+
+if __name__ == '__main__':
+    unittest.main()
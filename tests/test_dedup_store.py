@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from _old.dedup_store import (index_path, load_key_index, contains, filter_seen_rows, record_keys, hash_keys,
+                              compact_index)
+from _old.remove_duplicates import process_files
+from _old.table_registry import load_table_source
+
+class TestDedupStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_folder = os.path.join(self.tmp_dir, 'index')
+        self.path = index_path(self.index_folder, 'plaid_transactions')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_each_batch_appends_a_segment(self):
+        record_keys(self.path, np.array([5, 1, 3], dtype=np.uint64))
+        record_keys(self.path, np.array([2, 3], dtype=np.uint64))
+
+        index = load_key_index(self.path)
+        self.assertEqual([segment.tolist() for segment in index], [[1, 3, 5], [2, 3]])
+        self.assertEqual(contains(index, np.array([1, 2, 4, 5], dtype=np.uint64)).tolist(), [True, True, False, True])
+
+    def test_compaction_merges_segments(self):
+        for i in range(5):
+            record_keys(self.path, np.array([i, i + 10], dtype=np.uint64), max_segments=4)
+
+        index = load_key_index(self.path)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index[0].tolist(), [0, 1, 2, 3, 4, 10, 11, 12, 13, 14])
+
+        compact_index(self.path)
+        self.assertEqual(len(load_key_index(self.path)), 1)
+
+    def test_filter_seen_rows(self):
+        df = pd.DataFrame({'transaction_id': ['t1', 't2', 't3']})
+        record_keys(self.path, hash_keys(df.iloc[:2], ['transaction_id']))
+
+        kept, hashes, removed = filter_seen_rows(pd.DataFrame({'transaction_id': ['t2', 't3', 't4']}),
+                                                 ['transaction_id'], self.path)
+        self.assertEqual(kept['transaction_id'].tolist(), ['t3', 't4'])
+        self.assertEqual(len(hashes), 2)
+        self.assertEqual(removed, 1)
+
+class TestRemoveDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_folder = os.path.join(self.tmp_dir, 'index')
+        self.output_folder = os.path.join(self.tmp_dir, 'output')
+        self.report_path = os.path.join(self.tmp_dir, 'reports', 'remove_dupes_report.xlsx')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_batch(self, name, sources, report_output_path=None):
+        input_folder = os.path.join(self.tmp_dir, name)
+        os.makedirs(input_folder)
+        for file_name, df in sources.items():
+            df.to_parquet(os.path.join(input_folder, file_name), index=False)
+        report = process_files(input_folder, self.output_folder, max_workers=2, index_folder_path=self.index_folder,
+                               report_output_path=report_output_path or self.report_path)
+        return report
+
+    def output(self, name):
+        # Append-only tables are saved as a folder of parts, snapshot tables as one file
+        path = os.path.join(self.output_folder, name)
+        return load_table_source(path if os.path.isdir(path) else f'{path}.parquet')
+
+    def transactions(self, transaction_ids):
+        return pd.DataFrame({'transaction_id': transaction_ids, 'amount': range(len(transaction_ids))})
+
+    def test_removes_rows_ingested_by_earlier_runs(self):
+        report = self.run_batch('first', {'plaid_transactions.parquet': self.transactions(['t1', 't2', 't2', 't3'])})
+        self.assertEqual(self.output('plaid_transactions')['transaction_id'].tolist(), ['t1', 't2', 't3'])
+        self.assertEqual(report['Rows Removed'].tolist(), [1])
+
+        report = self.run_batch('second', {'plaid_transactions.parquet': self.transactions(['t3', 't4', 't4', 't1', 't5'])})
+        # The new rows are added as a part next to the first run's rows
+        self.assertEqual(len(os.listdir(os.path.join(self.output_folder, 'plaid_transactions'))), 2)
+        self.assertEqual(self.output('plaid_transactions')['transaction_id'].tolist(), ['t1', 't2', 't3', 't4', 't5'])
+        self.assertEqual(report['Rows Removed'].tolist(), [3])
+        pd.testing.assert_frame_equal(pd.read_excel(self.report_path), report)
+
+    def test_sources_of_the_same_table_share_the_index(self):
+        # Both files resolve to plaid_transactions and run in parallel workers
+        report = self.run_batch('first', {
+            'plaid_transactions_a.parquet': self.transactions(['t1', 't2', 't3', 't4']),
+            'plaid_transactions_b.parquet': self.transactions(['t3', 't4', 't5']),
+        })
+        kept = (self.output('plaid_transactions_a')['transaction_id'].tolist()
+                + self.output('plaid_transactions_b')['transaction_id'].tolist())
+        self.assertEqual(sorted(kept), ['t1', 't2', 't3', 't4', 't5'])
+        self.assertEqual(report['Rows Removed'].sum(), 2)
+
+    def test_snapshot_tables_are_replaced_whole(self):
+        accounts = pd.DataFrame({'account_id': ['a1', 'a2', 'a2'], 'current_balance': [10.0, 20.0, 20.0]})
+        self.run_batch('first', {'plaid_accounts.parquet': accounts})
+
+        # A re-fetch with updated balances replaces the previous output instead of being dropped as seen
+        updated = pd.DataFrame({'account_id': ['a1', 'a2'], 'current_balance': [15.0, 5.0]})
+        report = self.run_batch('second', {'plaid_accounts.parquet': updated})
+
+        pd.testing.assert_frame_equal(self.output('plaid_accounts'), updated)
+        self.assertEqual(report['Rows Removed'].tolist(), [0])
+        self.assertFalse(os.path.exists(os.path.join(self.index_folder, 'plaid_accounts')))
+
+    def test_report_in_working_directory(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        try:
+            self.run_batch('first', {'plaid_transactions.parquet': self.transactions(['t1'])},
+                           report_output_path='rep.xlsx')
+        finally:
+            os.chdir(cwd)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'rep.xlsx')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import pandas as pd
+from utils.dtype_optimizer import optimize_dtypes
+
+class TestOptimizeDtypes(unittest.TestCase):
+    def setUp(self):
+        n = 40
+        self.df = pd.DataFrame({
+            'account_id': [f'acc{i}' for i in range(n)],  # listed in CATEGORICAL_COLUMNS, all distinct
+            'channel': ['online', 'in store'] * (n // 2),  # low cardinality
+            'name': [f'Merchant {i}' for i in range(n)],  # high cardinality
+            'mixed': ['a', 1] * (n // 2),
+            'small_int': np.arange(n, dtype=np.int64),
+            'large_int': np.arange(n, dtype=np.int64) * 100_000,
+            'exact_float': np.linspace(0, 9.75, n),
+            'inexact_float': np.full(n, 0.1),
+            'with_nan': np.where(np.arange(n) % 3, 1.5, np.nan),
+            'flag': [True, False] * (n // 2),
+        })
+
+    def test_dtypes(self):
+        optimized = optimize_dtypes(self.df.copy())
+
+        self.assertEqual(optimized.dtypes.astype(str).to_dict(), {
+            'account_id': 'category',
+            'channel': 'category',
+            'name': 'object',
+            'mixed': 'object',
+            'small_int': 'int8',
+            'large_int': 'int32',
+            'exact_float': 'float32',
+            'inexact_float': 'float64',
+            'with_nan': 'float32',
+            'flag': 'bool',
+        })
+        self.assertLess(optimized.memory_usage(deep=True).sum(), self.df.memory_usage(deep=True).sum())
+
+    def test_values_round_trip(self):
+        optimized = optimize_dtypes(self.df.copy())
+        restored = optimized.astype(self.df.dtypes.to_dict())
+        pd.testing.assert_frame_equal(restored, self.df)
+
+    def test_only_listed_columns(self):
+        optimized = optimize_dtypes(self.df.copy(), categorical_columns=['name'], max_unique_ratio=0)
+        self.assertEqual(optimized['name'].dtype, 'category')
+        self.assertEqual(optimized['account_id'].dtype, object)
+        self.assertEqual(optimized['channel'].dtype, object)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import pandas as pd
+import sqlalchemy
+from utils.enriched_loader import load_enriched_table, load_enriched_tables
+
+class TestEnrichedLoader(unittest.TestCase):
+    def setUp(self):
+        self.engine = sqlalchemy.create_engine('sqlite://')
+        with self.engine.begin() as connection:
+            connection.execute(sqlalchemy.text("""
+                CREATE TABLE mbna_transactions_enriched (
+                    transaction_id INT PRIMARY KEY,
+                    file_id INT,
+                    account_id VARCHAR(255),
+                    posting_date DATE,
+                    payee VARCHAR(255),
+                    amount DECIMAL(10, 2)
+                )"""))
+        self.sample_data = pd.DataFrame({
+            'transaction_id': range(1, 8),
+            'account_id': pd.Categorical(['a1', 'a1', 'a2', 'a2', 'a2', 'a1', 'a2']),
+            'posting_date': pd.to_datetime(['2024-01-02', '2024-01-03', None, '2024-02-01',
+                                            '2024-02-05', '2024-03-01', '2024-03-02']),
+            'payee': ['Uber', 'Costco', None, 'Uber', 'Rent', 'Costco', 'Uber'],
+            'amount': [12.5, 80.0, 5.25, 13.0, 1200.0, 64.1, float('nan')],
+            'transaction_direction': ['outflow'] * 7,
+        })
+
+    def _read_table(self):
+        return pd.read_sql('SELECT * FROM mbna_transactions_enriched ORDER BY transaction_id', self.engine)
+
+    def test_batched_load_and_report(self):
+        report = load_enriched_table(self.engine, self.sample_data, 'mbna_transactions_enriched', batch_size=3)
+        self.assertEqual((report['rows'], report['batches']), (7, 3))
+
+        result = self._read_table()
+        self.assertEqual(result['transaction_id'].tolist(), list(range(1, 8)))
+        self.assertEqual(result['payee'].isnull().sum(), 1)
+        self.assertTrue(pd.isnull(result.loc[2, 'posting_date']))
+        self.assertTrue(pd.isnull(result.loc[6, 'amount']))
+        self.assertEqual(str(result.loc[0, 'posting_date']), '2024-01-02')
+
+    def test_reload_updates_in_place(self):
+        load_enriched_table(self.engine, self.sample_data, 'mbna_transactions_enriched')
+        updated = self.sample_data.iloc[:2].drop(columns='payee').assign(amount=[1.0, 2.0])
+        reports = load_enriched_tables(self.engine, {'mbna_transactions_enriched': updated})
+        self.assertEqual(reports['rows'].tolist(), [2])
+
+        result = self._read_table()
+        self.assertEqual(len(result), 7)
+        self.assertEqual(result['amount'].iloc[:2].astype(float).tolist(), [1.0, 2.0])
+        # Columns absent from the update keep their loaded values
+        self.assertEqual(result['payee'].iloc[:2].tolist(), ['Uber', 'Costco'])
+
+    def test_missing_key_column(self):
+        with self.assertRaises(ValueError):
+            load_enriched_table(self.engine, self.sample_data.drop(columns='transaction_id'),
+                                'mbna_transactions_enriched')
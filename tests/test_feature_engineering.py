@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from scripts.feature_engineering import (create_derived_features, encode_categorical_variables, fit_categorical_encoders,
+                                         transform_categorical_variables, save_categorical_encoders,
+                                         load_categorical_encoders)
+
+class TestCategoricalEncoding(unittest.TestCase):
+    def setUp(self):
+        self.sample_data = pd.DataFrame({
+            'account_type': ['depository', 'credit', 'credit', 'depository'],
+            'personal_finance_category_primary': ['TRAVEL', 'RENT', 'TRAVEL', 'FOOD_AND_DRINK'],
+            'merchant_name': ['UBER', 'COSTCO', 'UBER', 'NAN'],
+        })
+
+    def test_sparse_matches_dense(self):
+        dense = encode_categorical_variables(self.sample_data.copy())
+        sparse = encode_categorical_variables(self.sample_data.copy(), sparse=True)
+        onehot_columns = [col for col in sparse.columns if col not in self.sample_data.columns and col != 'merchant_encoded']
+        self.assertTrue(all(isinstance(sparse[col].dtype, pd.SparseDtype) for col in onehot_columns))
+        pd.testing.assert_frame_equal(sparse.astype({col: float for col in onehot_columns}), dense)
+
+    def test_persisted_encoders_transform_new_batch(self):
+        encoders = fit_categorical_encoders(self.sample_data)
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'encoders.joblib')
+            save_categorical_encoders(encoders, path)
+            encoders = load_categorical_encoders(path)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        new_batch = pd.DataFrame({
+            'account_type': ['credit', 'loan'],
+            'personal_finance_category_primary': ['RENT', 'TRAVEL'],
+            'merchant_name': ['UBER', 'NEW MERCHANT'],
+        })
+        encoded = transform_categorical_variables(new_batch, encoders)
+        self.assertEqual(encoded['merchant_encoded'].tolist(), [2, -1])
+        self.assertEqual(encoded['account_type_credit'].tolist(), [1.0, 0.0])
+        self.assertEqual(encoded['account_type_depository'].tolist(), [0.0, 0.0])
+
+class TestDerivedFeatures(unittest.TestCase):
+    def test_precomputed_features_are_kept(self):
+        df = pd.DataFrame({
+            'transaction_id': ['t1', 't2', 't3'],
+            'transaction_date': pd.to_datetime(['2024-01-29', '2024-01-31', '2024-02-01']),
+            'account_current_balance': [100.0, 200.0, 300.0],
+            'merchant_name': ['UBER', 'UBER', 'COSTCO'],
+            'personal_finance_category_primary': ['TRAVEL', 'TRAVEL', 'TRAVEL'],
+            'merchant_frequency': [5, 5, 7],
+        })
+        result = create_derived_features(df.copy(), precomputed=['merchant_frequency', 'category_frequency'])
+        self.assertEqual(result['merchant_frequency'].tolist(), [5, 5, 7])
+        # Listed but not loaded, so still computed
+        self.assertEqual(result['category_frequency'].tolist(), [3, 3, 3])
+        self.assertEqual(result['transaction_day_of_week'].tolist(), [0, 2, 3])
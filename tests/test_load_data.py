@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from utils.load_data import load_dataset, cache_dataset
+
+class TestLoadData(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, 'transactions.xlsx')
+        pd.DataFrame({
+            'transaction_id': ['t1', 't2', 't3'],
+            'transaction_amount': [-100.0, 50.0, -25.5],
+            'is_transaction_outflow': [1, 0, 1]
+        }).to_excel(self.file_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_dataset_standardizes(self):
+        df = load_dataset(self.file_path, use_cache=False)
+        self.assertEqual(df['transaction_amount'].tolist(), [100.0, 50.0, 25.5])
+        self.assertEqual(df['transaction_direction'].tolist(), ['outflow', 'inflow', 'outflow'])
+
+    def test_cache_hit_matches_source(self):
+        first = load_dataset(self.file_path)
+        _, cache_hit = cache_dataset(self.file_path)
+        self.assertTrue(cache_hit)
+        pd.testing.assert_frame_equal(first, load_dataset(self.file_path))
+
+    def test_cache_invalidated_on_change(self):
+        load_dataset(self.file_path)
+        pd.DataFrame({
+            'transaction_id': ['t4'],
+            'transaction_amount': [-10.0],
+            'is_transaction_outflow': [1]
+        }).to_excel(self.file_path, index=False)
+        df = load_dataset(self.file_path)
+        self.assertEqual(df['transaction_id'].tolist(), ['t4'])
@@ -0,0 +1,46 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd
+from scripts.feature_engineering import fit_categorical_encoders, onehot_feature_matrix, transform_categorical_variables
+from scripts.ml_pipeline import train_category_predictor, FEATURE_COLUMNS
+
+class TestTrainCategoryPredictor(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        self.df = pd.DataFrame({column: rng.normal(size=n) for column in FEATURE_COLUMNS})
+        self.df['account_type'] = rng.choice(['depository', 'credit', 'loan'], n)
+        # Unrelated to every feature, so only a leaked target could predict it
+        self.df['personal_finance_category_primary'] = rng.choice(['TRAVEL', 'RENT', 'FOOD_AND_DRINK'], n)
+        self.df['merchant_name'] = 'UBER'
+        self.encoders = fit_categorical_encoders(self.df)
+
+    def train(self, sparse_features):
+        with redirect_stdout(io.StringIO()):
+            return train_category_predictor(self.df, sparse_features=sparse_features)
+
+    def test_sparse_matrix_excludes_target_columns(self):
+        model = self.train(onehot_feature_matrix(self.df, self.encoders))
+
+        # The three account type columns, without the three category columns
+        self.assertEqual(model.n_features_in_, len(FEATURE_COLUMNS) + 3)
+        importances = model.feature_importances_[len(FEATURE_COLUMNS):]
+        self.assertLess(importances.sum(), 0.5)
+
+    def test_sparse_dataframe_excludes_target_columns(self):
+        encoded = transform_categorical_variables(self.df.copy(), self.encoders, sparse=True)
+        onehot_columns = [col for col in encoded.columns if isinstance(encoded[col].dtype, pd.SparseDtype)]
+        self.assertEqual(len(onehot_columns), 6)
+
+        model = self.train(encoded[onehot_columns])
+        self.assertEqual(model.n_features_in_, len(FEATURE_COLUMNS) + 3)
+
+    def test_unnamed_matrix_is_rejected(self):
+        matrix, _ = onehot_feature_matrix(self.df, self.encoders)
+        with self.assertRaises(ValueError):
+            self.train(matrix)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scripts.anomaly_detection import detect_anomalies
+from scripts.online_anomaly_detection import detect_anomalies_online
+
+FLAGS = ['is_amount_anomaly', 'is_large_transaction', 'is_high_frequency', 'potential_fraud']
+
+class TestOnlineAnomalyDetection(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 400
+        accounts = [f'a{i}' for i in range(100)]
+        amounts = rng.exponential(40, n).round(2)
+        amounts[rng.choice(n, 6, replace=False)] *= 30
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(accounts, n),
+            'transaction_id': [f't{i}' for i in range(n)],
+            'transaction_amount': amounts,
+        })
+        self.sample_data.loc[[5, 50], 'account_id'] = None
+        self.sample_data.loc[[7, 90], 'transaction_id'] = None
+
+    def test_single_batch_matches_detect_anomalies(self):
+        expected = detect_anomalies(self.sample_data.copy())
+        result, _ = detect_anomalies_online(self.sample_data.copy())
+        self.assertTrue(expected[FLAGS].any().all())
+        pd.testing.assert_frame_equal(result[FLAGS], expected[FLAGS], check_dtype=False)
+
+    def test_incremental_batches_match_full_recompute(self):
+        state = None
+        for start in range(0, len(self.sample_data), 100):
+            batch, state = detect_anomalies_online(self.sample_data.iloc[start:start + 100].copy(), state)
+            expected = detect_anomalies(self.sample_data.iloc[:start + 100].copy()).iloc[start:]
+            pd.testing.assert_frame_equal(batch[FLAGS], expected[FLAGS], check_dtype=False)
+
+    def test_missing_amount_is_not_flagged(self):
+        self.sample_data.loc[3, 'transaction_amount'] = np.nan
+        state = None
+        for start in range(0, len(self.sample_data), 100):
+            batch, state = detect_anomalies_online(self.sample_data.iloc[start:start + 100].copy(), state)
+
+        # Later batches are flagged as if the missing amount had never been seen
+        valid = self.sample_data.drop(index=3)
+        expected = detect_anomalies(valid.copy()).loc[300:, 'is_amount_anomaly']
+        self.assertTrue(expected.any())
+        pd.testing.assert_series_equal(batch['is_amount_anomaly'], expected, check_dtype=False)
+
+        first, _ = detect_anomalies_online(self.sample_data.iloc[:100].copy())
+        self.assertFalse(first.loc[3, 'is_amount_anomaly'])
+        self.assertEqual(state['global']['count'], len(valid))
+        self.assertEqual(state['global']['missing'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from utils.output_writer import write_output
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 90
+        self.sample_data = pd.DataFrame({
+            'account_id': pd.Categorical(rng.choice(['a1', 'a2'], n)),
+            'transaction_id': [f't{i}' for i in range(n)],
+            'transaction_date': pd.date_range('2024-01-15', periods=n, freq='D'),
+            'transaction_amount': rng.normal(50, 20, n).round(2),
+            'merchant_name_Uber': rng.integers(0, 2, n).astype(np.uint8),
+        })
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parquet_partitions_by_account_and_month(self):
+        path = write_output(self.sample_data, self.tmp_dir, 'parquet', row_group_size=25)
+        self.assertTrue(os.path.isdir(os.path.join(path, 'account_id=a1', 'month=2024-02')))
+
+        result = pd.read_parquet(path)
+        self.assertEqual(len(result), len(self.sample_data))
+        self.assertEqual(sorted(result['month'].astype(str).unique()), ['2024-01', '2024-02', '2024-03', '2024-04'])
+        month = pd.read_parquet(path, filters=[('account_id', '=', 'a2'), ('month', '=', '2024-03')])
+        expected = self.sample_data[(self.sample_data['account_id'] == 'a2') &
+                                    (self.sample_data['transaction_date'].dt.month == 3)]
+        self.assertEqual(sorted(month['transaction_id']), sorted(expected['transaction_id']))
+
+    def test_feather_and_csv_round_trip(self):
+        feather = pd.read_feather(write_output(self.sample_data, self.tmp_dir, 'feather', row_group_size=25))
+        pd.testing.assert_frame_equal(feather, self.sample_data)
+
+        csv = pd.read_csv(write_output(self.sample_data, self.tmp_dir, 'csv', row_group_size=25))
+        self.assertEqual(csv['transaction_id'].tolist(), self.sample_data['transaction_id'].tolist())
+        self.assertEqual(csv['account_id'].tolist(), self.sample_data['account_id'].tolist())
+        np.testing.assert_allclose(csv['transaction_amount'], self.sample_data['transaction_amount'])
+
+    def test_excel_export_is_capped(self):
+        path = write_output(self.sample_data, self.tmp_dir, 'excel', max_rows=40, row_group_size=15)
+        result = pd.read_excel(path)
+        self.assertEqual(len(result), 40)
+        self.assertEqual(result['transaction_id'].tolist(), self.sample_data['transaction_id'].iloc[:40].tolist())
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            write_output(self.sample_data, self.tmp_dir, 'xml')
@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scripts.time_series_preparation import prepare_time_series
+from scripts.anomaly_detection import detect_anomalies
+from scripts.feature_engineering import create_advanced_features
+
+class TestPartitionedExecutor(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 300
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(['a1', 'a2', 'a3', 'a4', None], n),
+            'transaction_id': [f't{i}' for i in range(n)],
+            'transaction_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120, n), unit='D'),
+            'transaction_amount': rng.exponential(40, n).round(2),
+            'personal_finance_category_primary': rng.choice(['FOOD_AND_DRINK', 'TRAVEL'], n),
+        })
+
+    def test_prepare_time_series_parallel_matches_serial(self):
+        serial = prepare_time_series(self.sample_data.copy())
+        parallel = prepare_time_series(self.sample_data.copy(), n_jobs=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_detect_anomalies_parallel_matches_serial(self):
+        serial = detect_anomalies(self.sample_data.copy())
+        parallel = detect_anomalies(self.sample_data.copy(), n_jobs=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_create_advanced_features_parallel_matches_serial(self):
+        serial = create_advanced_features(self.sample_data.copy())
+        parallel = create_advanced_features(self.sample_data.copy(), n_jobs=2)
+        pd.testing.assert_frame_equal(serial, parallel)
@@ -0,0 +1,86 @@
+import os
+import shutil
+import inspect
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from utils import pipeline_runner
+from utils.pipeline_runner import run_pipeline_steps, fingerprint_step
+from scripts.feature_engineering import create_derived_features
+
+calls = []
+
+def add_total(df, factor=1):
+    calls.append('add_total')
+    df['total'] = df['amount'] * factor
+    return df
+
+def add_sparse_flag(df):
+    calls.append('add_sparse_flag')
+    df['flag'] = pd.arrays.SparseArray([0, 1, 0])
+    return df
+
+class TestPipelineRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.sample_data = pd.DataFrame({'amount': [1.0, 2.0, 3.0]})
+        calls.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_steps(self, df, steps):
+        return run_pipeline_steps(df.copy(), steps, cache_dir=self.tmp_dir)
+
+    def test_cache_hit_skips_step(self):
+        steps = [("Add total", add_total, {'factor': 2})]
+        first = self.run_steps(self.sample_data, steps)
+        second = self.run_steps(self.sample_data, steps)
+
+        self.assertEqual(calls, ['add_total'])
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_input_change_misses(self):
+        steps = [("Add total", add_total, {'factor': 2})]
+        self.run_steps(self.sample_data, steps)
+        result = self.run_steps(pd.DataFrame({'amount': [1.0, 2.0, 4.0]}), steps)
+
+        self.assertEqual(calls, ['add_total', 'add_total'])
+        self.assertEqual(result['total'].tolist(), [2.0, 4.0, 8.0])
+
+    def test_config_change_misses(self):
+        self.run_steps(self.sample_data, [("Add total", add_total, {'factor': 2})])
+        result = self.run_steps(self.sample_data, [("Add total", add_total, {'factor': 3})])
+
+        self.assertEqual(calls, ['add_total', 'add_total'])
+        self.assertEqual(result['total'].tolist(), [3.0, 6.0, 9.0])
+
+    def test_sparse_output_is_not_cached(self):
+        steps = [("Add sparse flag", add_sparse_flag)]
+        with self.assertLogs(level='WARNING'):
+            first = self.run_steps(self.sample_data, steps)
+        second = self.run_steps(self.sample_data, steps)
+
+        self.assertEqual(calls, ['add_sparse_flag', 'add_sparse_flag'])
+        self.assertIsInstance(first['flag'].dtype, pd.SparseDtype)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if name.endswith('.tmp')])
+
+    def test_imported_helper_change_changes_fingerprint(self):
+        modules = [module.__name__ for module in pipeline_runner._step_modules(create_derived_features)]
+        self.assertIn('scripts.rolling_features', modules)
+        self.assertNotIn('pandas', modules)
+
+        getsource = inspect.getsource
+        def edited(obj):
+            source = getsource(obj)
+            return source + '\n# edited' if getattr(obj, '__name__', None) == 'scripts.rolling_features' else source
+
+        before = fingerprint_step(create_derived_features)
+        with mock.patch.object(pipeline_runner.inspect, 'getsource', side_effect=edited):
+            after = fingerprint_step(create_derived_features)
+        self.assertNotEqual(before, after)
+
+if __name__ == '__main__':
+    unittest.main()
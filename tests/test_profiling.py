@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from utils.pipeline_runner import run_pipeline_steps
+from utils.profiling import PipelineProfiler, load_metrics
+from main import parse_args
+
+def add_total(df, factor=1):
+    df['total'] = df['amount'] * factor
+    return df
+
+def drop_small(df):
+    return df[df['amount'] > 1]
+
+class TestPipelineProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_records_step_metrics(self):
+        metrics_path = os.path.join(self.tmp_dir, 'metrics.jsonl')
+        profiler = PipelineProfiler(metrics_path=metrics_path, profile_dir=self.tmp_dir, trace_memory=True)
+        steps = [("Add total", add_total, {'factor': 2}), ("Drop small", drop_small)]
+        result = run_pipeline_steps(pd.DataFrame({'amount': [1.0, 2.0, 3.0]}), steps, profiler=profiler)
+
+        self.assertEqual(result['total'].tolist(), [4.0, 6.0])
+        summary = profiler.summary()
+        self.assertEqual(summary['step'].tolist(), ["Add total", "Drop small"])
+        self.assertEqual(summary['output_rows'].tolist(), [3, 2])
+        self.assertTrue((summary['wall_seconds'] >= 0).all())
+        self.assertIsNotNone(summary['traced_peak_mb'].iloc[0])
+
+        metrics = load_metrics(metrics_path)
+        self.assertEqual(len(metrics), 2)
+        self.assertEqual(set(metrics['column_memory_mb'].iloc[1]), {'amount', 'total'})
+        self.assertTrue(all(os.path.exists(path) for path in metrics['profile_path']))
+
+    def test_cache_hits_are_recorded(self):
+        metrics_path = os.path.join(self.tmp_dir, 'metrics.jsonl')
+        cache_dir = os.path.join(self.tmp_dir, 'cache')
+        steps = [("Add total", add_total, {'factor': 2}), ("Drop small", drop_small)]
+        df = pd.DataFrame({'amount': [1.0, 2.0, 3.0]})
+        run_pipeline_steps(df.copy(), steps, cache_dir=cache_dir)
+
+        profiler = PipelineProfiler(metrics_path=metrics_path)
+        result = run_pipeline_steps(df.copy(), steps, cache_dir=cache_dir, profiler=profiler)
+
+        self.assertEqual(result['total'].tolist(), [4.0, 6.0])
+        summary = profiler.summary()
+        self.assertEqual(summary['step'].tolist(), ["Add total", "Drop small"])
+        self.assertEqual(summary['cache_hit'].tolist(), [True, True])
+        self.assertEqual(summary['wall_seconds'].tolist(), [0.0, 0.0])
+        self.assertEqual(summary['output_rows'].tolist(), [3, 2])
+        self.assertEqual(summary['output_columns'].tolist(), [2, 2])
+        self.assertEqual(load_metrics(metrics_path)['cache_hit'].tolist(), [True, True])
+
+class TestProfileArgs(unittest.TestCase):
+    def test_profile_options_imply_profile(self):
+        self.assertFalse(parse_args([]).profile)
+        self.assertTrue(parse_args(['--profile-cpu']).profile)
+        self.assertTrue(parse_args(['--trace-memory']).profile)
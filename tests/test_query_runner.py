@@ -0,0 +1,163 @@
+import os
+import shutil
+import datetime
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from utils.query_runner import build_query, load_transactions
+from scripts.data_cleaning import handle_missing_values, standardize_categories
+from scripts.feature_engineering import create_derived_features
+
+class TestQueryRunner(unittest.TestCase):
+    def setUp(self):
+        self.sample_data = pd.DataFrame({
+            'account_id': ['a1', 'a1', 'a2', 'a2', 'a2'],
+            'transaction_id': ['t1', 't2', 't3', 't4', 't5'],
+            'transaction_date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-05', '2024-01-06']),
+            'transaction_amount': [-10.0, 25.0, -5.0, -7.5, 12.0],
+            'transaction_amount_absolute': [10.0, 25.0, 5.0, 7.5, 12.0],
+            'is_transaction_outflow': [1, 0, 1, 1, 0],
+            'account_current_balance': [100.0, 100.0, 50.0, 50.0, 50.0],
+            'merchant_name': ['Uber', 'UBER*TRIP', float('nan'), 'Costco', 'uber'],
+            'personal_finance_category_primary': ['FOOD_AND_DRINK_RESTAURANT', 'FOOD_AND_DRINK', 'TRAVEL',
+                                                  float('nan'), 'FOOD_AND_DRINK_FAST_FOOD'],
+        })
+        # SQLite supports the window functions used by the push-down
+        self.engine = sqlalchemy.create_engine('sqlite://')
+        self.sample_data.to_sql('transactions', self.engine, index=False)
+
+    def _run(self, **options):
+        query = build_query('SELECT * FROM transactions', **options)
+        return pd.read_sql(query + ' ORDER BY base.transaction_id', self.engine)
+
+    def test_standardization_in_sql(self):
+        result = self._run(push_down=False)
+        self.assertEqual(result['standardized_transaction_amount'].tolist(), [10.0, 25.0, 5.0, 7.5, 12.0])
+        self.assertEqual(result['transaction_direction'].tolist(), ['outflow', 'inflow', 'outflow', 'outflow', 'inflow'])
+        self.assertNotIn('merchant_frequency', result.columns)
+
+    def test_pushed_down_frequencies_match_pandas(self):
+        result = self._run()
+        expected = create_derived_features(standardize_categories(handle_missing_values(self.sample_data.copy())))
+        self.assertEqual(result['merchant_frequency'].tolist(), expected['merchant_frequency'].tolist())
+        self.assertEqual(result['category_frequency'].tolist(), expected['category_frequency'].tolist())
+
+def _date(value):
+    return datetime.date.fromisoformat(str(value)[:10])
+
+def register_mysql_functions(dbapi_connection, plaid_path=None):
+    """SQLite stand-ins for the MySQL functions and the plaid schema used by the base queries."""
+    dbapi_connection.create_function('IF', 3, lambda condition, a, b: a if condition else b)
+    dbapi_connection.create_function('DAY', 1, lambda d: None if d is None else _date(d).day)
+    dbapi_connection.create_function('MONTH', 1, lambda d: None if d is None else _date(d).month)
+    dbapi_connection.create_function('YEAR', 1, lambda d: None if d is None else _date(d).year)
+    dbapi_connection.create_function('WEEKDAY', 1, lambda d: None if d is None else _date(d).weekday())
+    # 1 = Sunday ... 7 = Saturday
+    dbapi_connection.create_function('DAYOFWEEK', 1, lambda d: None if d is None else _date(d).isoweekday() % 7 + 1)
+    if plaid_path is not None:
+        dbapi_connection.execute(f"ATTACH DATABASE '{plaid_path}' AS plaid")
+
+class TestLoadTransactions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = sqlalchemy.create_engine(f"sqlite:///{os.path.join(self.tmp_dir, 'plaid_data.db')}")
+        plaid_path = os.path.join(self.tmp_dir, 'plaid.db')
+        sqlalchemy.event.listen(self.engine, 'connect',
+                                lambda dbapi_connection, _: register_mysql_functions(dbapi_connection, plaid_path))
+
+        rng = np.random.default_rng(23)
+        n = 500
+        accounts = ['acc1', 'acc2', 'acc3']
+        dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D')
+        self.transactions = pd.DataFrame({
+            'transaction_id': [f't{i:03d}' for i in range(n)],
+            'account_id': rng.choice(accounts, n),
+            'amount': rng.normal(0, 50, n).round(2),
+            'date': dates.strftime('%Y-%m-%d'),
+            'authorized_date': dates.strftime('%Y-%m-%d'),
+            'merchant_name': rng.choice(['Uber', 'UBER*TRIP', 'Costco', None], n),
+            'personal_finance_category_primary': rng.choice(['FOOD_AND_DRINK', 'TRAVEL'], n),
+            'category_id': rng.choice(['c1', 'c2'], n),
+            'iso_currency_code': 'CAD',
+        })
+        for col in ['unofficial_currency_code', 'logo_url', 'merchant_entity_id', 'name', 'payment_channel', 'pending',
+                    'pending_transaction_id', 'transaction_code', 'transaction_type',
+                    'personal_finance_category_confidence_level', 'personal_finance_category_detailed',
+                    'personal_finance_category_icon_url', 'location_address', 'location_city', 'location_region',
+                    'location_postal_code', 'location_country', 'location_lat', 'location_lon', 'location_store_number',
+                    'payment_meta_reference_number', 'payment_meta_ppd_id', 'payment_meta_payee',
+                    'payment_meta_by_order_of', 'payment_meta_payer', 'payment_meta_payment_method',
+                    'payment_meta_payment_processor', 'payment_meta_reason', 'website', 'check_number']:
+            self.transactions[col] = None
+
+        tables = {
+            'plaid_transactions': self.transactions,
+            'asset_report': pd.DataFrame({'asset_report_id': ['r1']}),
+            'asset_item': pd.DataFrame({'item_id': ['i1'], 'asset_report_id': ['r1'], 'institution_name': ['Chase']}),
+            'asset_account': pd.DataFrame({
+                'account_id': accounts, 'asset_report_id': 'r1', 'item_id': 'i1', 'name': 'Account',
+                'official_name': 'Chase Account', 'mask': 1234, 'days_available': 90,
+                'type': ['depository', 'credit', 'depository'], 'subtype': 'checking', 'current': 100.0,
+                'available': 50.0, 'limit': [None, 1000.0, None], 'iso_currency_code': 'CAD',
+                'unofficial_currency_code': None, 'margin_loan_amount': None,
+            }),
+            'plaid_liabilities_credit_apr': pd.DataFrame({'account_id': ['acc2', 'acc2'],
+                                                          'apr_type': ['purchase_apr', 'cash_apr'],
+                                                          'apr_percentage': [19.99, 22.99]}),
+            'asset_transaction': pd.DataFrame({'transaction_id': self.transactions['transaction_id'],
+                                               'asset_report_id': 'r1',
+                                               'account_id': self.transactions['account_id']}),
+        }
+        with self.engine.begin() as connection:
+            for name, df in tables.items():
+                df.to_sql(name, connection, index=False)
+            pd.DataFrame({'category_id': ['c1', 'c2'], 'category_group': ['place', 'special'],
+                          'hierarchy_level1': ['Food', 'Travel'], 'hierarchy_level2': [None, 'Airlines'],
+                          'hierarchy_level3': None}).to_sql('categories', connection, schema='plaid', index=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_loads_every_transaction(self):
+        result = load_transactions(self.engine).sort_values('transaction_id').reset_index(drop=True)
+        expected = self.transactions.sort_values('transaction_id').reset_index(drop=True)
+
+        self.assertEqual(len(result), 500)
+        self.assertEqual(result['transaction_id'].tolist(), expected['transaction_id'].tolist())
+        self.assertNotIn('standardized_transaction_amount', result.columns)
+        # Plaid amounts are positive for outflows; the pipeline works on the absolute amount
+        np.testing.assert_allclose(result['transaction_amount'], expected['amount'].abs())
+        self.assertEqual(result['transaction_direction'].astype(str).tolist(),
+                         np.where(expected['amount'] > 0, 'outflow', 'inflow').tolist())
+        self.assertEqual(result['transaction_day_of_week'].tolist(),
+                         pd.to_datetime(expected['date']).dt.dayofweek.tolist())
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['transaction_date']))
+        self.assertEqual(set(result.loc[result['account_id'] == 'acc2', 'account_purchase_annual_interest_rate']), {19.99})
+        self.assertEqual(result['merchant_frequency'].sum(),
+                         expected.groupby(expected['merchant_name'].fillna('nan').str.upper()
+                                          .replace({'UBER*TRIP': 'UBER'}))['transaction_id']
+                         .transform('count').sum())
+
+    def test_date_and_account_filters(self):
+        result = load_transactions(self.engine, start_date='2024-02-01', end_date='2024-02-29',
+                                   account_ids=['acc1', 'acc3'])
+        dates = pd.to_datetime(self.transactions['date'])
+        expected = self.transactions[(dates >= '2024-02-01') & (dates <= '2024-02-29') &
+                                     self.transactions['account_id'].isin(['acc1', 'acc3'])]
+
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(sorted(result['transaction_id']), sorted(expected['transaction_id']))
+        self.assertEqual(set(result['account_id'].astype(str)), {'acc1', 'acc3'})
+        self.assertGreaterEqual(result['transaction_date'].min(), pd.Timestamp('2024-02-01'))
+        self.assertLessEqual(result['transaction_date'].max(), pd.Timestamp('2024-02-29'))
+
+    def test_open_date_range_and_single_account(self):
+        result = load_transactions(self.engine, end_date='2024-01-15', account_ids=['acc2'], push_down=False)
+        dates = pd.to_datetime(self.transactions['date'])
+        expected = self.transactions[(dates <= '2024-01-15') & (self.transactions['account_id'] == 'acc2')]
+
+        self.assertEqual(sorted(result['transaction_id']), sorted(expected['transaction_id']))
+        self.assertNotIn('merchant_frequency', result.columns)
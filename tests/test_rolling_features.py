@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scripts.rolling_features import compute_rolling_features
+
+class TestRollingFeatures(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 400
+        amounts = rng.normal(30, 15, n)
+        amounts[rng.integers(0, n, 20)] = np.nan
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(['a1', 'a2', 'a3'], n),
+            'transaction_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+            'transaction_amount': amounts,
+        }).sample(frac=1, random_state=0)
+
+    def expected(self, window, stat):
+        ordered = self.sample_data.sort_values(['account_id', 'transaction_date'], kind='stable')
+        parts = []
+        for _, account_df in ordered.groupby('account_id'):
+            rolled = account_df.set_index('transaction_date')['transaction_amount'].rolling(window)
+            parts.append(pd.Series(getattr(rolled, stat)().to_numpy(), index=account_df.index))
+        return pd.concat(parts).reindex(self.sample_data.index)
+
+    def test_matches_pandas_time_based_rolling(self):
+        windows = {
+            '7d_mean': ('7D', 'mean'),
+            '7d_sum': ('7D', 'sum'),
+            '30d_count': ('30D', 'count'),
+            '30d_std': ('30D', 'std'),
+        }
+        result = compute_rolling_features(self.sample_data, windows)
+        self.assertTrue(result.index.equals(self.sample_data.index))
+        for column_name, (window, stat) in windows.items():
+            np.testing.assert_allclose(result[column_name], self.expected(window, stat), rtol=1e-9, atol=1e-9)
+
+    def test_missing_account_gives_nan(self):
+        df = self.sample_data.copy()
+        df.iloc[0, df.columns.get_loc('account_id')] = None
+        result = compute_rolling_features(df, {'7d_mean': ('7D', 'mean')})
+        self.assertTrue(np.isnan(result['7d_mean'].iloc[0]))
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from scripts.data_consolidation import consolidate_data
+from scripts.data_cleaning import handle_missing_values, correct_data_types, standardize_categories
+from scripts.feature_engineering import create_derived_features, encode_categorical_variables, normalize_numerical_features
+from scripts.streaming_pipeline import run_streaming_pipeline
+from utils.dtype_optimizer import optimize_dtypes
+
+class TestStreamingPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        amounts = rng.normal(50, 20, n).round(2)
+        amounts[[3, 70, 150]] = np.nan
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(['a1', 'a2', 'a3'], n),
+            'transaction_id': [f't{i}' for i in range(n)],
+            'transaction_date': pd.date_range('2024-01-01', periods=n, freq='D').strftime('%Y-%m-%d'),
+            'transaction_amount': amounts,
+            'account_current_balance': rng.normal(1000, 300, n).round(2),
+            'account_limit': rng.choice([0.0, 5000.0, np.nan], n),
+            'account_type': rng.choice(['depository', 'credit'], n),
+            'merchant_name': rng.choice(['Uber', 'uber*trip', 'Costco', None], n),
+            'personal_finance_category_primary': rng.choice(['FOOD_AND_DRINK_RESTAURANT', 'TRAVEL', 'RENT'], n),
+        })
+        self.tmp_dir = tempfile.mkdtemp()
+        self.parquet_path = os.path.join(self.tmp_dir, 'input.parquet')
+        self.sample_data.to_parquet(self.parquet_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_streaming_matches_batch(self):
+        expected = self.sample_data.copy()
+        for step in [consolidate_data, handle_missing_values, correct_data_types, standardize_categories,
+                     create_derived_features, encode_categorical_variables, normalize_numerical_features]:
+            expected = step(expected)
+
+        output_path = os.path.join(self.tmp_dir, 'output.parquet')
+        validation = run_streaming_pipeline(self.parquet_path, output_path, chunk_size=37)
+        result = pd.read_parquet(output_path)
+
+        self.assertEqual(validation['total_transactions'], len(expected))
+        self.assertEqual(sorted(result.columns), sorted(expected.columns))
+        pd.testing.assert_frame_equal(result[expected.columns], expected.reset_index(drop=True), check_dtype=False)
+
+    def test_streaming_matches_batch_with_categoricals(self):
+        # Missing values read from Excel are NaN, which becomes 'nan' for both dtypes
+        merchants = self.sample_data['merchant_name']
+        self.sample_data['merchant_name'] = merchants.where(merchants.notna(), np.nan)
+        optimized = optimize_dtypes(self.sample_data.copy())
+        self.assertEqual(optimized['merchant_name'].dtype, 'category')
+        optimized.to_parquet(self.parquet_path, index=False)
+
+        expected = self.sample_data.copy()
+        for step in [consolidate_data, handle_missing_values, correct_data_types, standardize_categories,
+                     create_derived_features, encode_categorical_variables, normalize_numerical_features]:
+            expected = step(expected)
+
+        output_path = os.path.join(self.tmp_dir, 'output.parquet')
+        run_streaming_pipeline(self.parquet_path, output_path, chunk_size=37)
+        result = pd.read_parquet(output_path)
+        for col in result.select_dtypes(include=['category']).columns:
+            result[col] = result[col].astype(object)
+
+        pd.testing.assert_frame_equal(result[expected.columns], expected.reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,34 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from benchmarks.synthetic_data import write_synthetic_dataset, generate_transactions
+
+class TestGenerateTransactions(unittest.TestCase):
+    def test_day_of_week_matches_base_query(self):
+        df = generate_transactions(500)
+        # WEEKDAY in BASE_QUERY_IMPROVED.sql, Monday = 0
+        self.assertEqual(df['transaction_day_of_week'].tolist(), df['transaction_date'].dt.dayofweek.tolist())
+        self.assertEqual(df['is_weekend_transaction'].tolist(),
+                         (df['transaction_day_of_week'] >= 5).astype(int).tolist())
+
+class TestWriteSyntheticDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'synthetic.parquet')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_small_chunks_with_all_null_columns(self):
+        # Pending transactions are rare, so the first chunks have none
+        write_synthetic_dataset(self.path, 200, chunk_rows=20)
+
+        df = pd.read_parquet(self.path)
+        self.assertEqual(len(df), 200)
+        self.assertTrue(df['pending_transaction_id'].notna().any())
+        self.assertEqual(df['transaction_id'].nunique(), 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from _old.table_registry import resolve_table_name, list_table_sources, process_tables_in_parallel
+
+def count_rows(source_path, output_folder_path):
+    return os.path.basename(source_path), len(pd.read_parquet(source_path))
+
+class TestResolveTableName(unittest.TestCase):
+    def test_exact_name(self):
+        self.assertEqual(resolve_table_name('data/plaid_liabilities_credit.xlsx'), 'plaid_liabilities_credit')
+        self.assertEqual(resolve_table_name('data/plaid_liabilities_credit_apr.xlsx'), 'plaid_liabilities_credit_apr')
+
+    def test_longest_contained_name(self):
+        self.assertEqual(resolve_table_name('plaid_liabilities_credit_apr_2024.parquet'), 'plaid_liabilities_credit_apr')
+        self.assertEqual(resolve_table_name('export_plaid_transactions.xlsx'), 'plaid_transactions')
+        # Fetched table folders resolve like files
+        self.assertEqual(resolve_table_name(os.path.join('fetched', 'mbna_accounts') + os.sep), 'mbna_accounts')
+
+    def test_unknown_name(self):
+        self.assertIsNone(resolve_table_name('budget_notes.xlsx'))
+
+class TestProcessTablesInParallel(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_folder = os.path.join(self.tmp_dir, 'input')
+        os.makedirs(self.input_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_results_in_source_order(self):
+        # Decreasing sizes, so later sources tend to finish first
+        for i in range(6):
+            pd.DataFrame({'value': range((6 - i) * 1000)}).to_parquet(
+                os.path.join(self.input_folder, f'table_{i}.parquet'), index=False)
+
+        results = process_tables_in_parallel(self.input_folder, count_rows, os.path.join(self.tmp_dir, 'output'),
+                                             max_workers=3)
+
+        self.assertEqual([os.path.basename(path) for path in list_table_sources(self.input_folder)],
+                         [name for name, _ in results])
+        self.assertEqual(results, [(f'table_{i}.parquet', (6 - i) * 1000) for i in range(6)])
+
+    def test_empty_folder(self):
+        self.assertEqual(process_tables_in_parallel(self.input_folder, count_rows, self.tmp_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import warnings
+import multiprocessing
+from unittest import mock
+import numpy as np
+import pandas as pd
+from scripts import time_series_analysis
+from scripts.time_series_analysis import (forecast_all_accounts, load_forecast_cache, _arima_daily_forecast,
+                                          FORECAST_COLUMNS)
+
+def make_history(n_accounts=3, n_days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_accounts * n_days * 2
+    return pd.DataFrame({
+        'account_id': [f'a{i}' for i in rng.integers(0, n_accounts, n)],
+        'transaction_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, n_days, n), unit='D'),
+        'transaction_amount': rng.exponential(40, n).round(2),
+    })
+
+def mean_forecast(series, days_to_forecast):
+    dates = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=days_to_forecast, freq='D')
+    value = float(series.mean())
+    return pd.DataFrame({'forecast_date': dates, 'forecast': value, 'forecast_lower': value,
+                         'forecast_upper': value}), None
+
+def stalling_forecast(series, days_to_forecast, cached=None, refit='warm'):
+    # The series carry no account id, so account a1 is recognized by its first day
+    if series.iloc[0] == stalling_forecast.first_value:
+        time.sleep(60)
+    return mean_forecast(series, days_to_forecast)
+
+def crashing_forecast(series, days_to_forecast, cached=None, refit='warm'):
+    # Kills the worker process fitting the account recognized by its first day
+    if series.iloc[0] == crashing_forecast.first_value:
+        os._exit(1)
+    return mean_forecast(series, days_to_forecast)
+
+class TestForecastAllAccounts(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        self.history = make_history()
+
+    def test_parallel_matches_serial(self):
+        serial = forecast_all_accounts(self.history, days_to_forecast=7, n_jobs=1)
+        parallel = forecast_all_accounts(self.history, days_to_forecast=7, n_jobs=2)
+
+        self.assertEqual(list(serial.columns), FORECAST_COLUMNS)
+        self.assertEqual(sorted(serial['account_id'].unique()), ['a0', 'a1', 'a2'])
+        self.assertEqual(len(serial), 21)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'workers must inherit the patched models')
+    def test_timed_out_fit_recycles_pool(self):
+        series = time_series_analysis.daily_account_series(self.history)
+        stalling_forecast.first_value = series['a1'].iloc[0]
+        self.assertEqual(sum(account_series.iloc[0] == series['a1'].iloc[0] for account_series in series.values()), 1)
+
+        start = time.perf_counter()
+        with mock.patch.dict(time_series_analysis.FORECAST_MODELS, {'stall': stalling_forecast}):
+            with self.assertLogs(level='WARNING') as logs:
+                result = forecast_all_accounts(self.history, model='stall', days_to_forecast=7, n_jobs=2, timeout=2)
+
+        self.assertLess(time.perf_counter() - start, 30)
+        self.assertEqual(sorted(result['account_id'].unique()), ['a0', 'a2'])
+        self.assertTrue(any('timed out for account a1' in line for line in logs.output))
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork', 'workers must inherit the patched models')
+    def test_crashed_worker_only_fails_its_account(self):
+        history = make_history(n_accounts=4)
+        series = time_series_analysis.daily_account_series(history)
+        crashing_forecast.first_value = series['a2'].iloc[0]
+        self.assertEqual(sum(account_series.iloc[0] == series['a2'].iloc[0] for account_series in series.values()), 1)
+
+        with mock.patch.dict(time_series_analysis.FORECAST_MODELS, {'crash': crashing_forecast}):
+            with self.assertLogs(level='WARNING') as logs:
+                result = forecast_all_accounts(history, model='crash', days_to_forecast=7, n_jobs=2)
+
+        self.assertEqual(sorted(result['account_id'].unique()), ['a0', 'a1', 'a3'])
+        self.assertEqual(len(result), 21)
+        self.assertTrue(any('failed for account a2: worker process crashed' in line for line in logs.output))
+        self.assertTrue(any('1 of 4 account forecasts failed' in line for line in logs.output))
+
+class TestArimaParameterCache(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        rng = np.random.default_rng(3)
+        self.series = pd.Series(rng.exponential(40, 61).round(2), index=pd.date_range('2024-01-01', periods=61, freq='D'))
+        self.history = self.series.iloc[:60]
+        _, self.entry = _arima_daily_forecast(self.history, 7)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_first_fit_is_cold(self):
+        self.assertEqual(self.entry['fit_mode'], 'cold')
+        self.assertEqual(self.entry['watermark'], self.history.index[-1])
+
+    def test_unchanged_series_reuses_parameters(self):
+        forecast, entry = _arima_daily_forecast(self.history, 7, self.entry)
+        cold, _ = _arima_daily_forecast(self.history, 7)
+
+        self.assertEqual(entry['fit_mode'], 'cached')
+        np.testing.assert_array_equal(entry['params'], self.entry['params'])
+        pd.testing.assert_frame_equal(forecast, cold)
+
+    def test_new_day_warm_starts_or_appends(self):
+        _, warm = _arima_daily_forecast(self.series, 7, self.entry, refit='warm')
+        _, append = _arima_daily_forecast(self.series, 7, self.entry, refit='append')
+        _, cold = _arima_daily_forecast(self.series, 7)
+
+        self.assertEqual(warm['fit_mode'], 'warm')
+        self.assertEqual(append['fit_mode'], 'append')
+        np.testing.assert_array_equal(append['params'], self.entry['params'])
+        np.testing.assert_allclose(warm['params'], cold['params'], rtol=1e-2)
+        self.assertEqual(warm['watermark'], self.series.index[-1])
+
+    def test_revised_history_fits_cold(self):
+        revised = self.series.copy()
+        revised.iloc[10] += 100
+        _, entry = _arima_daily_forecast(revised, 7, self.entry, refit='append')
+        self.assertEqual(entry['fit_mode'], 'cold')
+
+        # Same watermark, different values
+        _, entry = _arima_daily_forecast(revised.iloc[:60], 7, self.entry)
+        self.assertEqual(entry['fit_mode'], 'cold')
+
+    def test_other_order_fits_cold(self):
+        _, entry = _arima_daily_forecast(self.series, 7, dict(self.entry, order=(2, 1, 1)), refit='append')
+        self.assertEqual(entry['fit_mode'], 'cold')
+
+    def test_fit_modes_count_only_this_run(self):
+        history = make_history(n_days=40)
+        forecast_all_accounts(history, days_to_forecast=7, n_jobs=1, cache_dir=self.tmp_dir)
+        self.assertEqual({entry['fit_mode'] for entry in load_forecast_cache(self.tmp_dir, 'arima').values()}, {'cold'})
+
+        # a2 has a cache entry from the first run but its fit fails in this one
+        first_value = time_series_analysis.daily_account_series(history)['a2'].iloc[0]
+        def failing_for_a2(series, *args):
+            if series.iloc[0] == first_value:
+                raise ValueError('fit failed')
+            return _arima_daily_forecast(series, *args)
+        with mock.patch.dict(time_series_analysis.FORECAST_MODELS, {'arima': failing_for_a2}):
+            with self.assertLogs(level='INFO') as logs:
+                forecast_all_accounts(history, days_to_forecast=7, n_jobs=1, cache_dir=self.tmp_dir)
+
+        self.assertIn("Forecast fits by mode: {'cached': 2}", '\n'.join(logs.output))
+        cache = load_forecast_cache(self.tmp_dir, 'arima')
+        self.assertEqual({account_id: entry['fit_mode'] for account_id, entry in cache.items()},
+                         {'a0': 'cached', 'a1': 'cached', 'a2': 'cold'})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'arima_params.joblib')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from scripts.streaming_pipeline import iter_chunks, fit_streaming_statistics, transform_chunk, transform_batch
+from utils.transformer_store import save_transformers, load_transformers, list_transformer_versions
+
+class TestTransformerStore(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        n = 120
+        self.sample_data = pd.DataFrame({
+            'account_id': rng.choice(['a1', 'a2'], n),
+            'transaction_id': [f't{i}' for i in range(n)],
+            'transaction_date': pd.date_range('2024-01-01', periods=n, freq='D').strftime('%Y-%m-%d'),
+            'transaction_amount': rng.normal(50, 20, n).round(2),
+            'account_current_balance': rng.normal(1000, 300, n).round(2),
+            'account_limit': rng.choice([0.0, 5000.0], n),
+            'account_type': rng.choice(['depository', 'credit'], n),
+            'merchant_name': rng.choice(['Uber', 'Costco'], n),
+            'personal_finance_category_primary': rng.choice(['TRAVEL', 'RENT'], n),
+        })
+        self.tmp_dir = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.tmp_dir, 'history.parquet')
+        self.sample_data.iloc[:100].to_parquet(self.history_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_versions_round_trip(self):
+        store_dir = os.path.join(self.tmp_dir, 'store')
+        statistics = fit_streaming_statistics(iter_chunks(self.history_path, 30))
+        self.assertEqual(save_transformers(statistics, store_dir), 1)
+        self.assertEqual(save_transformers(statistics, store_dir, metadata={'rows': 100}), 2)
+        self.assertEqual([entry['version'] for entry in list_transformer_versions(store_dir)], [1, 2])
+
+        loaded, version = load_transformers(store_dir)
+        self.assertEqual(version, 2)
+        self.assertEqual(loaded['scaler'], statistics['scaler'])
+        with self.assertRaises(KeyError):
+            load_transformers(store_dir, version=3)
+
+    def test_transform_batch_continues_history(self):
+        statistics = fit_streaming_statistics(iter_chunks(self.history_path, 30))
+        batch = self.sample_data.iloc[100:]
+        result = transform_batch(batch, statistics)
+
+        # Same as transforming the batch as the chunk that follows the history
+        carry = None
+        for chunk in iter_chunks(self.history_path, 30):
+            _, carry = transform_chunk(chunk, statistics, carry)
+        expected, _ = transform_chunk(batch.reset_index(drop=True), statistics, carry)
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertFalse(result['month_end_balance'].isnull().any())
@@ -17,12 +17,19 @@ def load_data(file_path):
     df = pd.read_excel(file_path, sheet_name=sheets[0])
     return df
 
-def generate_report(df):
+REPORT_KEYS = ['bank_name', 'account_name', 'account_type']
+
+def generate_report(df, dimensions=None):
     """
     Generate the required report from the DataFrame.
     
+    All statistics come from one grouped aggregation plus one monthly
+    pre-aggregation, so the cost does not depend on the number of accounts.
+    
     Args:
     df (pd.DataFrame): The data to analyze.
+    dimensions (list): Extra columns to break the report down by (e.g. 
+        ['personal_finance_category_primary'] or ['iso_currency_code']).
     
     Returns:
     pd.DataFrame: The summary report.
@@ -33,38 +40,38 @@ def generate_report(df):
     # Create year_month for monthly analysis
     df['year_month'] = df['transaction_date'].dt.to_period('M')
     
-    # Group by bank_name, account_name, and account_type
-    group = df.groupby(['bank_name', 'account_name', 'account_type'])
-    
-    # Initialize a list to collect results
-    results = []
-    
-    for name, data in group:
-        bank_name, account_name, account_type = name
-        number_of_transactions = data['transaction_id'].nunique()
-        min_transaction_date = data['transaction_date'].min()
-        max_transaction_date = data['transaction_date'].max()
-        avg_number_of_transactions = number_of_transactions / len(data['year_month'].unique())
-        min_transaction_amount = data['transaction_amount'].min()
-        max_transaction_amount = data['transaction_amount'].max()
-        avg_transaction_amount = data['transaction_amount'].mean()
-        monthly_group = data.groupby('year_month')
-        avg_monthly_number_of_transactions = monthly_group['transaction_id'].count().mean()
-        avg_monthly_transaction_amount = monthly_group['transaction_amount'].mean().mean()
-        
-        results.append([
-            bank_name, account_name, account_type, number_of_transactions, min_transaction_date,
-            max_transaction_date, avg_number_of_transactions, avg_monthly_number_of_transactions,
-            min_transaction_amount, max_transaction_amount, avg_transaction_amount, avg_monthly_transaction_amount
-        ])
-    
-    columns = [
-        'bank_name', 'account_name', 'account_type', 'number of transactions', 'min transaction date', 
+    keys = REPORT_KEYS + list(dimensions or [])
+    group = df.groupby(keys, observed=True)
+    
+    summary = group.agg(**{
+        'number of transactions': ('transaction_id', 'nunique'),
+        'min transaction date': ('transaction_date', 'min'),
+        'max transaction date': ('transaction_date', 'max'),
+        'min transaction amount': ('transaction_amount', 'min'),
+        'max transaction amount': ('transaction_amount', 'max'),
+        'avg transaction amount': ('transaction_amount', 'mean'),
+    })
+    
+    # Distinct months per group, counting a missing month like any other value
+    month_count = group['year_month'].nunique() + df['year_month'].isna().groupby([df[k] for k in keys], observed=True).any().astype(int)
+    summary['avg number of transactions'] = summary['number of transactions'] / month_count
+    
+    # Monthly pre-aggregation, then the average over each group's months
+    monthly = df.groupby(keys + ['year_month'], observed=True).agg(
+        monthly_transactions=('transaction_id', 'count'),
+        monthly_amount=('transaction_amount', 'mean'),
+    )
+    monthly_means = monthly.groupby(level=keys, observed=True).mean()
+    summary['avg monthly number of transactions'] = monthly_means['monthly_transactions']
+    summary['avg monthly transaction amount'] = monthly_means['monthly_amount']
+    
+    columns = keys + [
+        'number of transactions', 'min transaction date', 
         'max transaction date', 'avg number of transactions', 'avg monthly number of transactions', 
         'min transaction amount', 'max transaction amount', 'avg transaction amount', 'avg monthly transaction amount'
     ]
     
-    report_df = pd.DataFrame(results, columns=columns)
+    report_df = summary.reset_index()[columns]
     
     return report_df
 
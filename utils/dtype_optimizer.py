@@ -0,0 +1,63 @@
+# utils/dtype_optimizer.py
+import logging
+import numpy as np
+import pandas as pd
+
+# Low-cardinality string columns of the transactions export that are always
+# stored as `category`
+CATEGORICAL_COLUMNS = [
+    'bank_id', 'bank_name', 'account_id', 'account_name', 'account_official_name', 'account_type',
+    'account_subtype', 'account_iso_currency_code', 'iso_currency_code', 'unofficial_currency_code',
+    'merchant_name', 'merchant_entity_id', 'payment_channel', 'transaction_type', 'transaction_code',
+    'transaction_direction', 'personal_finance_category_primary', 'personal_finance_category_detailed',
+    'personal_finance_category_confidence_level', 'location_city', 'location_region', 'location_country',
+    'transaction_category_group', 'transaction_hierarchy_level1', 'transaction_hierarchy_level2',
+    'transaction_hierarchy_level3',
+]
+
+def _downcast_numeric(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+        downcast = series.astype(np.float32)
+        # Only keep float32 when it represents every value exactly
+        if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+            return downcast
+    return series
+
+def optimize_dtypes(df, categorical_columns=None, max_unique_ratio=0.1):
+    """
+    Shrink the memory footprint of a DataFrame.
+
+    Columns listed in `categorical_columns` (defaults to CATEGORICAL_COLUMNS) and any
+    other all-string column whose distinct values make up at most `max_unique_ratio`
+    of its rows become `category`. Integer columns are downcast to the smallest
+    integer type; float columns become float32 only when that is lossless.
+
+    Args:
+    df (pd.DataFrame): The data to optimize.
+    categorical_columns (list): Columns to always convert to `category`.
+    max_unique_ratio (float): Cardinality threshold for the other string columns.
+        Use 0 to only convert the listed columns.
+
+    Returns:
+    pd.DataFrame: The optimized DataFrame.
+    """
+    categorical_columns = set(CATEGORICAL_COLUMNS if categorical_columns is None else categorical_columns)
+    memory_before = df.memory_usage(deep=True).sum()
+
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+                continue
+            if col in categorical_columns or series.nunique() <= max_unique_ratio * len(series):
+                df[col] = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(series):
+            df[col] = _downcast_numeric(series)
+
+    memory_after = df.memory_usage(deep=True).sum()
+    logging.info(f"Optimized dtypes: {memory_before / 1e6:.1f} MB -> {memory_after / 1e6:.1f} MB")
+    return df
@@ -0,0 +1,137 @@
+# utils/enriched_loader.py
+import time
+import logging
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.dialects import mysql, sqlite
+
+DEFAULT_BATCH_SIZE = 5_000
+
+# Conflict keys of the tables in database/enriched_tables_creation.sql. MySQL matches
+# duplicates on any unique key, other dialects on these columns.
+ENRICHED_TABLE_KEYS = {
+    'plaid_transactions_enriched': ['transaction_id'],
+    'plaid_transaction_counterparties_enriched': ['id'],
+    'asset_account_enriched': ['account_id'],
+    'asset_historical_balance_enriched': ['balance_id'],
+    'asset_item_enriched': ['item_id'],
+    'asset_report_enriched': ['asset_report_id'],
+    'asset_transaction_enriched': ['transaction_id'],
+    'plaid_accounts_enriched': ['account_id'],
+    'plaid_liabilities_credit_apr_enriched': ['id'],
+    'plaid_liabilities_credit_enriched': ['id'],
+    'mbna_accounts_enriched': ['id'],
+    'mbna_transactions_enriched': ['transaction_id'],
+}
+
+# Maintained by the database and never overwritten on an update
+_SERVER_COLUMNS = {'created_at', 'updated_at'}
+
+def _upsert_statement(table, columns, keys, dialect_name):
+    # Only the loaded columns are updated, so columns the frame does not carry keep their values
+    update_columns = [col for col in columns
+                      if col not in keys and col not in _SERVER_COLUMNS and not table.columns[col].primary_key]
+    if dialect_name == 'mysql':
+        stmt = mysql.insert(table)
+        if not update_columns:
+            return stmt.prefix_with('IGNORE')
+        return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update_columns})
+    if dialect_name == 'sqlite':
+        stmt = sqlite.insert(table)
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=keys)
+        return stmt.on_conflict_do_update(index_elements=keys,
+                                          set_={col: stmt.excluded[col] for col in update_columns})
+    raise ValueError(f"Upserts are not supported for the '{dialect_name}' dialect")
+
+def _to_records(df, table):
+    """Convert a frame to insert parameters, with NULLs and the Python types the drivers expect."""
+    records = {}
+    for col in df.columns:
+        column_type = table.columns[col].type
+        values = df[col]
+        if isinstance(column_type, sqlalchemy.DateTime):
+            values = pd.to_datetime(values, errors='coerce').dt.to_pydatetime()
+        elif isinstance(column_type, sqlalchemy.Date):
+            values = pd.to_datetime(values, errors='coerce').dt.date
+        values = pd.Series(np.asarray(values, dtype=object), index=df.index)
+        records[col] = values.where(pd.notna(values), None).map(lambda v: v.item() if isinstance(v, np.generic) else v)
+    return pd.DataFrame(records, index=df.index).to_dict('records')
+
+def load_enriched_table(engine, df, table_name, batch_size=DEFAULT_BATCH_SIZE, keys=None):
+    """
+    Upsert a processed frame into an enriched table in batched inserts.
+
+    The table definition is reflected from the database, and only the frame columns
+    that exist in the table are written. Each batch of `batch_size` rows is sent as one
+    executemany of an `INSERT ... ON DUPLICATE KEY UPDATE` on MySQL (which PyMySQL
+    rewrites into a single multi-row INSERT) or `INSERT ... ON CONFLICT DO UPDATE` on
+    SQLite, and committed in its own transaction, so a failed batch leaves the
+    earlier ones loaded.
+
+    Args:
+    engine (sqlalchemy.engine.Engine): Engine from `get_engine`, or any SQLite engine for tests.
+    df (pd.DataFrame): The rows to load.
+    table_name (str): One of the ENRICHED_TABLE_KEYS tables, or any table when `keys` is given.
+    batch_size (int): Rows per INSERT batch.
+    keys (list): Conflict columns; defaults to ENRICHED_TABLE_KEYS[table_name].
+
+    Returns:
+    dict: Throughput report with the table, rows, batches, seconds and rows_per_second.
+    """
+    keys = list(keys or ENRICHED_TABLE_KEYS.get(table_name, []))
+    if not keys:
+        raise ValueError(f"No conflict keys known for table '{table_name}'")
+    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(), autoload_with=engine)
+
+    columns = [col for col in df.columns if col in table.columns]
+    ignored = [col for col in df.columns if col not in table.columns]
+    if ignored:
+        logging.info(f"{table_name}: ignoring {len(ignored)} columns not in the table: {ignored}")
+    missing_keys = [key for key in keys if key not in columns]
+    if missing_keys:
+        raise ValueError(f"Frame is missing the key columns {missing_keys} of table '{table_name}'")
+
+    stmt = _upsert_statement(table, columns, keys, engine.dialect.name)
+    rows, batches = 0, 0
+    start = time.perf_counter()
+    for offset in range(0, len(df), batch_size):
+        records = _to_records(df.iloc[offset:offset + batch_size][columns], table)
+        with engine.begin() as connection:
+            connection.execute(stmt, records)
+        rows += len(records)
+        batches += 1
+    seconds = time.perf_counter() - start
+
+    report = {
+        'table': table_name,
+        'rows': rows,
+        'batches': batches,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None,
+    }
+    logging.info(f"Loaded {rows} rows into {table_name} in {batches} batches, {report['seconds']}s "
+                 f"({report['rows_per_second']} rows/s)")
+    return report
+
+def load_enriched_tables(engine, frames, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Load several enriched tables one after another, each in its own batches.
+
+    Args:
+    engine (sqlalchemy.engine.Engine): Target database.
+    frames (dict): Table name -> DataFrame.
+    batch_size (int): Rows per INSERT batch.
+
+    Returns:
+    pd.DataFrame: One throughput report row per table.
+    """
+    reports = []
+    for table_name, df in frames.items():
+        try:
+            reports.append(load_enriched_table(engine, df, table_name, batch_size=batch_size))
+        except Exception as e:
+            logging.error(f"Error loading {table_name}: {str(e)}")
+            raise
+    return pd.DataFrame(reports)
@@ -1,12 +1,129 @@
-# utils/load_data.py
+import os
+import json
+import hashlib
 import pandas as pd
 import logging
 import numpy as np
+from utils.dtype_optimizer import optimize_dtypes
 
-def load_dataset(file_path):
-    df = pd.read_excel(file_path)
+CACHE_DIR_NAME = '.cache'
+CACHE_FORMAT_VERSION = 2
+
+def _cache_paths(file_path, cache_dir=None):
+    """
+    Return the Parquet and manifest sidecar paths for a source file.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir, f"{stem}.parquet"), os.path.join(cache_dir, f"{stem}.json")
+
+def _file_sha256(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def _standardize(df):
     # Standardize transaction representation
     df['transaction_amount'] = df['transaction_amount'].abs()
     df['transaction_direction'] = np.where(df['is_transaction_outflow'] == 1, 'outflow', 'inflow')
+    # Categorical and downcast dtypes are stored in the cache as well
+    return optimize_dtypes(df)
+
+def _ensure_cache(file_path, cache_dir=None):
+    """
+    Validate or rebuild the sidecar cache. On a miss the freshly parsed frame is
+    returned alongside the cache path so callers do not read it back from disk.
+    """
+    parquet_path, manifest_path = _cache_paths(file_path, cache_dir)
+    stat = os.stat(file_path)
+    manifest = _read_manifest(manifest_path)
+    sha256 = None
+
+    if manifest is not None and manifest.get('version') == CACHE_FORMAT_VERSION and os.path.exists(parquet_path):
+        if manifest['size'] == stat.st_size and manifest['mtime_ns'] == stat.st_mtime_ns:
+            logging.info(f"Cache hit for {file_path} (size/mtime unchanged)")
+            return parquet_path, True, None
+        if manifest['size'] == stat.st_size:
+            sha256 = _file_sha256(file_path)
+            if sha256 == manifest['sha256']:
+                manifest['mtime_ns'] = stat.st_mtime_ns
+                _write_manifest(manifest_path, manifest)
+                logging.info(f"Cache hit for {file_path} (content hash unchanged)")
+                return parquet_path, True, None
+        logging.info(f"Cache miss for {file_path}: source file changed")
+    else:
+        logging.info(f"Cache miss for {file_path}: no usable cache entry")
+
+    df = _standardize(pd.read_excel(file_path))
+    try:
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        tmp_path = f"{parquet_path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except Exception as e:
+        logging.warning(f"Could not write Parquet cache for {file_path}: {str(e)}")
+        return None, False, df
+
+    _write_manifest(manifest_path, {
+        'version': CACHE_FORMAT_VERSION,
+        'source': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256 or _file_sha256(file_path),
+        'rows': len(df),
+    })
+    logging.info(f"Cached {len(df)} rows from {file_path} to {parquet_path}")
+    return parquet_path, False, df
+
+def cache_dataset(file_path, cache_dir=None):
+    """
+    Make sure an up-to-date Parquet copy of the source file exists and return its path.
+
+    The cache is keyed on the source file's size, mtime and SHA-256 digest. Size and
+    mtime are checked first so an unchanged file is never re-hashed; if they differ,
+    the digest decides whether the content actually changed (e.g. a plain `touch`).
+
+    Args:
+    file_path (str): The path to the Excel file.
+    cache_dir (str): Directory for the sidecar files. Defaults to a `.cache` folder
+        next to the source file.
+
+    Returns:
+    tuple: (parquet_path, cache_hit) or (None, False) if the cache could not be written.
+    """
+    parquet_path, cache_hit, _ = _ensure_cache(file_path, cache_dir)
+    return parquet_path, cache_hit
+
+def load_dataset(file_path, use_cache=True, cache_dir=None):
+    """
+    Load the transactions export and standardize the transaction representation.
+
+    With `use_cache` enabled the Excel file is only parsed when its Parquet sidecar
+    is missing or stale; otherwise the memory-mapped columnar copy is read.
+    """
+    if use_cache:
+        parquet_path, cache_hit, df = _ensure_cache(file_path, cache_dir)
+        if cache_hit:
+            df = pd.read_parquet(parquet_path, memory_map=True)
+            logging.info(f"Successfully loaded {len(df)} standardized rows from {parquet_path}")
+            return df
+    else:
+        df = _standardize(pd.read_excel(file_path))
     logging.info(f"Successfully loaded and standardized {len(df)} rows from {file_path}")
-    return df
\ No newline at end of file
+    return df
@@ -0,0 +1,169 @@
+# utils/output_writer.py
+import os
+import shutil
+import logging
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+PARTITION_COLUMNS = ['account_id', 'month']
+ROW_GROUP_SIZE = 100_000
+EXCEL_MAX_ROWS = 100_000
+# Excel's sheet limit, less the header row
+EXCEL_ROW_LIMIT = 1_048_575
+
+def _output_schema(df):
+    # Inferred once over the whole frame so that every slice is written with the
+    # same types, even when a column is all-null within a slice
+    return pa.Schema.from_pandas(df, preserve_index=False)
+
+def _iter_tables(df, schema, row_group_size):
+    for start in range(0, len(df), row_group_size):
+        yield pa.Table.from_pandas(df.iloc[start:start + row_group_size], schema=schema,
+                                   preserve_index=False).replace_schema_metadata(schema.metadata)
+
+def _with_partition_columns(table, partition_cols):
+    if 'month' in partition_cols and 'month' not in table.column_names:
+        table = table.append_column('month', pc.strftime(table['transaction_date'], format='%Y-%m'))
+    for col in partition_cols:
+        index = table.schema.get_field_index(col)
+        if not pa.types.is_string(table.schema.field(index).type):
+            table = table.set_column(index, col, table[col].cast(pa.string()))
+    return table
+
+def write_parquet(df, output_path, partition_cols=PARTITION_COLUMNS, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write the frame as a Parquet dataset partitioned by account and month.
+
+    The frame is converted and written one row group at a time, and the dataset is
+    laid out as `account_id=<id>/month=<YYYY-MM>/` directories so that readers can
+    load single accounts or months without scanning the rest. Any existing dataset
+    at `output_path` is replaced.
+
+    Args:
+    df (pd.DataFrame): The processed data.
+    output_path (str): Directory of the dataset.
+    partition_cols (list): Partition columns; 'month' is derived from `transaction_date`.
+        An empty list writes a single file into the directory.
+    row_group_size (int): Rows converted and written per batch.
+
+    Returns:
+    str: The dataset directory.
+    """
+    schema = _output_schema(df)
+    partition_cols = list(partition_cols or [])
+    batches = (batch for table in _iter_tables(df, schema, row_group_size)
+               for batch in _with_partition_columns(table, partition_cols).to_batches())
+    output_schema = _with_partition_columns(schema.empty_table(), partition_cols).schema
+
+    partitioning = None
+    max_partitions = 1
+    if partition_cols:
+        partitioning = ds.partitioning(pa.schema([output_schema.field(col) for col in partition_cols]), flavor='hive')
+        # Upper bound on the number of partitions, which pyarrow caps at 1024 by default
+        for col in partition_cols:
+            values = df['transaction_date'].dt.to_period('M') if col == 'month' else df[col]
+            max_partitions *= max(1, values.nunique(dropna=False))
+
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    ds.write_dataset(batches, output_path, schema=output_schema, format='parquet', partitioning=partitioning,
+                     max_partitions=max_partitions, max_rows_per_group=row_group_size,
+                     basename_template='part-{i}.parquet')
+    logging.info(f"Wrote {len(df)} rows to Parquet dataset {output_path}, partitioned by {partition_cols or 'nothing'}")
+    return output_path
+
+def write_feather(df, output_path, row_group_size=ROW_GROUP_SIZE, compression='lz4'):
+    """
+    Write the frame as a Feather (Arrow IPC) file, one record batch at a time.
+
+    Returns:
+    str: The written file.
+    """
+    schema = _output_schema(df)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(output_path, schema, options=options) as writer:
+        for table in _iter_tables(df, schema, row_group_size):
+            writer.write_table(table)
+    logging.info(f"Wrote {len(df)} rows to Feather file {output_path}")
+    return output_path
+
+def write_csv(df, output_path, row_group_size=ROW_GROUP_SIZE):
+    """
+    Stream the frame to a CSV file in chunks of `row_group_size` rows.
+
+    Returns:
+    str: The written file.
+    """
+    schema = _output_schema(df)
+    # The CSV writer has no dictionary support, so categoricals are written as their values
+    csv_schema = pa.schema([field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                            for field in schema])
+    with pa_csv.CSVWriter(output_path, csv_schema) as writer:
+        for table in _iter_tables(df, schema, row_group_size):
+            writer.write_table(table.cast(csv_schema))
+    logging.info(f"Wrote {len(df)} rows to CSV file {output_path}")
+    return output_path
+
+def write_excel(df, output_path, max_rows=EXCEL_MAX_ROWS, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write a size-capped Excel export for reporting.
+
+    Only the first `max_rows` rows are written (at most Excel's sheet limit), in a
+    write-only workbook that streams rows to disk instead of holding every cell in
+    memory. The columnar formats are the pipeline's main outputs; this export is
+    meant for opening in a spreadsheet.
+
+    Returns:
+    str: The written file.
+    """
+    from openpyxl import Workbook
+
+    max_rows = min(max_rows, EXCEL_ROW_LIMIT)
+    if len(df) > max_rows:
+        logging.warning(f"Excel export capped at {max_rows} of {len(df)} rows")
+        df = df.iloc[:max_rows]
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in df.columns])
+    for start in range(0, len(df), row_group_size):
+        chunk = df.iloc[start:start + row_group_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([value.item() if isinstance(value, np.generic) else value for value in row])
+    workbook.save(output_path)
+    logging.info(f"Wrote {len(df)} rows to Excel file {output_path}")
+    return output_path
+
+OUTPUT_FORMATS = {
+    'parquet': (write_parquet, ''),
+    'feather': (write_feather, '.feather'),
+    'csv': (write_csv, '.csv'),
+    'excel': (write_excel, '.xlsx'),
+}
+
+def write_output(df, output_dir, output_format='parquet', name='processed_data', **options):
+    """
+    Write the processed data with one of the OUTPUT_FORMATS backends.
+
+    Args:
+    df (pd.DataFrame): The processed data.
+    output_dir (str): Directory to write into.
+    output_format (str): 'parquet' (a partitioned dataset directory), 'feather', 'csv' or 'excel'.
+    name (str): File or dataset name, without extension.
+    **options: Passed on to the backend, e.g. `row_group_size` or `max_rows`.
+
+    Returns:
+    str: Path of the written file or dataset directory.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'")
+    writer, extension = OUTPUT_FORMATS[output_format]
+    try:
+        return writer(df, os.path.join(output_dir, f"{name}{extension}"), **options)
+    except Exception as e:
+        logging.error(f"Error writing {output_format} output: {str(e)}")
+        raise
@@ -0,0 +1,149 @@
+# utils/pipeline_runner.py
+import os
+import sys
+import json
+import hashlib
+import inspect
+import logging
+import pandas as pd
+
+def fingerprint_frame(df):
+    """
+    Content fingerprint of a DataFrame: values, index, column names and dtypes.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _project_module(obj):
+    """The project module `obj` is, or was defined in; None for third-party and builtin code."""
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    if not path.startswith(PROJECT_ROOT + os.sep) or 'site-packages' in path:
+        return None
+    return module
+
+def _step_modules(step_function):
+    """The step's own module plus every project module it imports, directly or through other project modules."""
+    root = _project_module(step_function)
+    if root is None:
+        return []
+    modules = {root.__name__: root}
+    pending = [root]
+    while pending:
+        for value in list(vars(pending.pop()).values()):
+            module = _project_module(value)
+            if module is not None and module.__name__ not in modules:
+                modules[module.__name__] = module
+                pending.append(module)
+    return [modules[name] for name in sorted(modules)]
+
+def fingerprint_step(step_function, config=None):
+    """
+    Fingerprint of a step: the source of the module defining it and of the project
+    modules it imports, plus its config.
+
+    Whole modules are hashed rather than the function alone so that edits to helpers
+    called by the step, in its own module or in imported utils/scripts modules, also
+    invalidate its cached results. Third-party packages are not hashed.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{step_function.__module__}.{step_function.__qualname__}".encode())
+    modules = _step_modules(step_function)
+    for module in modules:
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = ''
+        digest.update(f"{module.__name__}\n{source}".encode())
+    if not modules:
+        try:
+            source = inspect.getsource(step_function)
+        except (OSError, TypeError):
+            source = step_function.__code__.co_code.hex()
+        digest.update(source.encode())
+    digest.update(json.dumps(config or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def _chain_key(previous_key, step_key):
+    return hashlib.sha256(f"{previous_key}:{step_key}".encode()).hexdigest()
+
+def _unpack_step(step):
+    step_name, step_function = step[0], step[1]
+    config = step[2] if len(step) > 2 else {}
+    return step_name, step_function, config
+
+def _run_step(step_name, step_function, df, config, profiler=None):
+    logging.info(f"Starting {step_name}")
+    if profiler is not None:
+        df = profiler.run_step(step_name, step_function, df, **config)
+    else:
+        df = step_function(df, **config)
+    logging.info(f"{step_name} completed successfully")
+    return df
+
+def run_pipeline_steps(df, steps, cache_dir=None, profiler=None):
+    """
+    Run the pipeline steps in order, optionally reusing cached step outputs.
+
+    Each step's cache key chains the key of its input (the loaded data's content
+    fingerprint for the first step) with the step's own fingerprint, so a step is
+    skipped whenever neither its input nor its code/config changed. Only the output
+    of the last consecutive cache hit is read back from disk.
+
+    Args:
+    df (pd.DataFrame): The input data.
+    steps (list): (name, function) or (name, function, kwargs) tuples.
+    cache_dir (str): Directory holding cached Parquet outputs. Caching is disabled when None.
+    profiler (PipelineProfiler): Records metrics for every step, with zero-cost rows for cache hits.
+
+    Returns:
+    pd.DataFrame: The output of the last step.
+    """
+    if cache_dir is None:
+        for step in steps:
+            step_name, step_function, config = _unpack_step(step)
+            df = _run_step(step_name, step_function, df, config, profiler)
+        return df
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = fingerprint_frame(df)
+    pending_path = None
+
+    for step in steps:
+        step_name, step_function, config = _unpack_step(step)
+        key = _chain_key(key, fingerprint_step(step_function, config))
+        cache_path = os.path.join(cache_dir, f"{key}.parquet")
+
+        if os.path.exists(cache_path):
+            logging.info(f"{step_name}: cache hit, skipping")
+            if profiler is not None:
+                profiler.record_cache_hit(step_name, step_function, config, cache_path)
+            pending_path = cache_path
+            continue
+
+        if pending_path is not None:
+            df = pd.read_parquet(pending_path)
+            pending_path = None
+
+        df = _run_step(step_name, step_function, df, config, profiler)
+
+        try:
+            tmp_path = f"{cache_path}.tmp"
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logging.warning(f"Could not cache output of {step_name}: {str(e)}")
+
+    if pending_path is not None:
+        df = pd.read_parquet(pending_path)
+    return df
@@ -0,0 +1,188 @@
+# utils/profiling.py
+import os
+import re
+import json
+import time
+import cProfile
+import logging
+import resource
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SUMMARY_COLUMNS = ['step', 'cache_hit', 'wall_seconds', 'cpu_seconds', 'rss_delta_mb', 'peak_rss_mb',
+                   'traced_peak_mb', 'input_rows', 'output_rows', 'output_columns', 'output_memory_mb']
+
+def _rss_mb():
+    """Current resident set size, or the peak when psutil is not installed."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1e6
+    return _peak_rss_mb()
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+def _frame_shape(df):
+    if isinstance(df, pd.DataFrame):
+        return df.shape
+    return (None, None)
+
+def _parquet_shape(path):
+    """Rows and columns of a Parquet file written from a DataFrame, from its footer only."""
+    schema = pq.read_schema(path)
+    index_columns = [col for col in (schema.pandas_metadata or {}).get('index_columns', []) if isinstance(col, str)]
+    return pq.read_metadata(path).num_rows, len(schema.names) - len(index_columns)
+
+def column_memory_mb(df):
+    """Deep memory usage per column in MB."""
+    if not isinstance(df, pd.DataFrame):
+        return {}
+    usage = df.memory_usage(deep=True, index=False) / 1e6
+    return {str(col): round(float(mb), 3) for col, mb in usage.items()}
+
+class PipelineProfiler:
+    """
+    Collects per-step performance metrics for a pipeline run.
+
+    Each step run through `run_step` records wall and CPU time, resident memory
+    before/after and the process peak, input/output shapes and per-column memory.
+    With `trace_memory` the Python allocation peak of the step is traced as well
+    (this slows the steps down noticeably). Records are appended to `metrics_path`
+    as JSON lines, and with `profile_dir` a cProfile dump is written per step.
+
+    Steps served from the step cache are recorded by `record_cache_hit` as zero-cost
+    rows, so the summary still lists every step of the run.
+
+    CPU time only covers this process, not worker processes started by a step.
+    """
+    def __init__(self, metrics_path=None, profile_dir=None, trace_memory=False):
+        self.metrics_path = metrics_path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.records = []
+
+    def run_step(self, step_name, step_function, df, **config):
+        input_rows, input_columns = _frame_shape(df)
+        rss_before = _rss_mb()
+        if self.trace_memory:
+            tracemalloc.start()
+        profiler = cProfile.Profile() if self.profile_dir else None
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            result = step_function(df, **config)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            traced_peak = None
+            if self.trace_memory:
+                traced_peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+
+        output_rows, output_columns = _frame_shape(result)
+        columns = column_memory_mb(result)
+        record = {
+            'run_id': self.run_id,
+            'step': step_name,
+            'cache_hit': False,
+            'function': f"{step_function.__module__}.{step_function.__qualname__}",
+            'config': {key: str(value) for key, value in config.items()},
+            'wall_seconds': round(wall_seconds, 4),
+            'cpu_seconds': round(cpu_seconds, 4),
+            'rss_before_mb': round(rss_before, 1),
+            'rss_delta_mb': round(_rss_mb() - rss_before, 1),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'traced_peak_mb': None if traced_peak is None else round(traced_peak, 1),
+            'input_rows': input_rows,
+            'input_columns': input_columns,
+            'output_rows': output_rows,
+            'output_columns': output_columns,
+            'output_memory_mb': round(sum(columns.values()), 3),
+            'column_memory_mb': columns,
+        }
+        if profiler is not None:
+            record['profile_path'] = self._dump_profile(profiler, step_name)
+        self.records.append(record)
+        self._write_record(record)
+        logging.info(f"{step_name}: {record['wall_seconds']:.3f}s wall, {record['cpu_seconds']:.3f}s CPU, "
+                     f"{record['rss_delta_mb']:+.1f} MB RSS, {input_rows} -> {output_rows} rows")
+        return result
+
+    def record_cache_hit(self, step_name, step_function, config, cache_path):
+        """
+        Record a step skipped because its output was cached at `cache_path`.
+
+        Nothing runs, so times and memory deltas are zero; the output shape is read
+        from the cached file's Parquet footer without loading it.
+        """
+        rss = _rss_mb()
+        output_rows, output_columns = _parquet_shape(cache_path)
+        record = {
+            'run_id': self.run_id,
+            'step': step_name,
+            'cache_hit': True,
+            'function': f"{step_function.__module__}.{step_function.__qualname__}",
+            'config': {key: str(value) for key, value in config.items()},
+            'wall_seconds': 0.0,
+            'cpu_seconds': 0.0,
+            'rss_before_mb': round(rss, 1),
+            'rss_delta_mb': 0.0,
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'traced_peak_mb': None,
+            'input_rows': None,
+            'input_columns': None,
+            'output_rows': output_rows,
+            'output_columns': output_columns,
+            'output_memory_mb': None,
+            'column_memory_mb': {},
+            'cache_path': cache_path,
+        }
+        self.records.append(record)
+        self._write_record(record)
+        logging.info(f"{step_name}: cache hit, {output_rows} rows")
+
+    def _dump_profile(self, profiler, step_name):
+        run_dir = os.path.join(self.profile_dir, self.run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        slug = re.sub(r'[^a-z0-9]+', '_', step_name.lower()).strip('_')
+        path = os.path.join(run_dir, f"{len(self.records) + 1:02d}_{slug}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def _write_record(self, record):
+        if self.metrics_path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.metrics_path)), exist_ok=True)
+        with open(self.metrics_path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+    def summary(self):
+        """Per-step summary table of this run."""
+        return pd.DataFrame(self.records, columns=['run_id'] + SUMMARY_COLUMNS).drop(columns='run_id')
+
+    def log_summary(self):
+        if not self.records:
+            return
+        summary = self.summary()
+        total = summary[['wall_seconds', 'cpu_seconds']].sum()
+        logging.info("Step performance summary:\n" + summary.to_string(index=False) +
+                     f"\nTotal: {total['wall_seconds']:.3f}s wall, {total['cpu_seconds']:.3f}s CPU")
+
+def load_metrics(metrics_path):
+    """
+    Read the JSON-lines metrics of all recorded runs, e.g. to compare a step's
+    timings across runs.
+    """
+    with open(metrics_path) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
@@ -0,0 +1,113 @@
+# utils/query_runner.py
+import os
+import time
+import logging
+import pandas as pd
+import sqlalchemy
+from utils.dtype_optimizer import optimize_dtypes
+from scripts.data_cleaning import MERCHANT_MAPPING, CATEGORY_MAPPING
+
+BASE_QUERY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'database', 'BASE_QUERY_IMPROVED.sql')
+
+DATE_COLUMNS = ['transaction_date', 'transaction_authorized_date']
+
+# Derived features computed by the database when `push_down` is enabled; they are
+# passed to create_derived_features as `precomputed` so pandas does not redo them
+PUSHDOWN_FEATURES = ('transaction_day_of_week', 'merchant_frequency', 'category_frequency')
+
+def read_base_query(path=BASE_QUERY_PATH):
+    with open(path) as f:
+        return f.read().strip().rstrip(';')
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _standardized_key(column, mapping, upper=False):
+    """
+    SQL expression for a column as the cleaning steps leave it before the features are
+    derived: missing values become 'nan' (handle_missing_values), then merchant names
+    are upper-cased and both columns are mapped (standardize_categories).
+    """
+    expression = f"COALESCE(base.{column}, 'nan')"
+    if upper:
+        expression = f"UPPER({expression})"
+    if not mapping:
+        return expression
+    cases = " ".join(f"WHEN {_sql_literal(old)} THEN {_sql_literal(new)}" for old, new in mapping.items())
+    return f"CASE {expression} {cases} ELSE {expression} END"
+
+def build_query(base_query, push_down=True, windows=None, quote=lambda name: name):
+    """
+    Wrap the base query with the standardization and optional feature push-down.
+
+    The direction and absolute amount that load_dataset derives in pandas are always
+    computed in SQL. With `push_down` the merchant and category frequencies are added
+    as window counts over the standardized names, so they match what
+    create_derived_features computes after the cleaning steps. `windows` adds
+    per-account calendar-window averages of the absolute amount, e.g. {'7day_avg': 7}.
+    A SQL RANGE frame covers whole days, so unlike the pandas rolling features every
+    transaction of the current day is in the window.
+
+    Returns:
+    str: The query text with the base query's bind parameters.
+    """
+    columns = [
+        "base.*",
+        "ABS(base.transaction_amount) AS standardized_transaction_amount",
+        "CASE WHEN base.is_transaction_outflow = 1 THEN 'outflow' ELSE 'inflow' END AS transaction_direction",
+    ]
+    if push_down:
+        merchant_key = _standardized_key('merchant_name', MERCHANT_MAPPING, upper=True)
+        category_key = _standardized_key('personal_finance_category_primary', CATEGORY_MAPPING)
+        columns.append(f"COUNT(base.transaction_id) OVER (PARTITION BY {merchant_key}) AS merchant_frequency")
+        columns.append(f"COUNT(base.transaction_id) OVER (PARTITION BY {category_key}) AS category_frequency")
+    for name, days in (windows or {}).items():
+        columns.append(f"AVG(base.transaction_amount_absolute) OVER (PARTITION BY base.account_id "
+                       f"ORDER BY base.transaction_date "
+                       f"RANGE BETWEEN INTERVAL {int(days) - 1} DAY PRECEDING AND CURRENT ROW) AS {quote(name)}")
+    return "SELECT\n    " + ",\n    ".join(columns) + f"\nFROM (\n{base_query}\n) AS base"
+
+def load_transactions(engine, start_date=None, end_date=None, account_ids=None, push_down=True, windows=None,
+                      query_path=BASE_QUERY_PATH):
+    """
+    Run the base query against the database and return a frame ready for the pipeline.
+
+    This is the database counterpart of load_dataset: the rows are filtered to the
+    date range and accounts inside the query, standardized in SQL and returned with
+    the same optimized dtypes, so no wide Excel export is needed.
+
+    Args:
+    engine (sqlalchemy.engine.Engine): The Plaid database, e.g. from `get_engine`.
+    start_date, end_date: Inclusive transaction date bounds; None leaves a side open.
+    account_ids (list): Accounts to include; None includes every account.
+    push_down (bool): Compute the PUSHDOWN_FEATURES in SQL.
+    windows (dict): Per-account window averages to compute in SQL (see `build_query`).
+    query_path (str): The base query file.
+
+    Returns:
+    pd.DataFrame: The standardized transactions.
+    """
+    query = build_query(read_base_query(query_path), push_down=push_down, windows=windows,
+                        quote=engine.dialect.identifier_preparer.quote)
+    statement = sqlalchemy.text(query).bindparams(sqlalchemy.bindparam('account_ids', expanding=True))
+    params = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'filter_accounts': 0 if account_ids is None else 1,
+        'account_ids': list(account_ids or []),
+    }
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            df = pd.read_sql(statement, connection, params=params, parse_dates=DATE_COLUMNS)
+    except Exception as e:
+        logging.error(f"Error running the base query: {str(e)}")
+        raise
+
+    df['transaction_amount'] = df.pop('standardized_transaction_amount')
+    df = optimize_dtypes(df)
+    logging.info(f"Loaded {len(df)} rows from the database in {time.perf_counter() - start:.2f}s"
+                 + (f" with {', '.join(PUSHDOWN_FEATURES)} computed in SQL" if push_down else ""))
+    return df
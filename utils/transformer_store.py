@@ -0,0 +1,96 @@
+# utils/transformer_store.py
+import os
+import json
+import logging
+from datetime import datetime
+import joblib
+import sklearn
+
+MANIFEST_FILE = 'manifest.json'
+STORE_FORMAT_VERSION = 1
+
+def _read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'format_version': STORE_FORMAT_VERSION, 'versions': []}
+    with open(path) as f:
+        return json.load(f)
+
+def _write_manifest(store_dir, manifest):
+    tmp_path = os.path.join(store_dir, f'{MANIFEST_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, MANIFEST_FILE))
+
+def list_transformer_versions(store_dir):
+    """
+    List the saved transformer versions, oldest first.
+
+    Returns:
+    list: One manifest entry (dict) per version.
+    """
+    return _read_manifest(store_dir)['versions']
+
+def save_transformers(transformers, store_dir, metadata=None):
+    """
+    Save fitted transformers as a new version in the store.
+
+    Every call writes a new `v<version>.joblib` file and registers it in the
+    manifest, so earlier versions stay available for comparing outputs.
+
+    Args:
+    transformers: Fitted scaler/encoder state, e.g. the statistics from
+        `streaming_pipeline.fit_streaming_statistics`.
+    store_dir (str): Directory of the store.
+    metadata (dict): Extra information recorded in the manifest (e.g. the source data).
+
+    Returns:
+    int: The new version number.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _read_manifest(store_dir)
+    version = max((entry['version'] for entry in manifest['versions']), default=0) + 1
+    file_name = f'v{version:04d}.joblib'
+
+    tmp_path = os.path.join(store_dir, f'{file_name}.tmp')
+    joblib.dump(transformers, tmp_path)
+    os.replace(tmp_path, os.path.join(store_dir, file_name))
+
+    manifest['versions'].append({
+        'version': version,
+        'file': file_name,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__,
+        'metadata': metadata or {},
+    })
+    _write_manifest(store_dir, manifest)
+    logging.info(f"Saved transformers version {version} to {store_dir}")
+    return version
+
+def load_transformers(store_dir, version=None):
+    """
+    Load a saved transformer version.
+
+    Args:
+    store_dir (str): Directory of the store.
+    version (int): Version to load; the latest one when None.
+
+    Returns:
+    tuple: (transformers, version)
+    """
+    versions = list_transformer_versions(store_dir)
+    if not versions:
+        raise FileNotFoundError(f"No transformers saved in {store_dir}")
+    if version is None:
+        entry = versions[-1]
+    else:
+        matches = [entry for entry in versions if entry['version'] == version]
+        if not matches:
+            raise KeyError(f"Transformer version {version} not found in {store_dir}")
+        entry = matches[0]
+
+    if entry['sklearn_version'] != sklearn.__version__:
+        logging.warning(f"Transformers version {entry['version']} were saved with scikit-learn "
+                        f"{entry['sklearn_version']}, running {sklearn.__version__}")
+    transformers = joblib.load(os.path.join(store_dir, entry['file']))
+    return transformers, entry['version']